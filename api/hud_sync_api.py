@@ -22,6 +22,8 @@ from typing import Dict, List, Optional
 # ---------------------------------------------------------------------------
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from request_metrics import RequestMetrics
+
 # ---------------------------------------------------------------------------
 # Logging
 # ---------------------------------------------------------------------------
@@ -37,6 +39,10 @@ logger = logging.getLogger('hud_sync_api')
 app = Flask(__name__)
 CORS(app, origins='*')
 
+# Per-route latency, size and error metrics, scraped at /api/metrics
+request_metrics = RequestMetrics('hud_sync_api')
+request_metrics.init_app(app)
+
 # ---------------------------------------------------------------------------
 # In-memory job store (keyed by job_id).
 # Each entry: { state, status, properties, stats, error, started_at, finished_at }
@@ -209,6 +215,11 @@ def health_check():
     return jsonify({'success': True, 'status': 'healthy', 'timestamp': datetime.now(timezone.utc).isoformat()})
 
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    return request_metrics.response()
+
+
 @app.route('/api/hud/states', methods=['GET'])
 def get_states():
     return jsonify({'success': True, 'states': US_STATES})
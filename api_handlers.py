@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+API Request Handling for USAhudHomes.com
+Argument parsing, validation, cache keys and payload building for the /api/*
+routes, shared by the Flask apps (src/main.py, data_integration.py) and the
+ASGI app (src/asgi.py) so each only adapts requests and responses
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from export_stream import EXPORT_FORMATS
+from geo_index import parse_geo_args
+from json_fragments import encode_object
+from property_store import DEFAULT_SORT, SORT_OPTIONS
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on IDs accepted by /api/properties/batch
+MAX_BATCH_PROPERTY_IDS = 200
+
+# Fields a new lead must carry
+LEAD_REQUIRED_FIELDS = ('name', 'email', 'phone', 'state')
+
+DEFAULT_PAGE_LIMIT = 50
+
+
+class APIError(Exception):
+    """Raised while handling a request to answer with a JSON {'error': message}"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class PropertySearch(NamedTuple):
+    """Parsed /api/properties query"""
+    filters: Dict
+    sort: str
+    limit: int
+    cursor: Optional[str]
+
+
+def property_filter_args(data_service, args) -> Dict:
+    """
+    Parse the property search filters shared by search, facets and export
+
+    Args:
+        data_service: DataService the filters will run against
+        args: Query arguments as a werkzeug MultiDict (Flask's request.args)
+
+    Raises:
+        APIError: 400 if the geo parameters are invalid, 503 if they are
+            given but no property could be geocoded
+    """
+    try:
+        geo = parse_geo_args(
+            lat=args.get('lat', type=float),
+            lng=args.get('lng', type=float),
+            radius_miles=args.get('radius_miles', type=float),
+            bbox=args.get('bbox')
+        )
+    except ValueError as e:
+        raise APIError(400, str(e))
+
+    # Without coordinates or ZIP centroids every geo search would come back
+    # empty, which looks like a real answer
+    if geo is not None and not data_service.geo_search_available():
+        raise APIError(503, 'Geo search unavailable: no property coordinates or ZIP centroids are loaded')
+
+    return {
+        'query': args.get('query'),
+        'state': args.get('state'),
+        'min_price': args.get('min_price', type=int),
+        'max_price': args.get('max_price', type=int),
+        'bedrooms': args.get('bedrooms', type=int),
+        'bathrooms': args.get('bathrooms', type=float),
+        'status': args.get('status'),
+        'geo': geo
+    }
+
+
+def sort_arg(args) -> str:
+    sort = args.get('sort', DEFAULT_SORT)
+    if sort not in SORT_OPTIONS:
+        raise APIError(400, f"Invalid sort, expected one of: {', '.join(SORT_OPTIONS)}")
+    return sort
+
+
+def export_format_arg(args) -> str:
+    export_format = args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        raise APIError(400, f"Invalid format, expected one of: {', '.join(EXPORT_FORMATS)}")
+    return export_format
+
+
+def property_search_args(data_service, args) -> PropertySearch:
+    """Parse a property search: filters, sort, page size and cursor"""
+    return PropertySearch(
+        filters=property_filter_args(data_service, args),
+        sort=sort_arg(args),
+        limit=args.get('limit', DEFAULT_PAGE_LIMIT, type=int),
+        cursor=args.get('cursor')
+    )
+
+
+def property_page_cache_key(data_service, search: PropertySearch) -> Tuple:
+    """Response cache key for a search page; includes the data version so reloads miss"""
+    return (data_service.data_version, *search.filters.values(), search.sort, search.limit, search.cursor)
+
+
+def property_page_body(data_service, search: PropertySearch) -> bytes:
+    """
+    Encoded /api/properties response
+
+    Raises:
+        APIError: If the cursor is invalid
+    """
+    try:
+        page = data_service.search_properties_page(**search.filters, sort=search.sort,
+                                                   limit=search.limit, cursor=search.cursor)
+    except ValueError as e:
+        raise APIError(400, str(e))
+
+    # Rows are joined from their pre-encoded JSON instead of re-serialized
+    return encode_object({
+        'total': page['total'],
+        'next_cursor': page['next_cursor'],
+        'filters_applied': {**search.filters, 'sort': search.sort}
+    }, raw={'properties': data_service.properties_json(page['properties'])})
+
+
+def facets_cache_key(data_service, filters: Dict) -> Tuple:
+    return (data_service.data_version, *filters.values())
+
+
+def facets_payload(data_service, filters: Dict) -> Dict:
+    facets = data_service.property_facets(**filters)
+    return {
+        'facets': facets['facets'],
+        'total': facets['total'],
+        'filters_applied': filters
+    }
+
+
+def property_body(data_service, property_id: str) -> bytes:
+    """Encoded single property; APIError 404 if there is none"""
+    property_data = data_service.get_property_by_id(property_id)
+    if not property_data:
+        raise APIError(404, 'Property not found')
+    return data_service.property_json(property_data)
+
+
+def batch_property_ids(data) -> List[str]:
+    """
+    Validate a /api/properties/batch body
+
+    Args:
+        data: Parsed JSON body, or None if it was missing or malformed
+
+    Raises:
+        APIError: If property_ids is not a list of at most MAX_BATCH_PROPERTY_IDS strings
+    """
+    property_ids = data.get('property_ids') if isinstance(data, dict) else None
+
+    if not isinstance(property_ids, list) or not all(isinstance(i, str) for i in property_ids):
+        raise APIError(400, 'property_ids must be a list of strings')
+
+    if len(property_ids) > MAX_BATCH_PROPERTY_IDS:
+        raise APIError(400, f'At most {MAX_BATCH_PROPERTY_IDS} property_ids per request')
+    return property_ids
+
+
+def properties_batch_body(data_service, property_ids: List[str]) -> bytes:
+    properties, not_found = data_service.get_properties_by_ids(property_ids)
+    return encode_object({
+        'total': len(properties),
+        'not_found': not_found
+    }, raw={'properties': data_service.properties_json(properties)})
+
+
+def leads_page_payload(data_service, args) -> Dict:
+    """
+    /api/leads response for a status filter, page size and cursor
+
+    Raises:
+        APIError: If the cursor is invalid
+    """
+    status = args.get('status')
+    try:
+        page = data_service.get_leads_page(status=status, limit=args.get('limit', DEFAULT_PAGE_LIMIT, type=int),
+                                           cursor=args.get('cursor'))
+    except ValueError as e:
+        raise APIError(400, str(e))
+
+    return {
+        'leads': page['leads'],
+        'total': page['total'],
+        'next_cursor': page['next_cursor'],
+        'status_filter': status
+    }
+
+
+def validate_lead(lead_data) -> Dict:
+    """
+    Check a new lead's JSON body
+
+    Raises:
+        APIError: If the body is not an object or a required field is empty
+    """
+    if not isinstance(lead_data, dict):
+        raise APIError(400, 'Request body must be a JSON object')
+
+    for field in LEAD_REQUIRED_FIELDS:
+        if not lead_data.get(field):
+            raise APIError(400, f'Missing required field: {field}')
+    return lead_data
+
+
+def lead_status_arg(data) -> str:
+    new_status = data.get('status') if isinstance(data, dict) else None
+    if not new_status:
+        raise APIError(400, 'Status is required')
+    return new_status
+
+
+def found_lead(lead) -> Dict:
+    if not lead:
+        raise APIError(404, 'Lead not found')
+    return lead
+
+
+def lead_brokers_payload(data_service, lead_id: str) -> Dict:
+    brokers = data_service.get_brokers_for_lead(lead_id)
+    if brokers is None:
+        raise APIError(404, 'Lead not found')
+
+    return {
+        'lead_id': lead_id,
+        'brokers': brokers,
+        'total': len(brokers)
+    }
+
+
+def brokers_payload(data_service, args) -> Dict:
+    state = args.get('state')
+    ranked = args.get('ranked', 'false').lower() == 'true'
+
+    brokers = data_service.get_brokers(state=state, ranked=ranked)
+    return {
+        'brokers': brokers,
+        'total': len(brokers),
+        'state_filter': state,
+        'ranked': ranked
+    }
+
+
+def health_payload(data_service, property_cache, facet_cache) -> Dict:
+    return {
+        'status': 'healthy',
+        'timestamp': datetime.now().isoformat(),
+        'data_loaded': {
+            'properties': len(data_service.properties),
+            'leads': len(data_service.leads),
+            'brokers': len(data_service.brokers)
+        },
+        'data_reload': data_service.reload_status(),
+        'response_cache': property_cache.stats(),
+        'facet_cache': facet_cache.stats(),
+        'lead_journal': data_service.lead_journal.status() if data_service.lead_journal else None
+    }
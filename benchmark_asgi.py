@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+ASGI vs Flask Benchmark for USAhudHomes.com
+Drives the Flask app (src/main.py) and the ASGI app (src/asgi.py) in-process
+with the same concurrent clients over one DataService: Flask requests run on
+a fixed pool of worker threads, as under a threaded WSGI server, while ASGI
+requests are coroutines on one event loop. Clients mix property searches
+with lead writes, which wait for the journal fsync.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.test import EnvironBuilder, run_wsgi_app
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+STATES = ('NC', 'TX', 'FL', 'GA', 'CA', 'OH', 'PA', 'AZ')
+
+
+def load_module(name, path):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def workload(clients, requests_per_client, lead_share, seed):
+    """Per client, a list of (method, path, query string, JSON body or None)"""
+    rng = random.Random(seed)
+    plans = []
+    for client in range(clients):
+        plan = []
+        for _ in range(requests_per_client):
+            if rng.random() < lead_share:
+                body = {'name': f'Client {client}', 'email': f'client{client}@example.com',
+                        'phone': '555-0100', 'state': rng.choice(STATES)}
+                plan.append(('POST', '/api/leads', '', json.dumps(body).encode('utf-8')))
+            else:
+                query = f'state={rng.choice(STATES)}&limit=20&sort={rng.choice(("newest", "price_asc"))}'
+                plan.append(('GET', '/api/properties', query, None))
+        plans.append(plan)
+    return plans
+
+
+def wsgi_request(app, method, path, query, body):
+    builder = EnvironBuilder(method=method, path=path, query_string=query, data=body,
+                             content_type='application/json' if body else None)
+    app_iter, status, _ = run_wsgi_app(app, builder.get_environ(), buffered=True)
+    b''.join(app_iter)
+    return int(status.split()[0])
+
+
+async def asgi_request(app, method, path, query, body):
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'query_string': query.encode('latin-1'),
+        'headers': [(b'content-type', b'application/json')] if body else []
+    }
+    received = False
+    status = None
+
+    async def receive():
+        nonlocal received
+        if received:
+            await asyncio.Event().wait()  # no disconnect while the handler runs
+        received = True
+        return {'type': 'http.request', 'body': body or b'', 'more_body': False}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    await app(scope, receive, send)
+    return status
+
+
+async def drive(plans, call):
+    """Run every client's requests in sequence, all clients concurrently; returns latencies"""
+    latencies = []
+    errors = 0
+
+    async def client(plan):
+        nonlocal errors
+        for request in plan:
+            started = time.perf_counter()
+            status = await call(*request)
+            latencies.append(time.perf_counter() - started)
+            if status >= 400:
+                errors += 1
+
+    await asyncio.gather(*(client(plan) for plan in plans))
+    return latencies, errors
+
+
+def run(name, plans, call, data_service):
+    journal = data_service.lead_journal
+    batches = journal.status()['batches'] if journal else 0
+    started = time.perf_counter()
+    latencies, errors = asyncio.run(drive(plans, call))
+    elapsed = time.perf_counter() - started
+    batches = (journal.status()['batches'] if journal else 0) - batches
+
+    latencies.sort()
+    ms = lambda seconds: seconds * 1000
+    print(f"{name:<22}{len(latencies) / elapsed:>10.0f}{ms(statistics.median(latencies)):>10.1f}"
+          f"{ms(latencies[int(len(latencies) * 0.99) - 1]):>10.1f}{ms(latencies[-1]):>10.1f}"
+          f"{batches:>9}{errors:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the ASGI and Flask APIs under concurrent clients')
+    parser.add_argument('--clients', type=int, default=1000, help='Concurrent clients (default: 1000)')
+    parser.add_argument('--requests', type=int, default=5, help='Requests per client (default: 5)')
+    parser.add_argument('--threads', type=int, default=32, help='Flask worker threads (default: 32)')
+    parser.add_argument('--lead-share', type=float, default=0.2,
+                        help='Fraction of requests that create a lead (default: 0.2)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the workload')
+    args = parser.parse_args()
+
+    journal_dir = tempfile.mkdtemp(prefix='usahud-bench-')
+    os.environ['LEAD_JOURNAL_FILE'] = os.path.join(journal_dir, 'leads_journal.jsonl')
+    os.environ['DATA_RELOAD_INTERVAL'] = '0'
+    os.environ['RESPONSE_CACHE_SIZE'] = '0'  # measure the handlers, not cache hits
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)  # the apps load the data files from the working directory
+
+    import logging
+    logging.disable(logging.INFO)
+
+    flask_main = load_module('flask_main', 'src/main.py')
+    asgi_main = load_module('asgi_main', 'src/asgi.py')
+    asgi_main.data_service.close()
+    asgi_main.data_service = flask_main.data_service  # one dataset and journal for both
+    data_service = flask_main.data_service
+
+    plans = workload(args.clients, args.requests, args.lead_share, args.seed)
+    print(f"{args.clients} clients x {args.requests} requests, {args.lead_share:.0%} lead writes, "
+          f"{len(data_service.properties)} properties, journal in {journal_dir}")
+    print(f"{'server':<22}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'fsyncs':>9}{'errors':>8}")
+
+    pool = ThreadPoolExecutor(max_workers=args.threads)
+
+    async def flask_call(*request):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, wsgi_request, flask_main.app, *request)
+
+    async def asgi_call(*request):
+        return await asgi_request(asgi_main.app, *request)
+
+    run(f'flask ({args.threads} threads)', plans, flask_call, data_service)
+    run('asgi (1 event loop)', plans, asgi_call, data_service)
+
+    pool.shutdown()
+    data_service.close()
+
+
+if __name__ == "__main__":
+    main()
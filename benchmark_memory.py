@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Property Memory Benchmark for USAhudHomes.com
+Reports bytes per property held as loaded JSON dicts versus compact
+PropertyRecords, on nationwide generator output or an existing data file
+"""
+
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+from mock_data_generator_nationwide import NationwideMockDataGenerator
+from property_record import compact_properties
+
+
+def measure(build):
+    """Return (result, bytes still allocated by build, seconds)"""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, allocated, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure per-property memory of loaded listings')
+    parser.add_argument('--count', type=int, default=20000, help='Properties to generate (default: 20000)')
+    parser.add_argument('--file', help='Measure an existing properties JSON file instead of generating')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the generator')
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, 'r') as f:
+            raw = f.read()
+        source = args.file
+    else:
+        random.seed(args.seed)
+        raw = json.dumps(NationwideMockDataGenerator().generate_properties(args.count), default=str)
+        source = f'{args.count} generated nationwide properties'
+
+    # Parse inside the measurement, as DataService does when loading a file
+    dicts, dict_bytes, dict_seconds = measure(lambda: json.loads(raw))
+    count = len(dicts)
+    records, record_bytes, record_seconds = measure(lambda: compact_properties(json.loads(raw)))
+
+    assert all(record == prop for record, prop in zip(records, dicts))
+
+    print(f"Source: {source} ({count} properties, {len(raw) / count:.0f} JSON bytes each)")
+    print(f"{'representation':<18}{'bytes/property':>16}{'total MB':>11}{'load s':>9}")
+    print(f"{'dict':<18}{dict_bytes / count:>16.0f}{dict_bytes / 1e6:>11.1f}{dict_seconds:>9.3f}")
+    print(f"{'PropertyRecord':<18}{record_bytes / count:>16.0f}{record_bytes / 1e6:>11.1f}{record_seconds:>9.3f}")
+    print(f"Saved {1 - record_bytes / dict_bytes:.0%} of property memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Scraper Parsing Benchmark for USAhudHomes.com
+Runs each search page extraction path over recorded fixtures and synthetic
+pages, reports parse time, cards per second and peak memory, and exits
+non-zero when a path extracts the wrong properties. Needs no network access.
+
+Extraction paths:
+    lxml, html.parser  HUDPropertyScraper's parsers (div.property-card markup)
+    browser-js         hud_scraper_browser.py's JavaScript (li.property-box markup)
+    pipeline-js        hud-pipeline/scripts/1_hud_scraper.py's JavaScript (li.property-box)
+
+The JavaScript paths run in headless Chrome and need selenium; they are only
+benchmarked with --browser.
+"""
+
+import argparse
+import glob
+import importlib.util
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from hud_fixtures import DEFAULT_FIXTURE_DIR, search_page, synthetic_properties
+from hud_scraper import PARSERS, HUDPropertyScraper, etree
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_SCRAPER = os.path.join(ROOT, 'hud-pipeline', 'scripts', '1_hud_scraper.py')
+
+# Extraction path -> the card markup it reads
+PATH_MARKUP = {
+    'lxml': 'property-card',
+    'html.parser': 'property-card',
+    'browser-js': 'property-box',
+    'pipeline-js': 'property-box',
+}
+BROWSER_PATHS = ('browser-js', 'pipeline-js')
+
+BODY = re.compile(rb'(<body[^>]*>)(.*)(</body>)', re.S | re.I)
+NUMBER = re.compile(r'\d+(?:\.\d+)?')
+
+
+def scale_page(content: bytes, copies: int) -> bytes:
+    """Repeat a page's body content to make a larger page with the same markup"""
+    match = BODY.search(content)
+    if copies <= 1 or not match:
+        return content
+    return content[:match.start(2)] + match.group(2) * copies + content[match.end(2):]
+
+
+def comparable(properties: List[Dict]) -> List[Dict]:
+    """Properties without the per-parse timestamp"""
+    return [{key: value for key, value in prop.items() if key != 'scraped_at'} for prop in properties]
+
+
+def page_markup(content: bytes) -> str:
+    """The card markup a page uses"""
+    return 'property-box' if b'property-box' in content else 'property-card'
+
+
+class Page:
+    """A page to benchmark, with the records it should yield when they are known"""
+
+    def __init__(self, name: str, content: bytes, expected: Optional[List[Dict]] = None):
+        self.name = name
+        self.content = content
+        self.markup = page_markup(content)
+        self.expected = expected
+        self.path = None  # written out for the browser and memory measurements
+
+
+def load_fixtures(directory: str, scale: int) -> List[Page]:
+    """Saved pages under a directory (recorded ones included), each body repeated `scale` times"""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, '**', '*.html'), recursive=True)):
+        with open(path, 'rb') as f:
+            content = scale_page(f.read(), scale)
+        pages.append(Page(os.path.relpath(path, directory), content))
+    return pages
+
+
+def synthetic_pages(card_counts: List[int], markups, seed: int = 0) -> List[Page]:
+    """Generated pages of each size in each markup"""
+    pages = []
+    for count in card_counts:
+        properties = synthetic_properties(count, seed)
+        for markup in markups:
+            pages.append(Page(f"synthetic {markup} x{count}", search_page(properties, markup), properties))
+    return pages
+
+
+# Each normaliser maps one path's output to (case number, address, city, state,
+# zip code, county, price, beds, baths) so paths and ground truth compare
+
+def normalise_expected(prop: Dict) -> tuple:
+    return (prop['case_number'], prop['address'], prop['city'], prop['state'], prop['zip_code'],
+            prop['county'], prop['price'], prop['beds'], prop['baths'])
+
+
+def normalise_scraper(prop: Dict) -> tuple:
+    return (prop['property_id'], prop.get('address'), prop.get('city'), prop.get('state'),
+            prop.get('zip_code'), prop.get('county'), prop.get('price'), prop.get('bedrooms'),
+            prop.get('bathrooms'))
+
+
+def normalise_browser(prop: Dict) -> tuple:
+    return (prop['case_number'], prop['address'], prop['city'], prop['state'], prop['zip_code'],
+            prop['county'], prop['price'], prop['beds'], prop['baths'])
+
+
+def normalise_pipeline(prop: Dict) -> tuple:
+    def number(text):
+        match = NUMBER.search(text.replace(',', ''))
+        return float(match.group()) if match else None
+
+    parts = [part.strip() for part in prop.get('cityState', '').split(',')] + ['', '', '']
+    return (prop['caseNumber'], prop['address'], parts[0], parts[1], parts[2],
+            prop.get('county', '').replace(' County', '').strip(), number(prop.get('price', '')),
+            number(prop.get('beds', '')), number(prop.get('baths', '')))
+
+
+class ScraperExtractor:
+    """One of HUDPropertyScraper's parsers"""
+
+    normalise = staticmethod(normalise_scraper)
+
+    def __init__(self, parser: str):
+        self.scraper = HUDPropertyScraper(parser=parser, cache_dir='')
+
+    def extract(self, page: Page) -> List[Dict]:
+        return self.scraper.parse_properties(page.content)
+
+    def close(self):
+        pass
+
+
+class BrowserExtractor:
+    """A scraper's extraction JavaScript, run on the page loaded in headless Chrome"""
+
+    def __init__(self, driver, script: str, returns_json: bool, normalise):
+        self.driver = driver
+        self.script = script
+        self.returns_json = returns_json
+        self.normalise = normalise
+
+    def extract(self, page: Page) -> List[Dict]:
+        self.driver.get('file://' + os.path.abspath(page.path))
+        result = self.driver.execute_script(self.script)
+        return json.loads(result) if self.returns_json else (result or [])
+
+    def close(self):
+        pass
+
+
+def browser_extractors() -> Dict[str, BrowserExtractor]:
+    """The JavaScript paths, sharing one Chrome; raises ImportError without selenium"""
+    from hud_scraper_browser import JS_EXTRACT, HUDScraperBrowser
+
+    spec = importlib.util.spec_from_file_location('pipeline_hud_scraper', PIPELINE_SCRAPER)
+    pipeline = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(pipeline)
+
+    browser = HUDScraperBrowser(headless=True)
+    browser._init_driver()
+    extractors = {
+        'browser-js': BrowserExtractor(browser.driver, JS_EXTRACT, False, normalise_browser),
+        'pipeline-js': BrowserExtractor(browser.driver, pipeline.JS_EXTRACT, True, normalise_pipeline),
+    }
+    extractors['pipeline-js'].close = browser._close_driver
+    return extractors
+
+
+def time_extractor(extractor, page: Page, repeat: int):
+    """Return (records, best seconds per parse)"""
+    best = float('inf')
+    records = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        records = extractor.extract(page)
+        best = min(best, time.perf_counter() - started)
+    return records, best
+
+
+def peak_rss() -> Optional[int]:
+    """Peak resident set size of this process in bytes, or None if unavailable"""
+    # On Linux ru_maxrss carries over from the parent process, so it can't
+    # show a child's own peak; VmHWM is this process's alone
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def measure_memory(parser: str, filename: str) -> Optional[int]:
+    """Peak RSS growth while HUDPropertyScraper parses a page once (run in a fresh process)"""
+    scraper = HUDPropertyScraper(parser=parser, cache_dir='')
+    with open(filename, 'rb') as f:
+        content = f.read()
+    before = peak_rss()
+    scraper.parse_properties(content)
+    after = peak_rss()
+    return after - before if before is not None else None
+
+
+def peak_memory(parser: str, filename: str) -> Optional[int]:
+    """measure_memory in a child process, so earlier parses don't mask the peak"""
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure-memory', parser, filename],
+                            capture_output=True, text=True, cwd=ROOT)
+    output = result.stdout.split()
+    if result.returncode != 0 or not output or not output[-1].isdigit():
+        return None
+    return int(output[-1])
+
+
+def check(name: str, records: List[tuple], expected: List[tuple]) -> Optional[str]:
+    """Describe how a path's records differ from the expected ones, or None if they match"""
+    if records == expected:
+        return None
+    if len(records) != len(expected):
+        return f"{name} extracted {len(records)} cards, expected {len(expected)}"
+    index = next(i for i, (got, want) in enumerate(zip(records, expected)) if got != want)
+    return f"{name} card {index}: got {records[index]}, expected {expected[index]}"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark and check HUD search page parsing offline')
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURE_DIR,
+                        help="Directory of saved .html pages, searched recursively ('' skips)")
+    parser.add_argument('--scale', type=int, default=50,
+                        help='Repeat each saved page body this many times (default: 50)')
+    parser.add_argument('--cards', default='1000,5000',
+                        help="Synthetic page sizes in cards, comma separated ('' skips; default: 1000,5000)")
+    parser.add_argument('--seed', type=int, default=0, help='Synthetic page seed (default: 0)')
+    parser.add_argument('--repeat', type=int, default=5, help='Parses per measurement, best kept (default: 5)')
+    parser.add_argument('--browser', action='store_true',
+                        help='Also run the JavaScript extraction paths in headless Chrome (needs selenium)')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the peak memory measurements')
+    parser.add_argument('--measure-memory', nargs=2, metavar=('PARSER', 'FILE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    if args.measure_memory:
+        print(measure_memory(*args.measure_memory))
+        return 0
+
+    extractors = {name: ScraperExtractor(name) for name in PARSERS if name != 'lxml' or etree is not None}
+    if args.browser:
+        try:
+            extractors.update(browser_extractors())
+        except Exception as e:
+            print(f"Skipping {', '.join(BROWSER_PATHS)}: {e}")
+
+    card_counts = [int(count) for count in args.cards.split(',') if count.strip()]
+    markups = sorted({PATH_MARKUP[name] for name in extractors})
+    pages = synthetic_pages(card_counts, markups, args.seed)
+    if args.fixtures:
+        pages += load_fixtures(args.fixtures, args.scale)
+    if not pages:
+        parser.error('Nothing to benchmark: no fixtures and no synthetic pages')
+
+    failures = []
+    with tempfile.TemporaryDirectory(prefix='hud-bench-') as workdir:
+        print(f"{'page':<52}{'path':<13}{'cards':>8}{'ms/page':>10}{'cards/s':>10}{'peak MiB':>10}")
+        for number, page in enumerate(pages):
+            page.path = os.path.join(workdir, f'page{number}.html')
+            with open(page.path, 'wb') as f:
+                f.write(page.content)
+
+            results = {}
+            agreement = {}
+            for name, extractor in extractors.items():
+                if PATH_MARKUP[name] != page.markup:
+                    continue
+                try:
+                    records, seconds = time_extractor(extractor, page, args.repeat)
+                except Exception as e:
+                    failures.append(f"{page.name}: {name} failed: {e}")
+                    continue
+                results[name] = [extractor.normalise(record) for record in records]
+                # The HUDPropertyScraper parsers must agree on every field, not just the shared ones
+                agreement[name] = comparable(records) if name in PARSERS else results[name]
+
+                memory = None
+                if name in PARSERS and not args.no_memory:
+                    memory = peak_memory(name, page.path)
+                rate = len(records) / seconds if seconds else 0
+                memory_text = f"{memory / 2 ** 20:.1f}" if memory is not None else '-'
+                print(f"{page.name[:51]:<52}{name:<13}{len(records):>8}{seconds * 1000:>10.1f}"
+                      f"{rate:>10.0f}{memory_text:>10}")
+
+            if page.expected is not None:
+                expected = [normalise_expected(prop) for prop in page.expected]
+                problems = [check(name, records, expected) for name, records in results.items()]
+            elif agreement:
+                # No ground truth for saved pages: the paths must agree with each other
+                reference_name = list(agreement)[-1]
+                problems = [check(name, records, agreement[reference_name])
+                            for name, records in agreement.items() if name != reference_name]
+            else:
+                problems = []
+            failures += [f"{page.name}: {problem}" for problem in problems if problem]
+
+    for extractor in extractors.values():
+        extractor.close()
+
+    for failure in failures:
+        print(f"  MISMATCH: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""
+Binary Dataset Snapshot for USAhudHomes.com
+Compiles the property, lead and broker JSON files into one binary file of
+fixed-width columns plus a shared string table. DataService maps it
+read-only, so worker processes skip JSON parsing and share the same
+page-cache pages instead of each holding its own copy of the rows.
+
+The property table also carries everything else a worker would otherwise
+rebuild from the rows: pre-encoded JSON fragments, the n-gram search index,
+the columnar store's presorted permutations, the property ID -> row table
+and the dashboard totals. A worker reads all of them from the map.
+
+Usage:
+    python binary_snapshot.py [--data-dir .] [--output data_snapshot.bin]
+"""
+
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from collections import Counter
+from collections.abc import Mapping, Sequence
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from json_fragments import dumps, encode_array
+from property_store import PropertyStore
+from search_index import NgramIndex
+from stats_aggregator import StatsAggregator
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'USAHUDS1'
+FORMAT_VERSION = 1
+DEFAULT_SNAPSHOT_FILE = 'data_snapshot.bin'
+
+# Per-row flags stored next to every column
+MISSING, NULL, VALUE, INT_VALUE = 0, 1, 2, 3
+
+# Strings are stored as uint32 ids; this id means "no string"
+NO_STRING = 0xFFFFFFFF
+
+# Largest integer a float64 column holds exactly
+MAX_EXACT_INT = 2 ** 53
+
+
+def _column_kind(values: List) -> str:
+    """Pick the narrowest column kind that round-trips every present value"""
+    present = [v for v in values if v is not None]
+    if present and all(isinstance(v, bool) for v in present):
+        return 'bool'
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        if all(not isinstance(v, int) or abs(v) < MAX_EXACT_INT for v in present):
+            return 'number'
+    if all(isinstance(v, str) for v in present):
+        return 'str'
+    return 'json'
+
+
+class _Writer:
+    """Accumulates 8-byte aligned sections and a deduplicated string table"""
+
+    def __init__(self):
+        self.sections: List[bytes] = []
+        self.offset = 0
+        self.strings: Dict[str, int] = {}
+
+    def add(self, data: bytes) -> int:
+        """Append a section; returns its offset from the end of the header"""
+        offset = self.offset
+        padding = -len(data) % 8
+        self.sections.append(data + b'\0' * padding)
+        self.offset += len(data) + padding
+        return offset
+
+    def add_array(self, values, dtype) -> int:
+        return self.add(np.asarray(values, dtype=dtype).tobytes())
+
+    def add_ndarray(self, array) -> Dict:
+        """Append a 1-d array along with the dtype and length needed to map it back"""
+        array = np.ascontiguousarray(array)
+        return {'offset': self.add(array.tobytes()), 'dtype': array.dtype.str, 'count': len(array)}
+
+    def add_blobs(self, blobs: List[bytes]) -> Dict:
+        """Append variable-length byte strings as an offsets array plus one data section"""
+        offsets = np.zeros(len(blobs) + 1, dtype=np.uint64)
+        np.cumsum([len(blob) for blob in blobs], out=offsets[1:])
+        return {
+            'count': len(blobs),
+            'offsets': self.add(offsets.tobytes()),
+            'data': self.add(b''.join(blobs)),
+        }
+
+    def string_id(self, value: str) -> int:
+        string_id = self.strings.get(value)
+        if string_id is None:
+            string_id = self.strings[value] = len(self.strings)
+        return string_id
+
+
+def _compile_column(writer: _Writer, rows: List[Dict], name: str) -> Dict:
+    raw = [row.get(name) for row in rows]
+    flags = np.array([
+        MISSING if name not in row else NULL if row[name] is None else VALUE
+        for row in rows
+    ], dtype=np.uint8)
+    kind = _column_kind(raw)
+
+    if kind == 'number':
+        values = np.array([np.nan if v is None else v for v in raw], dtype=np.float64)
+        flags[np.array([isinstance(v, int) for v in raw], dtype=bool)] = INT_VALUE
+    elif kind == 'bool':
+        values = np.array([bool(v) for v in raw], dtype=np.uint8)
+    else:
+        encode = (lambda v: v) if kind == 'str' else (lambda v: json.dumps(v, default=str))
+        values = np.array([
+            NO_STRING if v is None else writer.string_id(encode(v)) for v in raw
+        ], dtype=np.uint32)
+
+    return {
+        'kind': kind,
+        'dtype': values.dtype.str,
+        'values': writer.add(values.tobytes()),
+        'flags': writer.add(flags.tobytes()),
+    }
+
+
+def _compile_search_index(writer: _Writer, rows: List[Dict]) -> Dict:
+    """Flatten an NgramIndex into sorted grams with CSR postings"""
+    index = NgramIndex()
+    index.build(rows)
+    grams = sorted(index.postings)
+    postings = [sorted(index.postings[gram]) for gram in grams]
+    offsets = np.zeros(len(grams) + 1, dtype=np.uint64)
+    np.cumsum([len(posting) for posting in postings], out=offsets[1:])
+    return {
+        'fields': list(index.fields),
+        'gram_size': index.gram_size,
+        'grams': writer.add_array([writer.string_id(gram) for gram in grams], np.uint32),
+        'gram_count': len(grams),
+        'posting_offsets': writer.add(offsets.tobytes()),
+        'postings': writer.add_array([doc for posting in postings for doc in posting], np.int32),
+        'documents': len(rows),
+        'texts': writer.add_array([writer.string_id(index.texts[doc]) for doc in range(len(rows))], np.uint32),
+    }
+
+
+def _compile_property_indexes(writer: _Writer, rows: List[Dict]) -> Dict:
+    """The columnar store arrays, property ID table and stats totals for the property rows"""
+    arrays, lookups = PropertyStore(rows).index_arrays()
+
+    # First occurrence wins, as in DataSnapshot.build_property_indexes
+    first_rows = {}
+    for row, prop in enumerate(rows):
+        if isinstance(prop.get('property_id'), str):
+            first_rows.setdefault(prop['property_id'], row)
+    ids = sorted(first_rows)
+
+    stats = StatsAggregator()
+    stats.rebuild(rows, [], [])
+
+    return {
+        'store': {
+            'arrays': {name: writer.add_ndarray(array) for name, array in arrays.items()},
+            'lookups': lookups,
+        },
+        'ids': {
+            'keys': writer.add_ndarray(np.array(ids, dtype=str)),
+            'rows': writer.add_ndarray(np.array([first_rows[i] for i in ids], dtype=np.int64)),
+        },
+        'totals': {
+            'status_counts': [[status, count] for status, count in stats.property_status_counts.items()],
+            'price_sum': stats.price_sum,
+        },
+    }
+
+
+def compile_snapshot(datasets: Dict[str, List[Dict]], output: str, sources: Optional[Dict[str, str]] = None):
+    """
+    Write datasets to a binary snapshot file
+
+    Args:
+        datasets: Dataset name -> list of row dictionaries
+        output: Snapshot file path (written atomically)
+        sources: Dataset name -> source file name, recorded in the header
+    """
+    writer = _Writer()
+    tables = {}
+
+    for dataset, rows in datasets.items():
+        fields = list(dict.fromkeys(key for row in rows for key in row))
+        tables[dataset] = {
+            'rows': len(rows),
+            'fields': fields,
+            'columns': {name: _compile_column(writer, rows, name) for name in fields},
+        }
+        if dataset == 'properties':
+            tables[dataset]['fragments'] = writer.add_blobs([dumps(row) for row in rows])
+            tables[dataset]['search'] = _compile_search_index(writer, rows)
+            tables[dataset]['indexes'] = _compile_property_indexes(writer, rows)
+
+    strings = writer.add_blobs([s.encode('utf-8') for s in writer.strings])
+
+    header = json.dumps({
+        'version': FORMAT_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'sources': sources or {},
+        'strings': strings,
+        'tables': tables,
+    }).encode('utf-8')
+    header += b' ' * (-(len(MAGIC) + 8 + len(header)) % 8)
+
+    temp_path = output + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for section in writer.sections:
+            f.write(section)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, output)
+    logger.info(f"Wrote snapshot {output} ({os.path.getsize(output)} bytes, {strings['count']} strings)")
+
+
+class _Blobs:
+    """Variable-length byte strings inside the map"""
+
+    def __init__(self, snapshot: 'MappedSnapshot', spec: Dict):
+        self._mmap = snapshot._mmap
+        self.offsets = snapshot._array(spec['offsets'], '<u8', spec['count'] + 1)
+        self.base = snapshot._base + spec['data']
+
+    def __getitem__(self, index: int) -> bytes:
+        return self._mmap[self.base + int(self.offsets[index]):self.base + int(self.offsets[index + 1])]
+
+
+class MappedSnapshot:
+    """Read-only memory map of a compiled snapshot"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f'{path} is not a data snapshot')
+        (header_length,) = struct.unpack_from('<Q', self._mmap, len(MAGIC))
+        start = len(MAGIC) + 8
+        self.header = json.loads(self._mmap[start:start + header_length])
+        if self.header.get('version') != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported snapshot version {self.header.get('version')}")
+        self._base = start + header_length
+
+        self._strings = _Blobs(self, self.header['strings'])
+        self.tables = {name: MappedTable(self, name, spec) for name, spec in self.header['tables'].items()}
+
+    def _array(self, offset: int, dtype: str, count: int):
+        """Zero-copy NumPy view into the map"""
+        return np.frombuffer(self._mmap, dtype=np.dtype(dtype), count=count, offset=self._base + offset)
+
+    def ndarray(self, spec: Dict):
+        """Zero-copy view of an array written by _Writer.add_ndarray"""
+        return self._array(spec['offset'], spec['dtype'], spec['count'])
+
+    def string(self, string_id: int) -> str:
+        return self._strings[string_id].decode('utf-8')
+
+
+class MappedTable:
+    """One dataset's columns inside a MappedSnapshot"""
+
+    def __init__(self, snapshot: MappedSnapshot, name: str, spec: Dict):
+        self.snapshot = snapshot
+        self.name = name
+        self.spec = spec
+        self.size = spec['rows']
+        self.fields = spec['fields']
+        self.columns = {}
+        for field, column in spec['columns'].items():
+            values = snapshot._array(column['values'], column['dtype'], self.size)
+            flags = snapshot._array(column['flags'], '|u1', self.size)
+            self.columns[field] = (column['kind'], values, flags)
+
+    def value(self, field: str, row: int):
+        """Decode one cell; raises KeyError if the row has no such key"""
+        kind, values, flags = self.columns[field]
+        flag = flags[row]
+        if flag == MISSING:
+            raise KeyError(field)
+        if flag == NULL:
+            return None
+        if kind == 'number':
+            return int(values[row]) if flag == INT_VALUE else float(values[row])
+        if kind == 'bool':
+            return bool(values[row])
+        text = self.snapshot.string(values[row])
+        return text if kind == 'str' else json.loads(text)
+
+    def has(self, field: str, row: int) -> bool:
+        column = self.columns.get(field)
+        return column is not None and column[2][row] != MISSING
+
+    def values_list(self, field: str) -> List:
+        """Every row's value of a field (None where missing), decoding each distinct string once"""
+        column = self.columns.get(field)
+        if column is None:
+            return [None] * self.size
+
+        kind, values, flags = column
+        if kind in ('str', 'json'):
+            distinct = {}
+            for string_id in np.unique(values[flags >= VALUE]).tolist():
+                text = self.snapshot.string(string_id)
+                distinct[string_id] = text if kind == 'str' else json.loads(text)
+            decoded = [distinct.get(string_id) for string_id in values.tolist()]
+        elif kind == 'number':
+            decoded = [int(v) if f == INT_VALUE else v for v, f in zip(values.tolist(), flags.tolist())]
+        else:
+            decoded = [bool(v) for v in values.tolist()]
+
+        return [value if flag >= VALUE else None for value, flag in zip(decoded, flags.tolist())]
+
+    def numeric_column(self, field: str):
+        """Float64 view of a numeric column (NaN where missing), or None"""
+        column = self.columns.get(field)
+        if column is None or column[0] != 'number':
+            return None
+        return column[1]
+
+    def rows(self) -> 'MappedRows':
+        """The rows as a sequence of views, created on access instead of one object per row up front"""
+        return MappedRows(self)
+
+    def dicts(self) -> List[Dict]:
+        """Materialize the rows as plain (mutable) dictionaries"""
+        return [row.to_dict() for row in self.rows()]
+
+    def fragments(self) -> Optional['MappedFragments']:
+        """Pre-encoded row JSON stored in the snapshot, if any"""
+        spec = self.spec.get('fragments')
+        return MappedFragments(self, _Blobs(self.snapshot, spec)) if spec else None
+
+    def text_index(self) -> Optional['MappedNgramIndex']:
+        """N-gram search index stored in the snapshot, if any"""
+        spec = self.spec.get('search')
+        return MappedNgramIndex(self.snapshot, spec) if spec else None
+
+    def store_index(self) -> Optional[Tuple[Dict, Dict]]:
+        """PropertyStore arrays (as views) and lookups stored in the snapshot, if any"""
+        spec = self.spec.get('indexes')
+        if not spec:
+            return None
+        arrays = {name: self.snapshot.ndarray(array) for name, array in spec['store']['arrays'].items()}
+        return arrays, spec['store']['lookups']
+
+    def id_index(self) -> Optional['MappedIdIndex']:
+        """Property ID -> row lookup stored in the snapshot, if any"""
+        spec = self.spec.get('indexes')
+        return MappedIdIndex(self, spec['ids']) if spec else None
+
+    def totals(self) -> Optional[Tuple[Counter, float]]:
+        """(status counts, price sum) for StatsAggregator.rebuild, if stored"""
+        spec = self.spec.get('indexes')
+        if not spec:
+            return None
+        totals = spec['totals']
+        return Counter(dict((status, count) for status, count in totals['status_counts'])), totals['price_sum']
+
+
+class MappedRows(Sequence):
+    """Read-only sequence of a MappedTable's rows; each access returns a fresh MappedRow"""
+
+    __slots__ = ('_table',)
+
+    def __init__(self, table: MappedTable):
+        self._table = table
+
+    def __len__(self) -> int:
+        return self._table.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [MappedRow(self._table, row) for row in range(*index.indices(self._table.size))]
+        if index < 0:
+            index += self._table.size
+        if not 0 <= index < self._table.size:
+            raise IndexError('row index out of range')
+        return MappedRow(self._table, int(index))
+
+    def __iter__(self) -> Iterator['MappedRow']:
+        table = self._table
+        return (MappedRow(table, row) for row in range(table.size))
+
+
+class MappedIdIndex(Mapping):
+    """Property ID -> row view, by binary search over the IDs sorted in the map"""
+
+    def __init__(self, table: MappedTable, spec: Dict):
+        self._table = table
+        self._keys = table.snapshot.ndarray(spec['keys'])
+        self._rows = table.snapshot.ndarray(spec['rows'])
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            # searchsorted truncates keys wider than the column; the compare catches it
+            index = int(np.searchsorted(self._keys, key))
+            if index < len(self._keys) and self._keys[index] == key:
+                return MappedRow(self._table, int(self._rows[index]))
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys.tolist())
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class MappedRow(Mapping):
+    """Read-only mapping over one row of a MappedTable"""
+
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table: MappedTable, row: int):
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, key):
+        if key not in self._table.columns:
+            raise KeyError(key)
+        return self._table.value(key, self._row)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key) -> bool:
+        return self._table.has(key, self._row)
+
+    def __iter__(self) -> Iterator[str]:
+        return (field for field in self._table.fields if self._table.has(field, self._row))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> Dict:
+        """Plain dict copy, for serialization"""
+        return {key: self[key] for key in self}
+
+    def __repr__(self) -> str:
+        return f'MappedRow({self.to_dict()!r})'
+
+
+class MappedFragments:
+    """JSONFragments counterpart reading the encoded rows from the map"""
+
+    def __init__(self, table: MappedTable, blobs: _Blobs):
+        self.table = table
+        self._blobs = blobs
+        self.bytes = int(blobs.offsets[-1])
+
+    def get(self, row) -> bytes:
+        if type(row) is MappedRow and row._table is self.table:
+            return self._blobs[row._row]
+        return dumps(row)
+
+    def array(self, rows) -> bytes:
+        return encode_array(self.get(row) for row in rows)
+
+
+class MappedNgramIndex:
+    """NgramIndex counterpart over the flattened postings in the map"""
+
+    def __init__(self, snapshot: MappedSnapshot, spec: Dict):
+        self.snapshot = snapshot
+        self.fields = tuple(spec['fields'])
+        self.gram_size = spec['gram_size']
+        gram_ids = snapshot._array(spec['grams'], '<u4', spec['gram_count'])
+        self.grams = {snapshot.string(string_id): i for i, string_id in enumerate(gram_ids.tolist())}
+        self._offsets = snapshot._array(spec['posting_offsets'], '<u8', spec['gram_count'] + 1)
+        self._postings = snapshot._array(spec['postings'], '<i4', int(self._offsets[-1]))
+        self._text_ids = snapshot._array(spec['texts'], '<u4', spec['documents'])
+
+    def _text(self, doc_id: int) -> str:
+        return self.snapshot.string(int(self._text_ids[doc_id]))
+
+    def search(self, query: str) -> Optional[List[int]]:
+        """Same contract as NgramIndex.search"""
+        if not query:
+            return None
+
+        query = query.lower()
+        if len(query) < self.gram_size:
+            return [doc_id for doc_id in range(len(self._text_ids)) if query in self._text(doc_id)]
+
+        grams = {query[i:i + self.gram_size] for i in range(len(query) - self.gram_size + 1)}
+        postings = []
+        for gram in grams:
+            index = self.grams.get(gram)
+            if index is None:
+                return []
+            postings.append(self._postings[int(self._offsets[index]):int(self._offsets[index + 1])])
+
+        postings.sort(key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+            if not len(candidates):
+                return []
+
+        return [doc_id for doc_id in candidates.tolist() if query in self._text(doc_id)]
+
+
+def main():
+    from data_service import DATA_FILE_PREFIXES, find_data_files
+
+    parser = argparse.ArgumentParser(description='Compile the JSON data files into a binary snapshot')
+    parser.add_argument('--data-dir', default='.', help='Directory holding the data files')
+    parser.add_argument('--output', help=f'Snapshot file (default: <data-dir>/{DEFAULT_SNAPSHOT_FILE})')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    output = args.output or os.path.join(args.data_dir, DEFAULT_SNAPSHOT_FILE)
+
+    started = time.perf_counter()
+    files = find_data_files(args.data_dir)
+    datasets = {}
+    for dataset in DATA_FILE_PREFIXES:
+        datasets[dataset] = []
+        if dataset in files:
+            with open(os.path.join(args.data_dir, files[dataset]), 'r') as f:
+                datasets[dataset] = json.load(f)
+            print(f"{dataset}: {len(datasets[dataset])} rows from {files[dataset]}")
+
+    compile_snapshot(datasets, output, sources=files)
+    print(f"Wrote {output} ({os.path.getsize(output)} bytes) in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Broker Coverage Index for USAhudHomes.com
+Maps each state to the brokers covering it, so broker lookups and lead
+routing are a dict lookup instead of a scan over every broker
+"""
+
+from typing import Dict, List, Optional
+
+
+def rank_brokers(brokers: List[Dict]) -> List[Dict]:
+    """Order brokers for lead routing: HUD-registered first, otherwise as given"""
+    return sorted(brokers, key=lambda b: not b.get('hud_registered', False))
+
+
+class BrokerIndex:
+    """State -> broker lists, in source order and pre-ranked"""
+
+    def __init__(self, brokers: Optional[List[Dict]] = None):
+        self.brokers = brokers or []
+        self.by_state: Dict[str, List[Dict]] = {}
+        for broker in self.brokers:
+            # A state listed twice must not list the broker twice
+            for state in dict.fromkeys(broker.get('coverage_states') or []):
+                self.by_state.setdefault(state, []).append(broker)
+
+        self.ranked = rank_brokers(self.brokers)
+        self.ranked_by_state = {state: rank_brokers(brokers) for state, brokers in self.by_state.items()}
+
+    def get(self, state: Optional[str] = None, ranked: bool = False) -> List[Dict]:
+        """
+        Get brokers, optionally limited to those covering a state
+
+        Returns:
+            A new list, safe for the caller to modify
+        """
+        if not state:
+            return list(self.ranked if ranked else self.brokers)
+
+        index = self.ranked_by_state if ranked else self.by_state
+        return list(index.get(state, ()))
@@ -0,0 +1,812 @@
+#!/usr/bin/env python3
+"""
+Data Service for USAhudHomes.com
+In-memory property, lead and broker data shared by the Flask apps
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+import logging
+
+from property_record import compact_properties
+from property_store import (DEFAULT_SORT, SORT_OPTIONS, PropertyStore, columnar_available,
+                            decode_cursor, encode_cursor, facet_counts, page_key, page_rows)
+from broker_index import BrokerIndex
+try:
+    from binary_snapshot import MappedSnapshot
+except ImportError:  # numpy is optional; snapshots need it
+    MappedSnapshot = None
+from geo_index import GeoIndex, load_zip_centroids
+from json_fragments import JSONFragments
+from lead_journal import LeadJournal, read_journal
+from search_index import NgramIndex
+from stats_aggregator import StatsAggregator
+
+logger = logging.getLogger(__name__)
+
+
+def property_file_prefixes():
+    """
+    Property data file prefixes, from PROPERTY_FILE_PREFIXES (comma-separated)
+
+    Defaults to the mock dataset; set e.g. nationwide_properties_ to serve the
+    generated nationwide dataset instead.
+    """
+    prefixes = os.getenv('PROPERTY_FILE_PREFIXES', 'mock_properties_').split(',')
+    return tuple(prefix.strip() for prefix in prefixes if prefix.strip()) or ('mock_properties_',)
+
+
+# Data file name prefixes per dataset; the newest file (by the timestamp in
+# its name) wins, e.g. mock_properties_20250926_230821.json
+DATA_FILE_PREFIXES = {
+    'properties': property_file_prefixes(),
+    'leads': ('mock_leads_',),
+    'brokers': ('mock_brokers_',),
+}
+
+
+def _lead_number(lead_id):
+    """Numeric suffix of a lead ID like lead-042, or 0"""
+    suffix = str(lead_id).rpartition('-')[2]
+    return int(suffix) if suffix.isdigit() else 0
+
+
+def _file_timestamp(filename):
+    """Sort key for data files: the trailing YYYYMMDD_HHMMSS, then the name"""
+    stem = filename[:-len('.json')] if filename.endswith('.json') else filename
+    return (stem[-15:], filename)
+
+
+def find_data_files(data_dir):
+    """Find the most recent data file for each dataset in a directory"""
+    files = os.listdir(data_dir)
+    latest = {}
+    for dataset, prefixes in DATA_FILE_PREFIXES.items():
+        candidates = [f for f in files if f.startswith(prefixes) and f.endswith('.json')]
+        if candidates:
+            latest[dataset] = max(candidates, key=_file_timestamp)
+    return latest
+
+
+class DataSnapshot:
+    """
+    One loaded dataset plus every index derived from it
+
+    A snapshot is fully built before DataService swaps it in, so a reader
+    holding a reference never sees a half-loaded state.
+    """
+
+    def __init__(self, properties=None, leads=None, brokers=None, files=None):
+        self.properties = properties if properties is not None else []
+        self.leads = leads if leads is not None else []
+        self.brokers = brokers if brokers is not None else []
+        # dataset -> (filename, mtime_ns, size) of the file it was loaded from
+        self.files = files or {}
+        self.properties_by_id = {}
+        self.leads_by_id = {}
+        self.text_index = NgramIndex()
+        self.property_store = None
+        # MappedTable backing the properties when loaded from a binary snapshot
+        self.property_columns = None
+        self.geo_index = GeoIndex()
+        self.property_json = JSONFragments()
+        self.broker_index = BrokerIndex()
+        self.stats = StatsAggregator()
+        self.loaded_at = None
+        self.load_seconds = 0.0
+
+    def build_property_indexes(self, use_columnar, zip_centroids=None, preserialize=True):
+        """Build the property ID lookup, search indexes, columnar store and JSON fragments"""
+        # A binary snapshot carries the ID lookup, search index, fragments and
+        # columnar store precompiled; they are read from the map, not rebuilt
+        columns = self.property_columns
+        id_index = columns.id_index() if columns is not None else None
+        if id_index is not None:
+            self.properties_by_id = id_index
+        else:
+            # First occurrence wins, matching the old linear scans
+            for prop in self.properties:
+                self.properties_by_id.setdefault(prop['property_id'], prop)
+
+        text_index = columns.text_index() if columns is not None else None
+        if text_index is not None:
+            self.text_index = text_index
+        else:
+            self.text_index.build(self.properties)
+
+        self.geo_index = GeoIndex(self.properties, zip_centroids, columns=columns)
+        if preserialize:
+            fragments = columns.fragments() if columns is not None else None
+            self.property_json = fragments if fragments is not None else JSONFragments(self.properties)
+
+        if use_columnar:
+            try:
+                self.property_store = PropertyStore(self.properties, columns=columns)
+            except Exception as e:
+                logger.error(f"Error building columnar property store, using list filtering: {e}")
+
+    def reuse_property_indexes(self, other):
+        """Share property indexes with a snapshot holding the same property list"""
+        self.properties_by_id = other.properties_by_id
+        self.text_index = other.text_index
+        self.property_columns = other.property_columns
+        self.geo_index = other.geo_index
+        self.property_json = other.property_json
+        self.property_store = other.property_store
+
+    def build_broker_index(self):
+        """Build the state -> brokers coverage index"""
+        self.broker_index = BrokerIndex(self.brokers)
+
+    def build_lead_indexes(self):
+        """Build the lead ID lookup and recount the dashboard stats"""
+        self.leads_by_id = {}
+        for lead in self.leads:
+            self.leads_by_id.setdefault(lead['lead_id'], lead)
+
+        totals = self.property_columns.totals() if self.property_columns is not None else None
+        self.stats.rebuild(self.properties, self.leads, self.brokers, property_totals=totals)
+
+    @property
+    def bytes_loaded(self):
+        return sum(size for _, _, size in self.files.values())
+
+
+class DataService:
+    def __init__(self, use_columnar: bool = True, verify_stats: bool = None, data_dir: str = '.',
+                 journal_path: str = None, compact_records: bool = True, preserialize: bool = True,
+                 snapshot_path: str = None):
+        """
+        Load the data and start the lead journal
+
+        Args:
+            use_columnar: Use the NumPy property store when available
+            verify_stats: Cross-check incremental stats (default: VERIFY_STATS env var)
+            data_dir: Directory holding the data files
+            journal_path: Lead journal file (default: LEAD_JOURNAL_FILE env var;
+                          empty or unset keeps leads in memory only)
+            compact_records: Hold properties as slotted PropertyRecords instead of dicts
+            preserialize: Encode each property's JSON once per load
+            snapshot_path: Binary snapshot (see binary_snapshot.py) to map instead of
+                           parsing the JSON files (default: DATA_SNAPSHOT_FILE env var)
+        """
+        self.data_dir = data_dir
+        self.compact_records = compact_records
+        self.preserialize = preserialize
+        if snapshot_path is None:
+            snapshot_path = os.getenv('DATA_SNAPSHOT_FILE', '')
+        if snapshot_path and MappedSnapshot is None:
+            logger.error("numpy is required for binary snapshots, loading the JSON files instead")
+            snapshot_path = ''
+        self.snapshot_path = snapshot_path
+        self.use_columnar = use_columnar and columnar_available()
+        # Debug switch: cross-check the incremental stats against a full recompute
+        if verify_stats is None:
+            verify_stats = os.getenv('VERIFY_STATS', '').lower() in ('1', 'true', 'yes')
+        self.verify_stats = verify_stats
+
+        self.snapshot = DataSnapshot()
+        self._write_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._added_leads = []
+        # lead_id -> (status, updated_at) for status changes made at runtime
+        self._lead_status = {}
+        self._next_lead_number = 1
+        # dataset -> signature of a file that failed to parse, so an unchanged
+        # broken file is not re-read on every poll
+        self._failed_files = {}
+        self.reload_count = 0
+        # Bumped on every snapshot swap; response caches key on it
+        self.data_version = 0
+        self.last_reload_error = None
+        self._watcher = None
+        self._watcher_interval = None
+        self._stop_watcher = threading.Event()
+        self.zip_centroids = self._load_zip_centroids()
+
+        if journal_path is None:
+            journal_path = os.getenv('LEAD_JOURNAL_FILE', '')
+        self.lead_journal = None
+        if journal_path:
+            self._replay_journal(journal_path)
+            try:
+                self.lead_journal = LeadJournal(journal_path)
+            except OSError as e:
+                logger.error(f"Error opening lead journal {journal_path}, new leads will not persist: {e}")
+
+        self.load_mock_data()
+
+    # Readers go through the current snapshot; take one reference per request
+    @property
+    def properties(self):
+        return self.snapshot.properties
+
+    @property
+    def leads(self):
+        return self.snapshot.leads
+
+    @property
+    def brokers(self):
+        return self.snapshot.brokers
+
+    def _load_zip_centroids(self):
+        """Load the ZIP centroid table used to geocode properties, if one is present"""
+        path = os.getenv('ZIP_CENTROIDS_FILE') or os.path.join(self.data_dir, 'zip_centroids.csv')
+        if not os.path.exists(path):
+            logger.info(f"No ZIP centroid file at {path}; geo search covers properties with coordinates only")
+            return {}
+        try:
+            return load_zip_centroids(path)
+        except Exception as e:
+            logger.error(f"Error loading ZIP centroids from {path}: {e}")
+            return {}
+
+    def _replay_journal(self, path):
+        """Restore the leads and status changes recorded in the lead journal"""
+        records = 0
+        added_ids = set()
+        for record in read_journal(path):
+            records += 1
+            if record.get('op') == 'add' and isinstance(record.get('lead'), dict):
+                lead_id = record['lead'].get('lead_id')
+                if lead_id in added_ids:
+                    # Written by two workers before IDs were allocated across processes
+                    logger.warning(f"Dropping duplicate journaled lead {lead_id}")
+                    continue
+                added_ids.add(lead_id)
+                self._added_leads.append(record['lead'])
+            elif record.get('op') == 'status' and record.get('lead_id'):
+                self._lead_status[record['lead_id']] = (record.get('status'), record.get('updated_at'))
+
+        if records:
+            # Seed the initial snapshot so the leads survive even without a lead file
+            self.snapshot.leads.extend(self._added_leads)
+            self._apply_lead_status(self.snapshot.leads)
+            logger.info(f"Replayed {records} lead journal records from {path} "
+                        f"({len(self._added_leads)} leads, {len(self._lead_status)} status changes)")
+
+    def _apply_lead_status(self, leads):
+        """Re-apply runtime status changes to freshly loaded leads"""
+        if not self._lead_status:
+            return
+        for lead in leads:
+            change = self._lead_status.get(lead['lead_id'])
+            if change is not None:
+                lead['status'], lead['updated_at'] = change
+
+    def _journal(self, record):
+        """Queue a journal record; returns the sequence number to wait on, or None"""
+        if self.lead_journal is None:
+            return None
+        try:
+            return self.lead_journal.append(record)
+        except RuntimeError as e:
+            logger.error(f"Lead journal unavailable: {e}")
+            return None
+
+    def find_data_files(self):
+        """Find the most recent data file for each dataset"""
+        return find_data_files(self.data_dir)
+
+    def _scan_data_files(self):
+        """
+        Signature (filename, mtime_ns, size) of the file each dataset loads from
+
+        With a binary snapshot configured, every dataset loads from it.
+        """
+        if self.snapshot_path and os.path.exists(self.snapshot_path):
+            stat = os.stat(self.snapshot_path)
+            signature = (os.path.basename(self.snapshot_path), stat.st_mtime_ns, stat.st_size)
+            return {dataset: signature for dataset in DATA_FILE_PREFIXES}
+
+        signatures = {}
+        for dataset, filename in self.find_data_files().items():
+            stat = os.stat(os.path.join(self.data_dir, filename))
+            signatures[dataset] = (filename, stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    def _read_dataset(self, dataset, filename, mapped):
+        """
+        Read one dataset from its JSON file or the mapped binary snapshot
+
+        Args:
+            mapped: Dict caching the MappedSnapshot opened during this load
+
+        Returns:
+            (rows, MappedTable for zero-copy columns or None)
+        """
+        if self.snapshot_path and filename == os.path.basename(self.snapshot_path):
+            if 'snapshot' not in mapped:
+                mapped['snapshot'] = MappedSnapshot(self.snapshot_path)
+            table = mapped['snapshot'].tables.get(dataset)
+            if table is None:
+                return [], None
+            # Properties stay in the shared map; leads are mutated and brokers are few
+            if dataset == 'properties':
+                return table.rows(), table
+            return table.dicts(), None
+
+        with open(os.path.join(self.data_dir, filename), 'r') as f:
+            rows = json.load(f)
+        if dataset == 'properties' and self.compact_records:
+            rows = compact_properties(rows)
+        return rows, None
+
+    def load_mock_data(self, force: bool = True):
+        """
+        Load mock data from JSON files into a new snapshot and swap it in
+
+        Datasets whose file is unchanged keep their existing data and indexes.
+        A file that fails to parse (e.g. still being written) keeps the old
+        data for that dataset and is retried once it changes again.
+
+        Args:
+            force: Rebuild even if no data file changed
+
+        Returns:
+            True if a new snapshot was swapped in
+        """
+        with self._reload_lock:
+            started = time.perf_counter()
+            current = self.snapshot
+
+            try:
+                signatures = self._scan_data_files()
+            except OSError as e:
+                logger.error(f"Error scanning data files: {e}")
+                self.last_reload_error = str(e)
+                return False
+
+            known = dict(current.files)
+            if not force:
+                known.update(self._failed_files)
+                if signatures == known:
+                    return False
+
+            data = {}
+            files = {}
+            errors = []
+            mapped = {}
+            property_columns = None
+            for dataset in DATA_FILE_PREFIXES:
+                signature = signatures.get(dataset)
+                if signature is not None and signature != known.get(dataset):
+                    try:
+                        data[dataset], columns = self._read_dataset(dataset, signature[0], mapped)
+                        if dataset == 'properties':
+                            property_columns = columns
+                        files[dataset] = signature
+                        self._failed_files.pop(dataset, None)
+                        logger.info(f"Loaded {len(data[dataset])} {dataset} from {signature[0]}")
+                        continue
+                    except Exception as e:
+                        logger.error(f"Error loading mock data from {signature[0]}: {e}")
+                        errors.append(f"{signature[0]}: {e}")
+                        self._failed_files[dataset] = signature
+
+                # Unchanged, missing or unreadable: keep what is loaded now
+                data[dataset] = getattr(current, dataset)
+                if dataset in current.files:
+                    files[dataset] = current.files[dataset]
+
+            if errors:
+                self.last_reload_error = '; '.join(errors)
+            if not force and files == current.files:
+                return False
+
+            snapshot = DataSnapshot(data['properties'], data['leads'], data['brokers'], files)
+            snapshot.property_columns = property_columns
+
+            # The expensive part happens off the request path and outside the
+            # write lock; readers keep using the current snapshot meanwhile
+            if snapshot.properties is current.properties:
+                snapshot.reuse_property_indexes(current)
+            else:
+                snapshot.build_property_indexes(self.use_columnar, self.zip_centroids, self.preserialize)
+            snapshot.build_broker_index()
+
+            with self._write_lock:
+                # Leads created at runtime survive a reload of the lead file
+                if snapshot.leads is not current.leads:
+                    known = {lead['lead_id'] for lead in snapshot.leads}
+                    snapshot.leads.extend(l for l in self._added_leads if l['lead_id'] not in known)
+                    self._apply_lead_status(snapshot.leads)
+
+                snapshot.build_lead_indexes()
+                # Never hand out an ID already present, whatever the loaded file contains
+                self._next_lead_number = max(
+                    [self._next_lead_number] + [_lead_number(l['lead_id']) + 1 for l in snapshot.leads]
+                )
+                snapshot.loaded_at = datetime.now().isoformat()
+                snapshot.load_seconds = time.perf_counter() - started
+                self.snapshot = snapshot
+                self.data_version += 1
+
+            self.reload_count += 1
+            if not errors:
+                self.last_reload_error = None
+            logger.info(f"Data snapshot swapped in after {snapshot.load_seconds:.3f}s "
+                        f"({len(snapshot.properties)} properties, {len(snapshot.leads)} leads, "
+                        f"{len(snapshot.brokers)} brokers)")
+            return True
+
+    def start_watcher(self, interval: float = 30):
+        """Poll the data directory in a background thread and hot-reload changed files"""
+        if self._watcher is not None:
+            return
+
+        def watch():
+            while not self._stop_watcher.wait(interval):
+                try:
+                    self.load_mock_data(force=False)
+                except Exception as e:
+                    logger.error(f"Error reloading data: {e}")
+                    self.last_reload_error = str(e)
+
+        self._watcher_interval = interval
+        self._stop_watcher.clear()
+        self._watcher = threading.Thread(target=watch, name='data-reload-watcher', daemon=True)
+        self._watcher.start()
+        logger.info(f"Watching {os.path.abspath(self.data_dir)} for data changes every {interval}s")
+
+    def stop_watcher(self):
+        """Stop the background reload watcher"""
+        if self._watcher is None:
+            return
+        self._stop_watcher.set()
+        self._watcher.join()
+        self._watcher = None
+
+    def close(self):
+        """Stop the reload watcher and flush the lead journal"""
+        self.stop_watcher()
+        if self.lead_journal is not None:
+            self.lead_journal.close()
+            self.lead_journal = None
+
+    def reload_status(self):
+        """Describe the current snapshot for /api/health"""
+        snapshot = self.snapshot
+        return {
+            'loaded_at': snapshot.loaded_at,
+            'load_seconds': round(snapshot.load_seconds, 4),
+            'bytes': snapshot.bytes_loaded,
+            'files': {dataset: signature[0] for dataset, signature in snapshot.files.items()},
+            'reload_count': self.reload_count,
+            'data_version': self.data_version,
+            'geocoded_properties': snapshot.geo_index.located,
+            'last_error': self.last_reload_error,
+            'watch_interval': self._watcher_interval if self._watcher is not None else None
+        }
+
+    def search_properties(self, query=None, state=None, min_price=None, max_price=None,
+                         bedrooms=None, bathrooms=None, status=None, geo=None, sort=DEFAULT_SORT, limit=50):
+        """Search properties with filters"""
+        return self.search_properties_page(
+            query=query, state=state, min_price=min_price, max_price=max_price,
+            bedrooms=bedrooms, bathrooms=bathrooms, status=status, geo=geo, sort=sort, limit=limit
+        )['properties']
+
+    def search_properties_page(self, query=None, state=None, min_price=None, max_price=None,
+                               bedrooms=None, bathrooms=None, status=None, geo=None,
+                               sort=DEFAULT_SORT, limit=50, cursor=None):
+        """
+        Search properties with filters and keyset pagination
+
+        The cursor carries the sort value and property_id of the last row of
+        the previous page, so every page costs the same as the first.
+
+        Args:
+            geo: GeoQuery radius/bounding-box filter
+
+        Returns:
+            Dict with the page of properties, the total match count and the
+            cursor for the next page (None on the last page)
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        after = decode_cursor(cursor, sort) if cursor else None
+        field, reverse = SORT_OPTIONS[sort]
+        snapshot = self.snapshot
+        matches = self._match_rows(snapshot, query, geo)
+
+        if snapshot.property_store is not None:
+            properties, total, has_more = snapshot.property_store.search(
+                matches=matches, state=state, min_price=min_price, max_price=max_price,
+                bedrooms=bedrooms, bathrooms=bathrooms, status=status, sort=sort, limit=limit,
+                after=after
+            )
+        else:
+            filtered_properties = self._filter_properties(
+                snapshot, matches, state=state, min_price=min_price, max_price=max_price,
+                bedrooms=bedrooms, bathrooms=bathrooms, status=status
+            )
+            total = len(filtered_properties)
+            properties, has_more = page_rows(filtered_properties, field, reverse, limit, after)
+
+        next_cursor = None
+        if has_more and properties:
+            last = properties[-1]
+            next_cursor = encode_cursor(sort, last.get(field), last['property_id'])
+
+        return {'properties': properties, 'total': total, 'next_cursor': next_cursor}
+
+    def iter_properties(self, query=None, state=None, min_price=None, max_price=None,
+                        bedrooms=None, bathrooms=None, status=None, geo=None, sort=DEFAULT_SORT):
+        """
+        Yield every property matching the filters, in sort order (for exports)
+
+        Only row indices are materialized; rows are produced one at a time
+        from the snapshot current when iteration starts.
+        """
+        field, reverse = SORT_OPTIONS[sort]
+        snapshot = self.snapshot
+        matches = self._match_rows(snapshot, query, geo)
+        store = snapshot.property_store
+
+        if store is not None:
+            mask = store.filter_mask(matches=matches, state=state, min_price=min_price,
+                                     max_price=max_price, bedrooms=bedrooms,
+                                     bathrooms=bathrooms, status=status)
+            indices = mask.nonzero()[0]
+            properties = snapshot.properties
+            for i in store.ordered(indices, sort, limit=len(indices)):
+                yield properties[i]
+            return
+
+        filtered_properties = self._filter_properties(
+            snapshot, matches, state=state, min_price=min_price, max_price=max_price,
+            bedrooms=bedrooms, bathrooms=bathrooms, status=status
+        )
+        yield from sorted(filtered_properties, key=page_key(field, reverse), reverse=reverse)
+
+    def property_facets(self, query=None, state=None, min_price=None, max_price=None,
+                        bedrooms=None, bathrooms=None, status=None, geo=None):
+        """
+        Count the properties matching the filters per state, status, bedroom
+        bucket and price band
+
+        Returns:
+            Dict with the total match count and the facet counts
+        """
+        snapshot = self.snapshot
+        matches = self._match_rows(snapshot, query, geo)
+        store = snapshot.property_store
+
+        if store is not None:
+            mask = store.filter_mask(matches=matches, state=state, min_price=min_price,
+                                     max_price=max_price, bedrooms=bedrooms,
+                                     bathrooms=bathrooms, status=status)
+            return {'total': int(mask.sum()), 'facets': store.facet_counts(mask)}
+
+        filtered_properties = self._filter_properties(
+            snapshot, matches, state=state, min_price=min_price, max_price=max_price,
+            bedrooms=bedrooms, bathrooms=bathrooms, status=status
+        )
+        return {'total': len(filtered_properties), 'facets': facet_counts(filtered_properties)}
+
+    def geo_search_available(self):
+        """True if any property has coordinates, its own or its ZIP's centroid"""
+        return self.snapshot.geo_index.located > 0
+
+    @staticmethod
+    def _match_rows(snapshot, query=None, geo=None):
+        """
+        Row positions (in file order) matching the free-text and geo filters
+
+        Free-text matches come from the n-gram index and geo matches from the
+        grid index; None means neither filter was given.
+        """
+        matches = snapshot.text_index.search(query) if query else None
+        if geo is not None:
+            nearby = snapshot.geo_index.search(geo)
+            matches = nearby if matches is None else sorted(set(matches).intersection(nearby))
+        return matches
+
+    def _filter_properties(self, snapshot, matches, state=None, min_price=None, max_price=None,
+                           bedrooms=None, bathrooms=None, status=None):
+        """List-based filtering, used when the columnar store is unavailable"""
+        if matches is not None:
+            filtered_properties = [snapshot.properties[i] for i in matches]
+        else:
+            filtered_properties = snapshot.properties
+
+        # Apply filters
+        if state:
+            filtered_properties = [p for p in filtered_properties if p['state'] == state]
+
+        if min_price is not None:
+            filtered_properties = [p for p in filtered_properties if p['price'] >= min_price]
+
+        if max_price is not None:
+            filtered_properties = [p for p in filtered_properties if p['price'] <= max_price]
+
+        if bedrooms is not None:
+            filtered_properties = [p for p in filtered_properties if p['bedrooms'] >= bedrooms]
+
+        if bathrooms is not None:
+            filtered_properties = [p for p in filtered_properties if p['bathrooms'] >= bathrooms]
+
+        if status:
+            filtered_properties = [p for p in filtered_properties if p['status'] == status]
+
+        return filtered_properties
+
+    def get_property_by_id(self, property_id):
+        """Get a specific property by ID"""
+        return self.snapshot.properties_by_id.get(property_id)
+
+    def property_json(self, prop):
+        """Encoded JSON bytes of a property returned by this service"""
+        return self.snapshot.property_json.get(prop)
+
+    def properties_json(self, properties):
+        """Encoded JSON array of properties returned by this service"""
+        return self.snapshot.property_json.array(properties)
+
+    def get_properties_by_ids(self, property_ids):
+        """Get several properties by ID, in request order, plus the IDs not found"""
+        properties_by_id = self.snapshot.properties_by_id
+        found = []
+        not_found = []
+        for property_id in property_ids:
+            prop = properties_by_id.get(property_id)
+            if prop is None:
+                not_found.append(property_id)
+            else:
+                found.append(prop)
+        return found, not_found
+
+    def add_lead(self, lead_data):
+        """
+        Add a new lead
+
+        The ID comes from a counter under the write lock, reserved through the
+        journal's shared ID file, so concurrent requests and worker processes
+        never collide. The lead is journaled before returning; the
+        fsync is shared with every other lead written meanwhile.
+        """
+        lead, sequence = self._insert_lead(lead_data)
+        if sequence is not None:
+            self.lead_journal.wait(sequence)
+        return lead
+
+    async def add_lead_async(self, lead_data):
+        """add_lead for async callers: awaits the journal fsync instead of blocking a thread"""
+        lead, sequence = self._insert_lead(lead_data)
+        if sequence is not None:
+            await self.lead_journal.wait_async(sequence)
+        return lead
+
+    def _insert_lead(self, lead_data):
+        """Add a lead in memory and queue its journal record; returns (lead, sequence or None)"""
+        with self._write_lock:
+            snapshot = self.snapshot
+            number = self._next_lead_number
+            if self.lead_journal is not None:
+                # Other worker processes append to the same journal
+                number = self.lead_journal.allocate_number(number)
+            self._next_lead_number = number + 1
+            lead_id = f"lead-{number:03d}"
+            lead = {
+                "lead_id": lead_id,
+                "name": lead_data.get('name'),
+                "email": lead_data.get('email'),
+                "phone": lead_data.get('phone'),
+                "state_of_interest": lead_data.get('state', 'NC'),
+                "property_id": lead_data.get('propertyId'),
+                "status": "New",
+                "created_at": datetime.now().isoformat(),
+                "notes": f"Interested in property {lead_data.get('propertyId', 'general inquiry')}"
+            }
+
+            snapshot.leads.append(lead)
+            snapshot.leads_by_id.setdefault(lead_id, lead)
+            snapshot.stats.lead_added(lead)
+            self._added_leads.append(lead)
+            # Queued under the lock so the journal keeps write order
+            sequence = self._journal({'op': 'add', 'lead': lead})
+
+        logger.info(f"Added new lead: {lead_id}")
+        return lead, sequence
+
+    def get_leads(self, status=None, limit=50):
+        """Get leads with optional status filter"""
+        return self.get_leads_page(status=status, limit=limit)['leads']
+
+    def get_leads_page(self, status=None, limit=50, cursor=None):
+        """
+        Get leads, most recent first, with keyset pagination on (created_at, lead_id)
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        after = decode_cursor(cursor, 'newest') if cursor else None
+        filtered_leads = self.snapshot.leads
+
+        if status and status != 'all':
+            filtered_leads = [l for l in filtered_leads if l['status'].lower() == status.lower()]
+
+        leads, has_more = page_rows(filtered_leads, 'created_at', reverse=True, limit=limit,
+                                    after=after, id_field='lead_id')
+
+        next_cursor = None
+        if has_more and leads:
+            next_cursor = encode_cursor('newest', leads[-1].get('created_at'), leads[-1]['lead_id'])
+
+        return {'leads': leads, 'total': len(filtered_leads), 'next_cursor': next_cursor}
+
+    def iter_leads(self, status=None):
+        """Yield leads, most recent first, optionally filtered by status (for exports)"""
+        filtered_leads = self.snapshot.leads
+
+        if status and status != 'all':
+            filtered_leads = [l for l in filtered_leads if l['status'].lower() == status.lower()]
+
+        yield from sorted(filtered_leads, key=page_key('created_at', True, 'lead_id'), reverse=True)
+
+    def update_lead_status(self, lead_id, new_status):
+        """Update lead status"""
+        lead, sequence = self._set_lead_status(lead_id, new_status)
+        if sequence is not None:
+            self.lead_journal.wait(sequence)
+        return lead
+
+    async def update_lead_status_async(self, lead_id, new_status):
+        """update_lead_status for async callers: awaits the journal fsync instead of blocking a thread"""
+        lead, sequence = self._set_lead_status(lead_id, new_status)
+        if sequence is not None:
+            await self.lead_journal.wait_async(sequence)
+        return lead
+
+    def _set_lead_status(self, lead_id, new_status):
+        """Update a lead in memory and queue its journal record; returns (lead or None, sequence or None)"""
+        with self._write_lock:
+            snapshot = self.snapshot
+            lead = snapshot.leads_by_id.get(lead_id)
+            if lead is None:
+                return None, None
+
+            old_status = lead['status']
+            lead['status'] = new_status
+            lead['updated_at'] = datetime.now().isoformat()
+            snapshot.stats.lead_status_changed(old_status, new_status)
+            self._lead_status[lead_id] = (new_status, lead['updated_at'])
+            sequence = self._journal({'op': 'status', 'lead_id': lead_id,
+                                      'status': new_status, 'updated_at': lead['updated_at']})
+
+        logger.info(f"Updated lead {lead_id} status to {new_status}")
+        return lead, sequence
+
+    def get_brokers(self, state=None, ranked=False):
+        """Get brokers, optionally filtered by state coverage and ranked HUD-registered first"""
+        return self.snapshot.broker_index.get(state, ranked=ranked)
+
+    def get_brokers_for_lead(self, lead_id):
+        """Get the ranked brokers covering a lead's state, for lead routing"""
+        snapshot = self.snapshot
+        lead = snapshot.leads_by_id.get(lead_id)
+        if lead is None:
+            return None
+        return snapshot.broker_index.get(lead.get('state_of_interest'), ranked=True)
+
+    def get_stats(self):
+        """Get dashboard statistics from the incrementally maintained counters"""
+        snapshot = self.snapshot
+
+        if not self.verify_stats:
+            return snapshot.stats.snapshot()
+
+        with self._write_lock:
+            stats = snapshot.stats.snapshot()
+            expected = StatsAggregator.compute(snapshot.properties, snapshot.leads, snapshot.brokers)
+            if stats != expected:
+                logger.error(f"Stats counters drifted from full recompute: {stats} != {expected}")
+                snapshot.stats.rebuild(snapshot.properties, snapshot.leads, snapshot.brokers)
+                stats = expected
+
+        return stats
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Bulk Export Streaming for USAhudHomes.com
+Streams property and lead rows as NDJSON or CSV so exports of any size are
+sent row by row instead of being built as one JSON document in memory
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from flask import Response
+
+from property_record import json_default
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+# CSV columns; NDJSON rows carry every field as stored
+PROPERTY_EXPORT_FIELDS = [
+    'property_id', 'address', 'city', 'state', 'zip_code', 'county', 'price',
+    'bedrooms', 'bathrooms', 'sq_ft', 'status', 'listing_period', 'listing_source',
+    'bid_open_date', 'bid_deadline', 'created_at', 'updated_at'
+]
+
+LEAD_EXPORT_FIELDS = [
+    'lead_id', 'name', 'email', 'phone', 'state_of_interest', 'property_id',
+    'status', 'created_at', 'updated_at', 'notes'
+]
+
+# Rows per chunk handed to the WSGI server; bounds memory and per-yield overhead
+ROWS_PER_CHUNK = 500
+
+
+def _encode_row(row: Dict) -> bytes:
+    return json.dumps(row, default=json_default).encode('utf-8')
+
+
+def ndjson_chunks(rows: Iterable[Dict], rows_per_chunk: int = ROWS_PER_CHUNK,
+                  encode: Optional[Callable[[Dict], bytes]] = None) -> Iterator[bytes]:
+    """
+    Yield rows as newline-delimited JSON, a chunk of rows at a time
+
+    Args:
+        encode: Row -> JSON bytes, e.g. a lookup of pre-encoded rows
+    """
+    encode = encode or _encode_row
+    chunk = []
+    for row in rows:
+        chunk.append(encode(row))
+        if len(chunk) >= rows_per_chunk:
+            yield b'\n'.join(chunk) + b'\n'
+            chunk = []
+    if chunk:
+        yield b'\n'.join(chunk) + b'\n'
+
+
+def csv_chunks(rows: Iterable[Dict], fields: List[str],
+               rows_per_chunk: int = ROWS_PER_CHUNK) -> Iterator[str]:
+    """Yield rows as CSV with a header line, a chunk of rows at a time"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction='ignore')
+    writer.writeheader()
+
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % rows_per_chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    remaining = buffer.getvalue()
+    if remaining:
+        yield remaining
+
+
+def export_chunks(rows: Iterable[Dict], export_format: str, fields: List[str],
+                  encode: Optional[Callable[[Dict], bytes]] = None) -> Iterator:
+    """Rows as CSV (str) or NDJSON (bytes) chunks for the given format"""
+    if export_format == 'csv':
+        return csv_chunks(rows, fields)
+    return ndjson_chunks(rows, encode=encode)
+
+
+def export_filename(name: str, export_format: str) -> str:
+    """Download file name, timestamped so repeated exports don't overwrite each other"""
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return f"{name}_{timestamp}.{export_format}"
+
+
+def export_response(rows: Iterable[Dict], export_format: str, fields: List[str], name: str,
+                    encode: Optional[Callable[[Dict], bytes]] = None) -> Response:
+    """
+    Build a streaming download response
+
+    Args:
+        rows: Row iterator; consumed lazily while the response is sent
+        export_format: Key of EXPORT_FORMATS
+        fields: CSV columns
+        name: Base name for the download file
+        encode: NDJSON row encoder (default: json.dumps)
+    """
+    body = export_chunks(rows, export_format, fields, encode=encode)
+    response = Response(body, mimetype=EXPORT_FORMATS[export_format])
+    response.headers['Content-Disposition'] = f'attachment; filename="{export_filename(name, export_format)}"'
+    return response
@@ -11,20 +11,28 @@ import logging
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 import os
+import time
+
+from broker_index import rank_brokers
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class FirebaseService:
-    def __init__(self, credentials_path: str = None):
+    def __init__(self, credentials_path: str = None, broker_cache_ttl: float = 300):
         """
         Initialize Firebase service
         
         Args:
             credentials_path: Path to Firebase service account credentials JSON file
+            broker_cache_ttl: Seconds a state's broker list is served from memory
+                              before Firestore is queried again (0 disables)
         """
         self.db = None
+        self.broker_cache_ttl = broker_cache_ttl
+        self._brokers_by_state = {}  # state -> (expires_at, brokers)
+        self._broker_generation = 0  # bumped on every broker write
         self.initialize_firebase(credentials_path)
     
     def initialize_firebase(self, credentials_path: str = None):
@@ -252,6 +260,7 @@ class FirebaseService:
             broker_data['updated_at'] = datetime.now()
             
             self.db.collection('brokers').document(broker_id).set(broker_data)
+            self._invalidate_broker_cache()
             logger.info(f"Broker {broker_id} added successfully")
             return True
             
@@ -259,16 +268,47 @@ class FirebaseService:
             logger.error(f"Error adding broker: {e}")
             return False
     
-    def get_brokers_by_state(self, state: str) -> List[Dict]:
+    def _invalidate_broker_cache(self):
+        """
+        Forget every cached state's brokers
+        
+        The whole cache goes, not just the written broker's new states: a
+        broker that dropped a state must stop being returned for it, and its
+        old coverage isn't known without another read.
+        """
+        self._broker_generation += 1
+        self._brokers_by_state.clear()
+    
+    def get_brokers_by_state(self, state: str, ranked: bool = False) -> List[Dict]:
         """
         Get brokers that cover a specific state
         
+        Served from an in-memory per-state cache while it is fresh, so routing
+        many leads for the same state costs one Firestore query.
+        
         Args:
             state: State code
+            ranked: Order HUD-registered brokers first (lead routing order)
             
         Returns:
             List of broker dictionaries
         """
+        cached = self._brokers_by_state.get(state)
+        if cached and cached[0] > time.monotonic():
+            brokers = cached[1]
+        else:
+            generation = self._broker_generation
+            brokers = self._query_brokers_by_state(state)
+            if brokers is None:
+                return []
+            # A broker written during the query may be missing from its result
+            if self.broker_cache_ttl > 0 and generation == self._broker_generation:
+                self._brokers_by_state[state] = (time.monotonic() + self.broker_cache_ttl, brokers)
+        
+        return rank_brokers(brokers) if ranked else list(brokers)
+    
+    def _query_brokers_by_state(self, state: str) -> Optional[List[Dict]]:
+        """Query Firestore for a state's brokers; None on error so failures are not cached"""
         try:
             query = self.db.collection('brokers').where('coverage_states', 'array_contains', state)
             docs = query.stream()
@@ -284,7 +324,7 @@ class FirebaseService:
             
         except Exception as e:
             logger.error(f"Error getting brokers for state {state}: {e}")
-            return []
+            return None
     
     # Referral Management
     def create_referral(self, lead_id: str, broker_id: str, property_id: str = None) -> Optional[str]:
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Geospatial Property Index for USAhudHomes.com
+Places properties on a uniform lat/lng grid so radius and bounding-box
+searches only check the rows in nearby cells
+"""
+
+import csv
+import logging
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - list fallback is used instead
+    np = None
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_MILES = 3958.8
+
+# Grid cell size; 0.5 degrees is ~35 miles of latitude, so a typical
+# "within 20 miles" search touches 4-9 cells
+GRID_CELL_DEGREES = 0.5
+
+MAX_RADIUS_MILES = 500
+
+# Accepted column names in a ZIP centroid file (simple CSV or the Census
+# ZCTA gazetteer, which is tab-separated with GEOID/INTPTLAT/INTPTLONG)
+ZIP_COLUMNS = ('zip', 'zip_code', 'zipcode', 'zcta5', 'geoid')
+LAT_COLUMNS = ('lat', 'latitude', 'intptlat')
+LNG_COLUMNS = ('lng', 'lon', 'long', 'longitude', 'intptlong')
+
+
+@dataclass(frozen=True)
+class GeoQuery:
+    """Radius and/or bounding-box filter; frozen so it can be part of a cache key"""
+    lat: Optional[float] = None
+    lng: Optional[float] = None
+    radius_miles: Optional[float] = None
+    # (min_lat, min_lng, max_lat, max_lng)
+    bbox: Optional[Tuple[float, float, float, float]] = None
+
+
+def parse_geo_args(lat: Optional[float] = None, lng: Optional[float] = None,
+                   radius_miles: Optional[float] = None, bbox: Optional[str] = None) -> Optional[GeoQuery]:
+    """
+    Validate the geo search parameters
+
+    Args:
+        lat, lng, radius_miles: Radius search; all three or none
+        bbox: "min_lat,min_lng,max_lat,max_lng"
+
+    Returns:
+        GeoQuery, or None if no geo parameter was given
+
+    Raises:
+        ValueError: If the parameters are incomplete or out of range
+    """
+    radius = (lat, lng, radius_miles)
+    if all(value is None for value in radius) and not bbox:
+        return None
+
+    if any(value is not None for value in radius):
+        if any(value is None for value in radius):
+            raise ValueError('lat, lng and radius_miles must be given together')
+        if not -90 <= lat <= 90 or not -180 <= lng <= 180:
+            raise ValueError('lat must be within [-90, 90] and lng within [-180, 180]')
+        if not 0 < radius_miles <= MAX_RADIUS_MILES:
+            raise ValueError(f'radius_miles must be greater than 0 and at most {MAX_RADIUS_MILES}')
+
+    box = None
+    if bbox:
+        try:
+            box = tuple(float(value) for value in bbox.split(','))
+        except ValueError:
+            box = ()
+        if len(box) != 4:
+            raise ValueError('bbox must be min_lat,min_lng,max_lat,max_lng')
+        min_lat, min_lng, max_lat, max_lng = box
+        if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lng <= max_lng <= 180):
+            raise ValueError('bbox must be min_lat,min_lng,max_lat,max_lng with min <= max')
+
+    return GeoQuery(lat=lat, lng=lng, radius_miles=radius_miles, bbox=box)
+
+
+def load_zip_centroids(path: str) -> Dict[str, Tuple[float, float]]:
+    """
+    Load a ZIP code -> (lat, lng) table from a CSV or tab-separated file
+
+    Args:
+        path: File with a header row naming ZIP, latitude and longitude columns
+
+    Returns:
+        Dict keyed by 5-digit ZIP code
+    """
+    with open(path, 'r', newline='') as f:
+        delimiter = '\t' if '\t' in f.readline() else ','
+        f.seek(0)
+        reader = csv.reader(f, delimiter=delimiter)
+        header = [name.strip().lower() for name in next(reader, [])]
+
+        def column(names):
+            for name in names:
+                if name in header:
+                    return header.index(name)
+            raise ValueError(f'{path}: no column named any of {", ".join(names)}')
+
+        zip_col, lat_col, lng_col = column(ZIP_COLUMNS), column(LAT_COLUMNS), column(LNG_COLUMNS)
+
+        centroids = {}
+        for row in reader:
+            try:
+                centroids[row[zip_col].strip().zfill(5)] = (float(row[lat_col]), float(row[lng_col]))
+            except (IndexError, ValueError):
+                continue
+
+    logger.info(f"Loaded {len(centroids)} ZIP centroids from {path}")
+    return centroids
+
+
+def _coordinate(value) -> Optional[float]:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+def property_coordinates(prop: Dict, zip_centroids: Optional[Dict] = None) -> Optional[Tuple[float, float]]:
+    """Coordinates stored on the property, else its ZIP centroid, else None"""
+    lat = _coordinate(prop.get('latitude'))
+    lng = _coordinate(prop.get('longitude'))
+    if lat is not None and lng is not None:
+        return lat, lng
+
+    if zip_centroids:
+        zip_code = str(prop.get('zip_code') or '').strip()[:5]
+        if zip_code:
+            return zip_centroids.get(zip_code.zfill(5))
+    return None
+
+
+def _column_coordinates(columns, zip_centroids: Optional[Dict] = None):
+    """
+    property_coordinates for every row of a MappedTable as (lats, lngs) arrays
+
+    Returns:
+        NaN-filled arrays, or None when a coordinate column holds non-numbers
+        and has to be parsed row by row
+    """
+    coordinates = []
+    for field in ('latitude', 'longitude'):
+        if field not in columns.columns:
+            coordinates.append(np.full(columns.size, np.nan))
+            continue
+        column = columns.numeric_column(field)
+        if column is None:
+            return None
+        coordinates.append(np.array(column, dtype=np.float64))
+
+    lats, lngs = coordinates
+    missing = np.isnan(lats) | np.isnan(lngs)
+    lats[missing] = np.nan
+    lngs[missing] = np.nan
+
+    if zip_centroids and missing.any():
+        zip_codes = columns.values_list('zip_code')
+        for row in np.flatnonzero(missing).tolist():
+            zip_code = str(zip_codes[row] or '').strip()[:5]
+            point = zip_centroids.get(zip_code.zfill(5)) if zip_code else None
+            if point is not None:
+                lats[row], lngs[row] = point
+    return lats, lngs
+
+
+def haversine_miles(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in miles"""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_MILES * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bbox(lat: float, lng: float, radius_miles: float) -> Tuple[float, float, float, float]:
+    """Smallest lat/lng box containing a circle (clamped, no antimeridian wrap)"""
+    angle = radius_miles / EARTH_RADIUS_MILES
+    dlat = math.degrees(angle)
+    # Widest longitude span of the circle; a circle reaching a pole spans all longitudes
+    ratio = math.sin(angle) / max(math.cos(math.radians(lat)), 1e-12)
+    dlng = math.degrees(math.asin(ratio)) if ratio < 1 else 180.0
+    return (max(lat - dlat, -90.0), max(lng - dlng, -180.0),
+            min(lat + dlat, 90.0), min(lng + dlng, 180.0))
+
+
+class GeoIndex:
+    """Uniform grid of row indices over property coordinates"""
+
+    def __init__(self, properties: Optional[List[Dict]] = None,
+                 zip_centroids: Optional[Dict] = None, cell_degrees: float = GRID_CELL_DEGREES,
+                 columns=None):
+        """
+        Geocode the properties and bucket them into grid cells
+
+        Args:
+            properties: Property dictionaries; results are indices into this list
+            zip_centroids: ZIP -> (lat, lng) used for rows without coordinates
+            cell_degrees: Grid cell size in degrees
+            columns: Optional MappedTable holding the same rows; numeric
+                     coordinate columns are read as arrays instead of row by row
+        """
+        properties = properties or []
+        self.cell_degrees = cell_degrees
+        self.size = len(properties)
+
+        coordinates = _column_coordinates(columns, zip_centroids) if columns is not None and np is not None else None
+        if coordinates is not None:
+            self._index_arrays(*coordinates)
+            return
+
+        lats = [math.nan] * self.size
+        lngs = [math.nan] * self.size
+        cells: Dict[Tuple[int, int], List[int]] = {}
+        for row, prop in enumerate(properties):
+            point = property_coordinates(prop, zip_centroids)
+            if point is None:
+                continue
+            lats[row], lngs[row] = point
+            cells.setdefault(self._cell(*point), []).append(row)
+
+        self.located = sum(len(rows) for rows in cells.values())
+        if np is not None:
+            self.lats = np.array(lats, dtype=np.float64)
+            self.lngs = np.array(lngs, dtype=np.float64)
+            self.cells = {cell: np.array(rows, dtype=np.intp) for cell, rows in cells.items()}
+        else:
+            self.lats = lats
+            self.lngs = lngs
+            self.cells = cells
+
+    def _index_arrays(self, lats, lngs):
+        """Bucket rows into cells from coordinate arrays (NaN where unknown)"""
+        rows = np.flatnonzero(~np.isnan(lats))
+        cell_lats = np.floor(lats[rows] / self.cell_degrees).astype(np.int64)
+        cell_lngs = np.floor(lngs[rows] / self.cell_degrees).astype(np.int64)
+
+        # Stable sort keeps each cell's rows in ascending order, as the row loop does
+        order = np.lexsort((cell_lngs, cell_lats))
+        rows, cell_lats, cell_lngs = rows[order], cell_lats[order], cell_lngs[order]
+        new_cell = (np.diff(cell_lats) != 0) | (np.diff(cell_lngs) != 0)
+        starts = np.flatnonzero(np.r_[len(rows) > 0, new_cell])
+        ends = np.r_[starts[1:], len(rows)].astype(np.intp)
+
+        self.lats = lats
+        self.lngs = lngs
+        self.located = len(rows)
+        self.cells = {
+            (int(cell_lats[start]), int(cell_lngs[start])): rows[start:end].astype(np.intp)
+            for start, end in zip(starts.tolist(), ends.tolist())
+        }
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_degrees), math.floor(lng / self.cell_degrees)
+
+    def _candidates(self, min_lat: float, min_lng: float, max_lat: float, max_lng: float):
+        """Rows in every cell overlapping the box (a superset of the answer)"""
+        lat0, lng0 = self._cell(min_lat, min_lng)
+        lat1, lng1 = self._cell(max_lat, max_lng)
+
+        # Very large boxes: walking the occupied cells beats walking the range
+        if (lat1 - lat0 + 1) * (lng1 - lng0 + 1) > len(self.cells):
+            return [rows for (i, j), rows in self.cells.items()
+                    if lat0 <= i <= lat1 and lng0 <= j <= lng1]
+
+        return [self.cells[(i, j)]
+                for i in range(lat0, lat1 + 1)
+                for j in range(lng0, lng1 + 1)
+                if (i, j) in self.cells]
+
+    def search(self, geo: GeoQuery) -> List[int]:
+        """
+        Find the properties inside the radius and/or bounding box
+
+        Returns:
+            Sorted row indices
+        """
+        boxes = []
+        if geo.radius_miles is not None:
+            boxes.append(radius_bbox(geo.lat, geo.lng, geo.radius_miles))
+        if geo.bbox is not None:
+            boxes.append(geo.bbox)
+
+        # Intersection of the boxes bounds the candidate cells
+        min_lat = max(box[0] for box in boxes)
+        min_lng = max(box[1] for box in boxes)
+        max_lat = min(box[2] for box in boxes)
+        max_lng = min(box[3] for box in boxes)
+        if min_lat > max_lat or min_lng > max_lng:
+            return []
+
+        buckets = self._candidates(min_lat, min_lng, max_lat, max_lng)
+        if not buckets:
+            return []
+
+        if np is None:
+            return self._search_rows(geo, [row for rows in buckets for row in rows],
+                                     (min_lat, min_lng, max_lat, max_lng))
+
+        rows = np.concatenate(buckets)
+        lats = self.lats[rows]
+        lngs = self.lngs[rows]
+        keep = (lats >= min_lat) & (lats <= max_lat) & (lngs >= min_lng) & (lngs <= max_lng)
+
+        if geo.radius_miles is not None:
+            lat1, lng1 = math.radians(geo.lat), math.radians(geo.lng)
+            lat2, lng2 = np.radians(lats), np.radians(lngs)
+            a = (np.sin((lat2 - lat1) / 2) ** 2
+                 + math.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2)
+            distance = 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+            keep &= distance <= geo.radius_miles
+
+        return np.sort(rows[keep]).tolist()
+
+    def _search_rows(self, geo: GeoQuery, rows: List[int], box: Tuple[float, float, float, float]) -> List[int]:
+        """Exact check without numpy"""
+        min_lat, min_lng, max_lat, max_lng = box
+        found = []
+        for row in rows:
+            lat, lng = self.lats[row], self.lngs[row]
+            if not (min_lat <= lat <= max_lat and min_lng <= lng <= max_lng):
+                continue
+            if geo.radius_miles is not None and haversine_miles(geo.lat, geo.lng, lat, lng) > geo.radius_miles:
+                continue
+            found.append(row)
+        return sorted(found)
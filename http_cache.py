@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+HTTP Cache for USAhudHomes.com
+On-disk cache for the scrapers' requests sessions: responses carrying an
+ETag or Last-Modified are stored, later GETs are sent as conditional
+requests, and a 304 is answered from disk, so unchanged search pages and
+images cost a round trip instead of a download
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+logger = logging.getLogger(__name__)
+
+# Not stored: the body is kept decoded, and these describe the transfer
+UNCACHED_HEADERS = frozenset((
+    'connection', 'content-encoding', 'content-length', 'keep-alive',
+    'set-cookie', 'transfer-encoding'
+))
+
+
+class CacheEntry:
+    """A stored response"""
+
+    __slots__ = ('url', 'status', 'headers', 'body')
+
+    def __init__(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get('ETag')
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get('Last-Modified')
+
+
+class HTTPCache:
+    """Responses stored as <sha256 of URL>.json (metadata) + .body files"""
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Cache directory (created if missing)
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.bytes_saved = 0
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode('utf-8')).hexdigest())
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Stored response for a URL, or None"""
+        path = self._path(url)
+        try:
+            with open(path + '.json', 'r') as f:
+                meta = json.load(f)
+            with open(path + '.body', 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        if meta.get('url') != url or len(body) != meta.get('size'):
+            return None
+        return CacheEntry(url, meta['status'], meta['headers'], body)
+
+    def put(self, url: str, status: int, headers, body: bytes):
+        """Store a response; the body is written first so a reader never sees metadata without it"""
+        path = self._path(url)
+        stored_headers = {name: value for name, value in headers.items() if name.lower() not in UNCACHED_HEADERS}
+        meta = {'url': url, 'status': status, 'headers': stored_headers, 'size': len(body), 'stored_at': time.time()}
+        try:
+            self._write(path + '.body', body)
+            self._write(path + '.json', json.dumps(meta).encode('utf-8'))
+        except OSError as e:
+            logger.warning(f"Could not cache {url}: {e}")
+            return
+        with self._lock:
+            self.stores += 1
+
+    def update_headers(self, entry: CacheEntry, headers):
+        """Refresh a stored entry's validators from a 304"""
+        changed = False
+        for name in ('ETag', 'Last-Modified', 'Cache-Control', 'Expires'):
+            value = headers.get(name)
+            if value and entry.headers.get(name) != value:
+                entry.headers[name] = value
+                changed = True
+        if changed:
+            self.put(entry.url, entry.status, entry.headers, entry.body)
+
+    def delete(self, url: str):
+        path = self._path(url)
+        for suffix in ('.json', '.body'):
+            try:
+                os.remove(path + suffix)
+            except FileNotFoundError:
+                pass
+
+    def _write(self, path: str, data: bytes):
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def record(self, hit: bool, bytes_saved: int = 0):
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self.bytes_saved += bytes_saved
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'directory': self.directory,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stores': self.stores,
+                'bytes_saved': self.bytes_saved,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+class CachingAdapter(HTTPAdapter):
+    """Transport adapter that revalidates GETs against an HTTPCache"""
+
+    def __init__(self, cache: HTTPCache, **kwargs):
+        """
+        Args:
+            cache: Where responses are stored
+            **kwargs: HTTPAdapter options (pool sizes, max_retries)
+        """
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request, stream=False, **kwargs):
+        if request.method != 'GET':
+            return super().send(request, stream=stream, **kwargs)
+
+        entry = self.cache.get(request.url)
+        if entry is not None:
+            # Caller-supplied validators win
+            if entry.etag and 'If-None-Match' not in request.headers:
+                request.headers['If-None-Match'] = entry.etag
+            if entry.last_modified and 'If-Modified-Since' not in request.headers:
+                request.headers['If-Modified-Since'] = entry.last_modified
+
+        response = super().send(request, stream=stream, **kwargs)
+
+        if entry is not None and response.status_code == 304:
+            self.cache.record(hit=True, bytes_saved=len(entry.body))
+            self.cache.update_headers(entry, response.headers)
+            return self._cached_response(request, entry, response)
+
+        self.cache.record(hit=False)
+        if response.status_code == 200 and not stream:
+            cache_control = response.headers.get('Cache-Control', '').lower()
+            has_validator = response.headers.get('ETag') or response.headers.get('Last-Modified')
+            if has_validator and 'no-store' not in cache_control:
+                self.cache.put(request.url, response.status_code, response.headers, response.content)
+            elif entry is not None:
+                self.cache.delete(request.url)  # the stored validators no longer apply
+        return response
+
+    def _cached_response(self, request, entry: CacheEntry, not_modified) -> requests.Response:
+        """A 200 response rebuilt from the cache, for the request a 304 answered"""
+        response = requests.Response()
+        response.status_code = entry.status
+        response.reason = 'OK'
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response._content = entry.body
+        response._content_consumed = True
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.elapsed = not_modified.elapsed
+        response.from_cache = True
+        not_modified.close()
+        return response
+
+
+def install_cache(session: requests.Session, directory: str, **adapter_kwargs) -> HTTPCache:
+    """
+    Mount a CachingAdapter on a session for http:// and https://
+
+    Args:
+        session: Session to cache
+        directory: Cache directory
+        **adapter_kwargs: HTTPAdapter options
+
+    Returns:
+        The HTTPCache, for its stats
+    """
+    cache = HTTPCache(directory)
+    adapter = CachingAdapter(cache, **adapter_kwargs)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return cache
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+HTTP Resilience for USAhudHomes.com
+Retry policy with exponential backoff, jitter and Retry-After support, and a
+per-host circuit breaker, so scraper workers ride out transient errors and
+skip a failing host quickly instead of blocking on it
+"""
+
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Responses worth another attempt: rate limited or a server-side failure
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of sending a request to a host whose circuit is open"""
+
+
+class RetryPolicy:
+    """How many times to retry a request and how long to wait in between"""
+
+    def __init__(self, max_retries: int = 3, backoff: float = 0.5,
+                 max_backoff: float = 30.0, max_retry_after: float = 60.0):
+        """
+        Args:
+            max_retries: Attempts after the first (0 disables retrying)
+            backoff: Base delay in seconds, doubled each attempt
+            max_backoff: Longest computed delay
+            max_retry_after: Longest Retry-After honoured; a server asking
+                             for more is not retried
+        """
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+
+    def should_retry(self, response: requests.Response) -> bool:
+        return response.status_code in RETRY_STATUSES
+
+    def delay(self, attempt: int, response: Optional[requests.Response] = None) -> Optional[float]:
+        """
+        Seconds to wait before retrying
+
+        Args:
+            attempt: Attempts made so far (1 after the first failure)
+            response: The failed response, if one arrived
+
+        Returns:
+            The delay, or None when the request should not be retried
+        """
+        if attempt > self.max_retries:
+            return None
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                return retry_after if retry_after <= self.max_retry_after else None
+        # Full jitter: spreads out workers that failed together
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP-date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker
+
+    After `failure_threshold` consecutive failures a host's circuit opens and
+    requests to it fail at once for `reset_timeout` seconds. Then a single
+    trial request is let through: success closes the circuit, failure opens
+    it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open a host's circuit
+                               (0 disables the breaker)
+            reset_timeout: Seconds an open circuit waits before a trial request
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._hosts: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url: str) -> Dict:
+        host = urlsplit(url).netloc.lower()
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = {
+                'state': self.CLOSED, 'failures': 0, 'opened_at': 0.0, 'trial': False, 'rejected': 0
+            }
+        return state
+
+    def before_request(self, url: str):
+        """Raise CircuitOpenError if the URL's host is not taking requests"""
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            host = self._host(url)
+            if host['state'] == self.CLOSED:
+                return
+            if host['state'] == self.OPEN and time.monotonic() - host['opened_at'] >= self.reset_timeout:
+                host['state'] = self.HALF_OPEN
+            if host['state'] == self.HALF_OPEN and not host['trial']:
+                host['trial'] = True
+                return
+            host['rejected'] += 1
+        raise CircuitOpenError(f"Circuit open for {urlsplit(url).netloc}, not requesting {url}")
+
+    def record_success(self, url: str):
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            host = self._host(url)
+            if host['state'] != self.CLOSED:
+                logger.info(f"Circuit closed for {urlsplit(url).netloc}")
+            host.update(state=self.CLOSED, failures=0, trial=False)
+
+    def record_failure(self, url: str):
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            host = self._host(url)
+            host['failures'] += 1
+            if host['state'] == self.HALF_OPEN or host['failures'] >= self.failure_threshold:
+                if host['state'] != self.OPEN:
+                    logger.warning(f"Circuit opened for {urlsplit(url).netloc} after "
+                                   f"{host['failures']} consecutive failures")
+                host.update(state=self.OPEN, opened_at=time.monotonic(), trial=False)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Each host's circuit state, consecutive failures and rejected requests"""
+        with self._lock:
+            return {host: {'state': state['state'], 'failures': state['failures'], 'rejected': state['rejected']}
+                    for host, state in self._hosts.items()}
@@ -34,6 +34,21 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+# On-disk HTTP cache (http_cache.py) and fixture recorder (hud_fixtures.py)
+# from the app repo. Optional: when the scripts are copied out of the repo,
+# images are downloaded uncached and --record-fixtures is unavailable.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+try:
+    from http_cache import install_cache
+except ImportError:
+    install_cache = None
+try:
+    from hud_fixtures import FixtureRecorder
+except ImportError:
+    FixtureRecorder = None
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cache", "http")
+
 
 # ---------------------------------------------------------------------------
 # Browser setup
@@ -113,8 +128,11 @@ return JSON.stringify(props);
 """
 
 
-def extract_properties(driver, state_code):
-    """Load the HUD search page for state_code and return raw property dicts."""
+def extract_properties(driver, state_code, recorder=None):
+    """Load the HUD search page for state_code and return raw property dicts.
+
+    If a FixtureRecorder is given, the rendered page is saved as a fixture.
+    """
     url = f"https://www.hudhomestore.gov/searchresult?citystate={state_code}"
     print(f"[{state_code}] Navigating to {url}")
     driver.get(url)
@@ -128,6 +146,9 @@ def extract_properties(driver, state_code):
         print(f"[{state_code}] WARNING: No property-box elements found. Site may be down or layout changed.")
         return []
 
+    if recorder is not None:
+        recorder.save(state_code, driver.page_source)
+
     raw = driver.execute_script(JS_EXTRACT)
     properties = json.loads(raw)
     print(f"[{state_code}] Found {len(properties)} total properties on site")
@@ -165,13 +186,21 @@ def higher_res_url(url):
     return url.replace("w_285,h_190", "w_800,h_600")
 
 
-def download_images(properties, images_dir):
-    """Download the main image for each property, saved as ###_######.jpg."""
+def download_images(properties, images_dir, cache_dir=None):
+    """Download the main image for each property, saved as ###_######.jpg.
+
+    With cache_dir, images are fetched with conditional requests, so an image
+    already downloaded by an earlier run (into any output folder) comes back
+    as a 304 and is copied from the cache.
+    """
     os.makedirs(images_dir, exist_ok=True)
     session = requests.Session()
     session.headers["User-Agent"] = (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
     )
+    cache = None
+    if cache_dir and install_cache is not None:
+        cache = install_cache(session, cache_dir)
 
     downloaded = 0
     for prop in properties:
@@ -204,6 +233,10 @@ def download_images(properties, images_dir):
                 print(f"  [img] Error for {case}: {exc}")
 
     print(f"[img] {downloaded}/{len(properties)} images downloaded to {images_dir}")
+    if cache is not None:
+        stats = cache.stats()
+        print(f"[img] HTTP cache: {stats['hits']} not modified, {stats['misses']} fetched, "
+              f"{stats['bytes_saved'] // 1024} KB saved")
     return downloaded
 
 
@@ -296,8 +329,18 @@ def main():
                     help="Output directory (default: ./output/<STATE>)")
     ap.add_argument("--all", action="store_true",
                     help="Include ALL statuses, not just New Listing / Price Reduced")
+    ap.add_argument("--http-cache", default=os.getenv("HUD_HTTP_CACHE_DIR", DEFAULT_CACHE_DIR),
+                    help="HTTP cache directory for image downloads ('' disables; default: ../cache/http)")
+    ap.add_argument("--record-fixtures", metavar="DIR", default=os.getenv("HUD_FIXTURE_DIR"),
+                    help="Save the rendered search page to DIR as a benchmark/test fixture")
     args = ap.parse_args()
 
+    recorder = None
+    if args.record_fixtures:
+        if FixtureRecorder is None:
+            ap.error("--record-fixtures needs hud_fixtures.py from the app repo")
+        recorder = FixtureRecorder(args.record_fixtures, "pipeline")
+
     state  = args.state.upper()
     outdir = args.output or os.path.join(
         os.path.dirname(os.path.abspath(__file__)), "..", "output", state
@@ -310,7 +353,7 @@ def main():
 
     driver = setup_driver()
     try:
-        all_props = extract_properties(driver, state)
+        all_props = extract_properties(driver, state, recorder)
     finally:
         driver.quit()
 
@@ -330,7 +373,7 @@ def main():
     for tag, count in sorted(status_counts.items(), key=lambda x: -x[1]):
         print(f"  {count:>4}  {tag}")
 
-    download_images(filtered, images_dir)
+    download_images(filtered, images_dir, cache_dir=args.http_cache)
     csv_path = save_csv(filtered, state, outdir)
 
     print(f"\n{'='*55}")
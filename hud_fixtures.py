@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+HUD Search Fixtures for USAhudHomes.com
+Records the search result pages the scrapers read, and generates synthetic
+result pages of any size, so parsing can be benchmarked and checked offline
+"""
+
+import argparse
+import html
+import logging
+import os
+import random
+import tempfile
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'hud_search')
+
+# Scrapers that can record: hud_scraper.py, hud_scraper_browser.py and
+# hud-pipeline/scripts/1_hud_scraper.py
+SOURCES = ('requests', 'browser', 'pipeline')
+
+# Synthetic page layouts: the li.property-box cards of the live site (read by
+# the browser scrapers' JavaScript) and the div.property-card cards
+# HUDPropertyScraper's selectors target
+MARKUPS = ('property-box', 'property-card')
+
+STREETS = ['Oak Ave', 'Maple St', 'Cedar Ln', 'Pine Rd', 'Elm St', 'Lake Dr', 'Hillcrest Ct', 'Park Blvd']
+CITIES = [
+    ('Raleigh', 'NC', '27601', 'Wake'),
+    ('Charlotte', 'NC', '28202', 'Mecklenburg'),
+    ('Columbia', 'SC', '29201', 'Richland'),
+    ('Atlanta', 'GA', '30303', 'Fulton'),
+    ('Tampa', 'FL', '33602', 'Hillsborough'),
+    ('Houston', 'TX', '77002', 'Harris'),
+    ('Dayton', 'OH', '45402', 'Montgomery'),
+    ('Detroit', 'MI', '48226', 'Wayne'),
+]
+STATUSES = ['New Listing', 'Price Reduced', 'Available', 'Pending']
+LISTING_PERIODS = ['Exclusive', 'Extended']
+
+
+class FixtureRecorder:
+    """Saves the search result HTML a scraper reads, one file per page"""
+
+    def __init__(self, directory: str, source: str):
+        """
+        Args:
+            directory: Where pages are written (created if missing)
+            source: Which scraper is recording (one of SOURCES)
+        """
+        if source not in SOURCES:
+            raise ValueError(f"Unknown source {source!r}, expected one of: {', '.join(SOURCES)}")
+        self.directory = directory
+        self.source = source
+
+    def save(self, state_code: str, content, page: int = 1) -> Optional[str]:
+        """
+        Write a page as <source>_<state>_p<page>_<timestamp>.html
+
+        A failed write is logged rather than raised, so recording never
+        breaks a scrape.
+
+        Args:
+            state_code: State the page was searched for
+            content: Page HTML (bytes or str)
+            page: Result page number
+
+        Returns:
+            Path written, or None on failure
+        """
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(self.directory, f"{self.source}_{state_code}_p{page}_{timestamp}.html")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not record fixture {path}: {e}")
+            return None
+        logger.info(f"Recorded {state_code} page {page} ({len(content)} bytes) to {path}")
+        return path
+
+
+def recorder_from_env(source: str, directory: str = None) -> Optional[FixtureRecorder]:
+    """
+    A FixtureRecorder for the given directory, else the HUD_FIXTURE_DIR
+    environment variable; None when neither is set (recording off)
+    """
+    if directory is None:
+        directory = os.getenv('HUD_FIXTURE_DIR', '')
+    return FixtureRecorder(directory, source) if directory else None
+
+
+def synthetic_properties(count: int, seed: int = 0) -> List[Dict]:
+    """
+    Deterministic property records to build pages from
+
+    Args:
+        count: Number of properties
+        seed: Random seed; the same seed gives the same records
+
+    Returns:
+        Records with case_number, address, city, state, zip_code, county,
+        price, beds, baths, status, listing_period and bids_open
+    """
+    rng = random.Random(seed)
+    properties = []
+    for i in range(count):
+        city, state, zip_code, county = rng.choice(CITIES)
+        properties.append({
+            'case_number': f"{380 + i // 1000000 % 620:03d}-{i % 1000000:06d}",
+            'address': f"{rng.randint(100, 9999)} {rng.choice(STREETS)}",
+            'city': city,
+            'state': state,
+            'zip_code': zip_code,
+            'county': county,
+            'price': rng.randrange(40000, 450000, 1000),
+            'beds': rng.randint(1, 5),
+            'baths': rng.choice([1, 1.5, 2, 2.5, 3]),
+            'status': rng.choice(STATUSES),
+            'listing_period': rng.choice(LISTING_PERIODS),
+            'bids_open': f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/2026",
+        })
+    return properties
+
+
+def _number(value) -> str:
+    return f"{value:g}"
+
+
+def property_box_card(prop: Dict) -> str:
+    """An li.property-box card laid out as hudhomestore.gov renders it"""
+    e = {key: html.escape(str(value)) for key, value in prop.items()}
+    return (
+        f'<li class="property-box">'
+        f'<div class="cas-images-container">'
+        f'<img src="https://www.hudhomestore.gov/images/properties/{e["case_number"]}.jpg" alt=""></div>'
+        f'<button class="fav-btn" type="button" data-favorite="{e["case_number"]}">'
+        f'<span class="sr-only">Favorite</span></button>'
+        f'<div class="badge">{e["status"]}<a href="#" class="more">More</a></div>'
+        f'<div class="card-body">'
+        f'<div class="price-range">${prop["price"]:,}</div>'
+        f'<a href="/property/{e["case_number"]}">{e["address"]}</a>'
+        f'<div>{e["city"]}, {e["state"]}, {e["zip_code"]}</div>'
+        f'<div class="features"><span>{_number(prop["beds"])} Beds</span> '
+        f'<span>{_number(prop["baths"])} Baths</span> '
+        f'<span>{e["county"]} County</span></div>'
+        f'<div>Case #: {e["case_number"]}</div>'
+        f'</div>'
+        f'<div class="card-footer">'
+        f'<span class="bids-open">BIDS OPEN {e["bids_open"]}</span> '
+        f'<span class="bids-open">Listing Period: {e["listing_period"]}</span>'
+        f'</div>'
+        f'</li>\n'
+    )
+
+
+def property_card(prop: Dict) -> str:
+    """A div.property-card card with the classes HUDPropertyScraper looks up"""
+    e = {key: html.escape(str(value)) for key, value in prop.items()}
+    return (
+        f'<div class="property-card" data-case-number="{e["case_number"]}">'
+        f'<span class="status badge">{e["status"]}</span>'
+        f'<h3 class="address">{e["address"]}</h3>'
+        f'<div class="location">{e["city"]}, {e["state"]} {e["zip_code"]}</div>'
+        f'<div class="price">${prop["price"]:,}</div>'
+        f'<ul class="details"><li class="beds">{_number(prop["beds"])} Beds</li>'
+        f'<li class="baths">{_number(prop["baths"])} Baths</li></ul>'
+        f'<div class="county">{e["county"]}</div>'
+        f'<div class="listing-period">{e["listing_period"]}</div>'
+        f'</div>\n'
+    )
+
+
+def search_page(properties: List[Dict], markup: str = 'property-box') -> bytes:
+    """
+    A complete search results page
+
+    Args:
+        properties: Records from synthetic_properties
+        markup: One of MARKUPS
+
+    Returns:
+        Page HTML
+    """
+    if markup == 'property-box':
+        cards = '<ul class="property-list">\n' + ''.join(map(property_box_card, properties)) + '</ul>'
+    elif markup == 'property-card':
+        cards = ''.join(map(property_card, properties))
+    else:
+        raise ValueError(f"Unknown markup {markup!r}, expected one of: {', '.join(MARKUPS)}")
+    return (
+        '<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+        '<title>Search Results - HUD Home Store</title>\n</head>\n<body>\n'
+        '<nav class="navbar"><a href="/">HUD Home Store</a></nav>\n'
+        f'<div id="search_results_container">\n{cards}\n</div>\n'
+        '</body>\n</html>\n'
+    ).encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic HUD search results page')
+    parser.add_argument('--cards', type=int, default=1000, help='Property cards on the page (default: 1000)')
+    parser.add_argument('--markup', choices=MARKUPS, default='property-box', help='Card layout (default: property-box)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--output', required=True, help='HTML file to write')
+    args = parser.parse_args()
+
+    content = search_page(synthetic_properties(args.cards, args.seed), args.markup)
+    with open(args.output, 'wb') as f:
+        f.write(content)
+    print(f"Wrote {args.cards} {args.markup} cards ({len(content):,} bytes) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
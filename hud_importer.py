@@ -9,7 +9,7 @@ import json
 import logging
 import os
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Dict, Iterable, List, Optional
 from supabase import create_client, Client
 
 # Configure logging
@@ -52,12 +52,16 @@ class HUDPropertyImporter:
             logger.error(f"Error loading JSON file: {e}")
             return []
     
-    def import_properties(self, properties: List[Dict], state_code: str, dry_run: bool = False) -> Dict:
+    def import_properties(self, properties: Iterable[Dict], state_code: str, dry_run: bool = False) -> Dict:
         """
         Import properties with status management
         
+        Properties are consumed one at a time, so a generator (e.g. a
+        scraper streaming result pages) is imported without holding the
+        whole state in memory.
+        
         Args:
-            properties: List of property dictionaries from scraper
+            properties: Property dictionaries from scraper (any iterable)
             state_code: State code being imported (e.g., 'NC')
             dry_run: If True, only simulate the import without making changes
             
@@ -65,7 +69,7 @@ class HUDPropertyImporter:
             Dictionary with import statistics
         """
         stats = {
-            'total_scraped': len(properties),
+            'total_scraped': 0,
             'new_properties': 0,
             'updated_properties': 0,
             'restored_properties': 0,
@@ -74,9 +78,9 @@ class HUDPropertyImporter:
         }
         
         try:
-            # Get case numbers from the import
-            import_case_numbers = {p['case_number'] for p in properties}
-            logger.info(f"Importing {len(import_case_numbers)} properties for state {state_code}")
+            # Case numbers seen in the import, collected as properties stream in
+            import_case_numbers = set()
+            logger.info(f"Importing properties for state {state_code}")
             
             # Get all existing properties for this state from database
             existing_response = self.client.table('properties').select('*').eq('state', state_code).execute()
@@ -85,8 +89,10 @@ class HUDPropertyImporter:
             
             # Step 1: Process properties in the import
             for property_data in properties:
+                stats['total_scraped'] += 1
                 try:
                     case_number = property_data['case_number']
+                    import_case_numbers.add(case_number)
                     
                     # Prepare property record for database
                     db_property = {
@@ -9,62 +9,344 @@ from bs4 import BeautifulSoup
 import json
 import time
 import logging
+import os
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 import re
+from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.adapters import HTTPAdapter
+
+from http_cache import install_cache
+from hud_fixtures import recorder_from_env
+from http_resilience import CircuitBreaker, RetryPolicy
+from rate_limiter import HostRateLimiter
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:  # lxml is optional; BeautifulSoup's html.parser is used instead
+    etree = lxml_html = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Politeness defaults: requests per second to one host, and the burst allowed
+DEFAULT_REQUESTS_PER_SECOND = 1.0
+DEFAULT_BURST = 1
+# States fetched at once by scrape_all_states
+DEFAULT_MAX_WORKERS = 4
+# On-disk HTTP cache used for conditional requests (HUD_HTTP_CACHE_DIR; empty disables)
+DEFAULT_HTTP_CACHE_DIR = '.hud_http_cache'
+# (connect, read) seconds; a hung socket fails the attempt instead of the thread
+DEFAULT_TIMEOUT = (10.0, 30.0)
+# Retries of a page after a connection error, timeout, 429 or 5xx
+DEFAULT_MAX_RETRIES = 3
+# Consecutive failed fetches that stop requests to a host for a while
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_CIRCUIT_RESET_SECONDS = 60.0
+
+# Property field -> names tried in order, each as a card attribute and then as a
+# descendant class
+FIELD_SELECTORS = {
+    'case_number': ['data-case-number', 'case-number'],
+    'address': ['address', 'property-address'],
+    'location': ['location', 'city-state'],
+    'price': ['price', 'property-price'],
+    'beds': ['beds', 'bedrooms'],
+    'baths': ['baths', 'bathrooms'],
+    'status': ['status', 'listing-status'],
+    'county': ['county'],
+    'listing_period': ['listing-period'],
+}
+
+FIELD_CLASSES = frozenset(name for names in FIELD_SELECTORS.values() for name in names)
+
+CASE_NUMBER_PATTERN = re.compile(r'Case #?:?\s*(\d{3}-\d{6})')
+PRICE_PATTERN = re.compile(r'\$?([\d,]+)')
+BEDS_PATTERN = re.compile(r'(\d+)')
+BATHS_PATTERN = re.compile(r'(\d+(?:\.\d+)?)')
+
+PARSERS = ('lxml', 'html.parser')
+
+# Search result pages followed per state before giving up (a loop guard)
+DEFAULT_MAX_PAGES = 100
+# Query parameter for numbered result pages, used when a page has no next link
+PAGE_PARAM = 'page'
+# Fewest results on a full search page. Kept at the low end: a first page with
+# fewer rows and no next link is the only page, so no page 2 is requested
+DEFAULT_PAGE_SIZE = 10
+
+# Next-page links: <link rel="next">, <a rel="next">, aria-labelled or li.next pager links
+NEXT_LINK_XPATH = (
+    "(//link[@rel='next'] | //a[contains(concat(' ', normalize-space(@rel), ' '), ' next ')]"
+    " | //a[@aria-label='Next' or @aria-label='Next page']"
+    " | //li[contains(concat(' ', normalize-space(@class), ' '), ' next ')]/a)/@href"
+)
+
+class IncompleteScrapeError(Exception):
+    """A state's search results could not all be read"""
+    
+    def __init__(self, state_code: str, page: int, cause: Exception):
+        super().__init__(f"{state_code}: result page {page} could not be read: {cause}")
+        self.state_code = state_code
+        self.page = page
+        self.cause = cause
+
+
 class HUDPropertyScraper:
-    def __init__(self):
+    def __init__(self, requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+                 burst: int = DEFAULT_BURST, max_workers: int = DEFAULT_MAX_WORKERS,
+                 parser: str = None, cache_dir: str = None, timeout=DEFAULT_TIMEOUT,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, record_dir: str = None,
+                 page_size: int = DEFAULT_PAGE_SIZE):
+        """
+        Args:
+            requests_per_second: Request rate allowed per host (0 disables limiting)
+            burst: Requests a host may receive back to back before the rate applies
+            max_workers: States scraped concurrently by scrape_all_states
+            parser: 'lxml' (default when installed) or 'html.parser' (BeautifulSoup)
+            cache_dir: HTTP cache directory (default: HUD_HTTP_CACHE_DIR env var or
+                       .hud_http_cache; empty string disables caching)
+            timeout: Seconds per request, or a (connect, read) pair
+            max_retries: Retries after a connection error, timeout, 429 or 5xx,
+                         with exponential backoff or the server's Retry-After
+            failure_threshold: Consecutive failed fetches that open a host's
+                               circuit; its remaining pages then fail at once
+                               (0 disables the breaker)
+            record_dir: Save every fetched search page here as a test fixture
+                        (default: HUD_FIXTURE_DIR env var; unset disables)
+            page_size: Fewest results on a full search page; a shorter first
+                       page without a next link ends the state
+        """
         self.base_url = "https://www.hudhomestore.gov"
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
+        self.rate_limiter = HostRateLimiter(requests_per_second, burst)
+        self.max_workers = max_workers
+        self.page_size = page_size
+        # State -> why its last scrape_all_states scrape was left out
+        self.incomplete_states: Dict[str, str] = {}
+        self.timeout = timeout
+        self.retry_policy = RetryPolicy(max_retries=max_retries)
+        self.circuit_breaker = CircuitBreaker(failure_threshold, DEFAULT_CIRCUIT_RESET_SECONDS)
+        self.fixture_recorder = recorder_from_env('requests', record_dir)
+        
+        if cache_dir is None:
+            cache_dir = os.getenv('HUD_HTTP_CACHE_DIR', DEFAULT_HTTP_CACHE_DIR)
+        # One pooled connection per worker, so concurrent states don't queue for a socket
+        pool = {'pool_connections': max(1, max_workers), 'pool_maxsize': max(1, max_workers)}
+        if cache_dir:
+            # Unchanged pages come back as 304s and are served from disk
+            self.http_cache = install_cache(self.session, cache_dir, **pool)
+        else:
+            self.http_cache = None
+            self.session.mount('https://', HTTPAdapter(**pool))
+            self.session.mount('http://', HTTPAdapter(**pool))
+        
+        if parser is None:
+            parser = 'lxml' if etree is not None else 'html.parser'
+        if parser not in PARSERS:
+            raise ValueError(f"Unknown parser {parser!r}, expected one of: {', '.join(PARSERS)}")
+        if parser == 'lxml' and etree is None:
+            raise ValueError('The lxml parser needs the lxml package')
+        self.parser = parser
+        
+        if parser == 'lxml':
+            # Compiled once; the same card lookups the BeautifulSoup path makes
+            self._xpath_property_cards = etree.XPath(
+                "//div[contains(concat(' ', normalize-space(@class), ' '), ' property-card ')]")
+            self._xpath_articles = etree.XPath('//article')
+            self._xpath_case_number_cards = etree.XPath('//div[@data-case-number]')
+            self._xpath_next_link = etree.XPath(NEXT_LINK_XPATH)
+    
+    def fetch(self, url: str) -> requests.Response:
+        """
+        GET a URL through the shared session
+        
+        Each attempt waits for the host's rate limit. Connection errors,
+        timeouts, 429s and 5xx responses are retried per the retry policy.
+        When retries run out the last response is returned, or the last
+        error raised.
+        
+        Raises:
+            CircuitOpenError: The host has been failing and is not being requested
+            requests.RequestException: The request failed on every attempt
+        """
+        # Checked once per fetch: a half-open circuit's trial request keeps
+        # its retries, and its outcome is always recorded
+        self.circuit_breaker.before_request(url)
+        succeeded = False
+        try:
+            attempt = 0
+            while True:
+                self.rate_limiter.acquire(url)
+                attempt += 1
+                try:
+                    response = self.session.get(url, timeout=self.timeout)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    delay = self.retry_policy.delay(attempt)
+                    if delay is None:
+                        raise
+                    logger.warning(f"Retrying {url} in {delay:.1f}s after attempt {attempt} failed: {e}")
+                else:
+                    if not self.retry_policy.should_retry(response):
+                        succeeded = True
+                        return response
+                    delay = self.retry_policy.delay(attempt, response)
+                    if delay is None:
+                        return response
+                    logger.warning(f"Retrying {url} in {delay:.1f}s after HTTP {response.status_code} "
+                                   f"on attempt {attempt}")
+                    response.close()
+                time.sleep(delay)
+        finally:
+            if succeeded:
+                self.circuit_breaker.record_success(url)
+            else:
+                self.circuit_breaker.record_failure(url)
         
     def get_state_properties(self, state_code: str) -> List[Dict]:
         """
-        Scrape properties for a specific state
+        Scrape properties for a specific state, following result pagination
         
         Args:
             state_code: Two-letter state code (e.g., 'NC')
             
         Returns:
             List of property dictionaries
+            
+        Raises:
+            IncompleteScrapeError: A result page could not be fetched or parsed
         """
-        properties = []
-        search_url = f"{self.base_url}/searchresult?citystate={state_code}"
+        logger.info(f"Scraping properties for state: {state_code}")
+        properties = list(self.iter_state_properties(state_code))
+        logger.info(f"Found {len(properties)} properties for {state_code}")
+        return properties
+    
+    def iter_state_properties(self, state_code: str, max_pages: int = DEFAULT_MAX_PAGES) -> Iterator[Dict]:
+        """
+        Yield a state's properties page by page as the search results are fetched
         
-        try:
-            logger.info(f"Scraping properties for state: {state_code}")
-            response = self.session.get(search_url)
-            response.raise_for_status()
+        Follows the page's next link, or else requests numbered pages until a
+        page is short or brings no new case numbers. An error on any page,
+        the first included, raises: a state that could not be read, in whole
+        or in part, must never be mistaken for one with no listings.
+        
+        Args:
+            state_code: Two-letter state code (e.g., 'NC')
+            max_pages: Most result pages to fetch
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+        Yields:
+            Property dictionaries, each case number once
             
-            # Find property listings on the page
-            property_cards = soup.find_all('div', class_='property-card') or soup.find_all('article')
+        Raises:
+            IncompleteScrapeError: A result page could not be fetched or parsed
+        """
+        search_url = f"{self.base_url}/searchresult?citystate={state_code}"
+        url = search_url
+        seen = set()
+        first_page_size = None
+        
+        for page in range(1, max_pages + 1):
+            try:
+                response = self.fetch(url)
+                response.raise_for_status()
+                if self.fixture_recorder is not None:
+                    self.fixture_recorder.save(state_code, response.content, page)
+                properties, next_href = self.parse_search_page(response.content)
+            except requests.RequestException as e:
+                # Includes CircuitOpenError when the host's circuit is open
+                logger.error(f"Error fetching page {page} of properties for {state_code}: {e}")
+                raise IncompleteScrapeError(state_code, page, e) from e
+            except Exception as e:
+                logger.error(f"Unexpected error scraping page {page} of {state_code}: {e}")
+                raise IncompleteScrapeError(state_code, page, e) from e
             
-            if not property_cards:
-                # Try alternative selectors based on the actual HTML structure
-                property_cards = soup.find_all('div', attrs={'data-case-number': True})
+            new_properties = [p for p in properties if p['property_id'] not in seen]
+            seen.update(p['property_id'] for p in new_properties)
+            logger.debug(f"{state_code} page {page}: {len(new_properties)} new of {len(properties)} properties")
+            yield from new_properties
             
-            for card in property_cards:
-                property_data = self.extract_property_data(card)
-                if property_data:
-                    properties.append(property_data)
-                    
-            logger.info(f"Found {len(properties)} properties for {state_code}")
+            if first_page_size is None:
+                first_page_size = len(properties)
+            if not new_properties:
+                return
+            if next_href:
+                url = urljoin(url, next_href)
+            elif len(properties) < (self.page_size if page == 1 else first_page_size):
+                return  # a short page is the last one
+            else:
+                url = f"{search_url}&{PAGE_PARAM}={page + 1}"
+        
+        logger.warning(f"Stopped {state_code} after {max_pages} result pages; results may be incomplete")
+    
+    def parse_properties(self, content: bytes) -> List[Dict]:
+        """
+        Parse the property cards of a search results page
+        
+        Args:
+            content: Page HTML
             
-        except requests.RequestException as e:
-            logger.error(f"Error fetching properties for {state_code}: {e}")
-        except Exception as e:
-            logger.error(f"Unexpected error scraping {state_code}: {e}")
+        Returns:
+            List of property dictionaries
+        """
+        return self.parse_search_page(content)[0]
+    
+    def parse_search_page(self, content: bytes) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Parse a search results page
+        
+        Args:
+            content: Page HTML
             
-        return properties
+        Returns:
+            (property dictionaries, href of the next results page or None)
+        """
+        if self.parser == 'lxml':
+            return self._parse_search_page_lxml(content)
+        
+        soup = BeautifulSoup(content, 'html.parser')
+        
+        # Find property listings on the page
+        property_cards = soup.find_all('div', class_='property-card') or soup.find_all('article')
+        
+        if not property_cards:
+            # Try alternative selectors based on the actual HTML structure
+            property_cards = soup.find_all('div', attrs={'data-case-number': True})
+        
+        properties = []
+        for card in property_cards:
+            property_data = self.extract_property_data(card)
+            if property_data:
+                properties.append(property_data)
+        
+        next_link = (soup.find('link', rel='next') or soup.find('a', rel='next')
+                     or soup.find('a', attrs={'aria-label': ['Next', 'Next page']})
+                     or soup.select_one('li.next > a'))
+        return properties, _page_href(next_link.get('href') if next_link else None)
+    
+    def _parse_search_page_lxml(self, content: bytes) -> Tuple[List[Dict], Optional[str]]:
+        if not content or not content.strip():
+            return [], None
+        
+        root = lxml_html.fromstring(content)
+        property_cards = self._xpath_property_cards(root) or self._xpath_articles(root)
+        if not property_cards:
+            property_cards = self._xpath_case_number_cards(root)
+        
+        properties = []
+        for card in property_cards:
+            property_data = self.extract_property_data_lxml(card)
+            if property_data:
+                properties.append(property_data)
+        
+        next_links = self._xpath_next_link(root)
+        return properties, _page_href(next_links[0] if next_links else None)
     
     def extract_property_data(self, card_element) -> Optional[Dict]:
         """
@@ -76,15 +358,55 @@ class HUDPropertyScraper:
         Returns:
             Dictionary with property data or None if extraction fails
         """
+        return self._build_property(lambda field: self.extract_text(card_element, FIELD_SELECTORS[field]),
+                                    card_element.get_text)
+    
+    def extract_property_data_lxml(self, card_element) -> Optional[Dict]:
+        """
+        extract_property_data for an lxml element
+        
+        One pass over the card's descendants records the first element
+        carrying each selector class, instead of a search per selector.
+        """
+        found = {}
+        for element in card_element.iterdescendants(etree.Element):
+            classes = element.get('class')
+            if not classes:
+                continue
+            for name in classes.split():
+                if name in FIELD_CLASSES and name not in found:
+                    found[name] = element
+            if len(found) == len(FIELD_CLASSES):
+                break
+        
+        def lookup(field):
+            for selector in FIELD_SELECTORS[field]:
+                value = card_element.get(selector)
+                if value:
+                    return value
+                element = found.get(selector)
+                if element is not None:
+                    return element.text_content().strip()
+            return None
+        
+        return self._build_property(lookup, card_element.text_content)
+    
+    def _build_property(self, lookup, card_text) -> Optional[Dict]:
+        """
+        Assemble a property from its card fields
+        
+        Args:
+            lookup: Field name (a FIELD_SELECTORS key) -> text or None
+            card_text: Returns the card's full text, for the case number fallback
+        """
         try:
             property_data = {}
             
             # Extract case number
-            case_number = self.extract_text(card_element, ['data-case-number', 'case-number'])
+            case_number = lookup('case_number')
             if not case_number:
                 # Try to find case number in text
-                case_text = card_element.get_text()
-                case_match = re.search(r'Case #?:?\s*(\d{3}-\d{6})', case_text)
+                case_match = CASE_NUMBER_PATTERN.search(card_text())
                 if case_match:
                     case_number = case_match.group(1)
             
@@ -94,11 +416,11 @@ class HUDPropertyScraper:
             property_data['property_id'] = case_number
             
             # Extract address
-            address = self.extract_text(card_element, ['address', 'property-address'])
+            address = lookup('address')
             property_data['address'] = address or 'Address not available'
             
             # Extract city and state
-            location = self.extract_text(card_element, ['location', 'city-state'])
+            location = lookup('location')
             if location:
                 location_parts = location.split(',')
                 if len(location_parts) >= 2:
@@ -108,35 +430,35 @@ class HUDPropertyScraper:
                     property_data['zip_code'] = state_zip[1] if len(state_zip) > 1 else ''
             
             # Extract price
-            price_text = self.extract_text(card_element, ['price', 'property-price'])
+            price_text = lookup('price')
             if price_text:
-                price_match = re.search(r'\$?([\d,]+)', price_text.replace(',', ''))
+                price_match = PRICE_PATTERN.search(price_text.replace(',', ''))
                 if price_match:
                     property_data['price'] = int(price_match.group(1).replace(',', ''))
             
             # Extract bedrooms and bathrooms
-            beds_text = self.extract_text(card_element, ['beds', 'bedrooms'])
+            beds_text = lookup('beds')
             if beds_text:
-                beds_match = re.search(r'(\d+)', beds_text)
+                beds_match = BEDS_PATTERN.search(beds_text)
                 if beds_match:
                     property_data['bedrooms'] = int(beds_match.group(1))
             
-            baths_text = self.extract_text(card_element, ['baths', 'bathrooms'])
+            baths_text = lookup('baths')
             if baths_text:
-                baths_match = re.search(r'(\d+(?:\.\d+)?)', baths_text)
+                baths_match = BATHS_PATTERN.search(baths_text)
                 if baths_match:
                     property_data['bathrooms'] = float(baths_match.group(1))
             
             # Extract status
-            status = self.extract_text(card_element, ['status', 'listing-status'])
+            status = lookup('status')
             property_data['status'] = status or 'Available'
             
             # Extract county
-            county = self.extract_text(card_element, ['county'])
+            county = lookup('county')
             property_data['county'] = county or ''
             
             # Extract listing period
-            listing_period = self.extract_text(card_element, ['listing-period'])
+            listing_period = lookup('listing_period')
             property_data['listing_period'] = listing_period or ''
             
             # Add timestamp
@@ -177,30 +499,57 @@ class HUDPropertyScraper:
         
         return None
     
-    def scrape_all_states(self, states: List[str] = None) -> Dict[str, List[Dict]]:
+    def scrape_all_states(self, states: List[str] = None, max_workers: int = None) -> Dict[str, List[Dict]]:
         """
         Scrape properties for multiple states
         
+        States are fetched concurrently; politeness comes from the per-host
+        rate limit rather than pauses between states.
+        
         Args:
             states: List of state codes to scrape. If None, scrapes all states.
+            max_workers: States fetched at once (default: the scraper's max_workers)
             
         Returns:
-            Dictionary mapping state codes to property lists
+            Dictionary mapping state codes to property lists, in the order given.
+            States whose results could not be read in full (including a
+            failed first page) are left out and listed in
+            self.incomplete_states, so they aren't imported as if the missing
+            properties had been sold.
         """
         if states is None:
             # Focus on key states with high HUD activity
             states = ['NC', 'SC', 'GA', 'FL', 'TX', 'CA', 'OH', 'MI', 'PA', 'NY']
         
-        all_properties = {}
+        workers = max(1, min(max_workers or self.max_workers, len(states)))
+        started = time.perf_counter()
         
-        for state in states:
-            properties = self.get_state_properties(state)
-            all_properties[state] = properties
-            
-            # Be respectful to the server
-            time.sleep(2)
+        incomplete = {}
+        
+        def scrape_state(state):
+            try:
+                return self.get_state_properties(state)
+            except IncompleteScrapeError as e:
+                incomplete[state] = str(e)
+                return None
         
-        return all_properties
+        if workers == 1:
+            results = [scrape_state(state) for state in states]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='hud-scraper') as executor:
+                results = list(executor.map(scrape_state, states))
+        
+        self.incomplete_states = incomplete
+        if incomplete:
+            logger.error(f"Left out {len(incomplete)} incompletely scraped states: {', '.join(incomplete)}")
+        
+        logger.info(f"Scraped {len(states)} states with {workers} workers in {time.perf_counter() - started:.1f}s")
+        if self.http_cache is not None:
+            logger.info(f"HTTP cache: {self.http_cache.stats()}")
+        circuits = {host: state for host, state in self.circuit_breaker.stats().items() if state['rejected']}
+        if circuits:
+            logger.warning(f"Requests skipped by open circuits: {circuits}")
+        return {state: properties for state, properties in zip(states, results) if properties is not None}
     
     def save_to_json(self, properties: Dict[str, List[Dict]], filename: str = None):
         """
@@ -221,15 +570,77 @@ class HUDPropertyScraper:
         except Exception as e:
             logger.error(f"Error saving to JSON: {e}")
 
+    def save_to_json_stream(self, states: Iterable[str], filename: str = None) -> Optional[str]:
+        """
+        Scrape states one after another straight into a JSON file
+        
+        Writes the same document as save_to_json(scrape_all_states(states)),
+        but each property is written as soon as its page is parsed, so memory
+        stays bounded by one results page.
+        
+        Args:
+            states: State codes to scrape
+            filename: Output filename (optional)
+            
+        Returns:
+            The filename, or None if writing failed or a state's results
+            could only be read in part
+        """
+        if filename is None:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            filename = f'hud_properties_{timestamp}.json'
+        
+        def indented(value, indent):
+            return json.dumps(value, indent=2, default=str).replace('\n', '\n' + ' ' * indent)
+        
+        try:
+            with open(filename, 'w') as f:
+                f.write('{')
+                state_count = 0
+                for state in states:
+                    f.write(',\n  ' if state_count else '\n  ')
+                    state_count += 1
+                    f.write(json.dumps(state) + ': [')
+                    count = 0
+                    for prop in self.iter_state_properties(state):
+                        f.write(',\n    ' if count else '\n    ')
+                        f.write(indented(prop, 4))
+                        count += 1
+                    f.write('\n  ]' if count else ']')
+                    logger.info(f"Wrote {count} properties for {state}")
+                f.write('\n}' if state_count else '}')
+            logger.info(f"Properties saved to {filename}")
+            return filename
+        except IncompleteScrapeError as e:
+            logger.error(f"Not saving {filename}: {e}")
+            try:
+                os.remove(filename)  # a partial document would read as complete states
+            except OSError:
+                pass
+            return None
+        except Exception as e:
+            logger.error(f"Error saving to JSON: {e}")
+            return None
+
+def _page_href(href: Optional[str]) -> Optional[str]:
+    """A followable next-page href, or None for placeholders like '#' and javascript: links"""
+    if not href:
+        return None
+    href = href.strip()
+    if not href or href.startswith('#') or href.lower().startswith('javascript:'):
+        return None
+    return href
+
 def main():
     """Main function to run the scraper"""
     scraper = HUDPropertyScraper()
     
     # Scrape North Carolina properties as primary focus
-    nc_properties = scraper.get_state_properties('NC')
+    results = scraper.scrape_all_states(['NC'], max_workers=1)
+    if scraper.incomplete_states:
+        logger.error(f"Not saving incomplete states: {scraper.incomplete_states}")
     
     # Save results
-    results = {'NC': nc_properties}
     scraper.save_to_json(results)
     
     # Print summary
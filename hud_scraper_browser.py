@@ -16,18 +16,83 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException
 
+from hud_fixtures import recorder_from_env
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Runs in the search results page: pulls each property out of the results
+# container's rendered text
+JS_EXTRACT = """
+const container = document.getElementById('search_results_container');
+if (!container) return [];
+
+const allText = container.innerText;
+const properties = [];
+
+// Regex pattern to match property data
+const pattern = /\\$([\\d,]+)\\s+([^\\n]+)\\s+([^,]+),\\s*(\\w{2}),\\s*(\\d{5})\\s+(\\d+)\\s+Beds?\\s+([\\d.]+)\\s+Baths?\\s+([^\\n]+County)\\s+Case #:\\s*(\\d+-\\d+)/g;
+
+let match;
+while ((match = pattern.exec(allText)) !== null) {
+    const caseNumber = match[9];
+    
+    // Find property section
+    const caseIndex = allText.indexOf(caseNumber);
+    const sectionStart = Math.max(0, caseIndex - 500);
+    const sectionEnd = caseIndex + 200;
+    const section = allText.substring(sectionStart, sectionEnd);
+    
+    // Check listing status
+    const isNew = section.includes('NEW LISTING') || section.includes('New Listing');
+    const isReduced = section.includes('PRICE REDUCED') || section.includes('Price Reduced');
+    
+    // Extract listing period
+    const periodMatch = section.match(/Listing Period:\\s*(\\w+)/);
+    const listingPeriod = periodMatch ? periodMatch[1] : '';
+    
+    // Extract bid date
+    const bidMatch = section.match(/BIDS OPEN\\s+(\\d{2}\\/\\d{2}\\/\\d{4})/);
+    const bidDate = bidMatch ? bidMatch[1] : '';
+    
+    properties.push({
+        case_number: caseNumber,
+        address: match[2].trim(),
+        city: match[3].trim(),
+        state: match[4],
+        zip_code: match[5],
+        county: match[8].replace(' County', '').trim(),
+        price: parseFloat(match[1].replace(/,/g, '')),
+        beds: parseInt(match[6]),
+        baths: parseFloat(match[7]),
+        is_new_listing: isNew,
+        is_price_reduced: isReduced,
+        listing_period: listingPeriod,
+        bid_deadline: bidDate
+    });
+}
+
+return properties;
+"""
+
+
 class HUDScraperBrowser:
     """HUD Property Scraper using browser automation"""
     
-    def __init__(self, headless: bool = True):
-        """Initialize the scraper"""
+    def __init__(self, headless: bool = True, record_dir: str = None):
+        """
+        Initialize the scraper
+        
+        Args:
+            headless: Run Chrome without a window
+            record_dir: Save each rendered search page here as a test fixture
+                        (default: HUD_FIXTURE_DIR env var; unset disables)
+        """
         self.base_url = "https://www.hudhomestore.gov"
         self.headless = headless
         self.driver = None
+        self.fixture_recorder = recorder_from_env('browser', record_dir)
         
     def _init_driver(self):
         """Initialize Selenium WebDriver"""
@@ -73,61 +138,11 @@ class HUDScraperBrowser:
             # Wait for page to load
             time.sleep(5)
             
-            # Execute JavaScript to extract property data
-            js_extract = """
-            const container = document.getElementById('search_results_container');
-            if (!container) return [];
-            
-            const allText = container.innerText;
-            const properties = [];
-            
-            // Regex pattern to match property data
-            const pattern = /\\$([\\d,]+)\\s+([^\\n]+)\\s+([^,]+),\\s*(\\w{2}),\\s*(\\d{5})\\s+(\\d+)\\s+Beds?\\s+([\\d.]+)\\s+Baths?\\s+([^\\n]+County)\\s+Case #:\\s*(\\d+-\\d+)/g;
-            
-            let match;
-            while ((match = pattern.exec(allText)) !== null) {
-                const caseNumber = match[9];
-                
-                // Find property section
-                const caseIndex = allText.indexOf(caseNumber);
-                const sectionStart = Math.max(0, caseIndex - 500);
-                const sectionEnd = caseIndex + 200;
-                const section = allText.substring(sectionStart, sectionEnd);
-                
-                // Check listing status
-                const isNew = section.includes('NEW LISTING') || section.includes('New Listing');
-                const isReduced = section.includes('PRICE REDUCED') || section.includes('Price Reduced');
-                
-                // Extract listing period
-                const periodMatch = section.match(/Listing Period:\\s*(\\w+)/);
-                const listingPeriod = periodMatch ? periodMatch[1] : '';
-                
-                // Extract bid date
-                const bidMatch = section.match(/BIDS OPEN\\s+(\\d{2}\\/\\d{2}\\/\\d{4})/);
-                const bidDate = bidMatch ? bidMatch[1] : '';
-                
-                properties.push({
-                    case_number: caseNumber,
-                    address: match[2].trim(),
-                    city: match[3].trim(),
-                    state: match[4],
-                    zip_code: match[5],
-                    county: match[8].replace(' County', '').trim(),
-                    price: parseFloat(match[1].replace(/,/g, '')),
-                    beds: parseInt(match[6]),
-                    baths: parseFloat(match[7]),
-                    is_new_listing: isNew,
-                    is_price_reduced: isReduced,
-                    listing_period: listingPeriod,
-                    bid_deadline: bidDate
-                });
-            }
-            
-            return properties;
-            """
+            if self.fixture_recorder is not None:
+                self.fixture_recorder.save(state_code, self.driver.page_source)
             
             # Execute the extraction script
-            properties = self.driver.execute_script(js_extract)
+            properties = self.driver.execute_script(JS_EXTRACT)
             
             if properties:
                 # Add metadata to each property
@@ -175,11 +190,12 @@ def main():
     parser.add_argument('--state', type=str, required=True, help='State code (e.g., NC, SC, FL)')
     parser.add_argument('--output', type=str, help='Output JSON file')
     parser.add_argument('--visible', action='store_true', help='Run browser in visible mode')
+    parser.add_argument('--record-fixtures', metavar='DIR', help='Save the rendered search page to DIR as a test fixture')
     
     args = parser.parse_args()
     
     # Create scraper
-    scraper = HUDScraperBrowser(headless=not args.visible)
+    scraper = HUDScraperBrowser(headless=not args.visible, record_dir=args.record_fixtures)
     
     # Scrape properties
     logger.info(f"Starting scrape for state: {args.state}")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Pre-serialized JSON Fragments for USAhudHomes.com
+Encodes each property once per data load, so list and detail responses are
+assembled by joining stored bytes instead of re-serializing every row
+"""
+
+import dataclasses
+import json
+import logging
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard library encoder is used instead
+    orjson = None
+
+from flask import Response
+
+logger = logging.getLogger(__name__)
+
+
+def _default(value):
+    """Encoder hook for the types the API puts in payloads besides plain JSON"""
+    if isinstance(value, Mapping):
+        return dict(value)  # PropertyRecord, MappedRow
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    return str(value)
+
+
+def dumps(value) -> bytes:
+    """
+    Encode a value as compact JSON with sorted keys (the same shape as jsonify)
+
+    Uses orjson when installed, else the json module.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, default=_default, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits; the json module handles those
+    return json.dumps(value, default=_default, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def encode_object(values: Dict, raw: Optional[Dict[str, bytes]] = None) -> bytes:
+    """
+    Encode a JSON object whose members may already be encoded
+
+    Args:
+        values: Members to encode
+        raw: Members given as encoded JSON bytes, inserted as-is
+
+    Returns:
+        JSON bytes with keys sorted, as jsonify would emit them
+    """
+    members = {key: dumps(value) for key, value in values.items()}
+    if raw:
+        members.update(raw)
+    return b'{' + b','.join(dumps(key) + b':' + members[key] for key in sorted(members)) + b'}'
+
+
+def encode_array(fragments: Iterable[bytes]) -> bytes:
+    """Join encoded JSON values into a JSON array"""
+    return b'[' + b','.join(fragments) + b']'
+
+
+def json_body_response(body: bytes, status: int = 200) -> Response:
+    """Response for an already encoded JSON body (newline-terminated like jsonify)"""
+    return Response(body + b'\n', status=status, mimetype='application/json')
+
+
+class JSONFragments:
+    """Encoded JSON for each row of one loaded property list"""
+
+    def __init__(self, rows: Optional[List] = None):
+        # Keyed by object identity: rows are immutable and the snapshot that
+        # owns this index keeps them alive, so an id cannot be reused meanwhile
+        self._fragments: Dict[int, bytes] = {}
+        self.bytes = 0
+        for row in rows or ():
+            fragment = dumps(row)
+            self._fragments[id(row)] = fragment
+            self.bytes += len(fragment)
+
+    def get(self, row) -> bytes:
+        """Encoded row; rows from another load are encoded on the fly"""
+        fragment = self._fragments.get(id(row))
+        return fragment if fragment is not None else dumps(row)
+
+    def array(self, rows: Iterable) -> bytes:
+        """Encoded JSON array of rows"""
+        return encode_array(self.get(row) for row in rows)
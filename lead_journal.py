@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Lead Journal for USAhudHomes.com
+Append-only JSONL log of lead writes with group commit: concurrent writers
+share one fsync per batch, so leads survive a restart without paying a
+full fsync per request
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterator
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def read_journal(path: str) -> Iterator[Dict]:
+    """
+    Yield the records of a journal file in write order
+
+    A torn last line (crash mid-write) or any other unparsable line is
+    skipped with a warning.
+    """
+    if not os.path.exists(path):
+        return
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logger.warning(f"Skipping unreadable journal record {path}:{line_number}")
+
+
+class LeadJournal:
+    """Append-only JSONL file written and fsynced by one background thread"""
+
+    def __init__(self, path: str):
+        self.path = path
+        # Each batch goes out as one write() on an O_APPEND descriptor, so
+        # batches from several worker processes never interleave
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._terminate_torn_line()
+        # Next free lead number, shared by every process appending to this journal
+        self._id_file = open(path + '.ids', 'a+b')
+        self._cond = threading.Condition()
+        self._pending = []
+        self._appended = 0  # sequence number of the last accepted record
+        self._synced = 0    # sequence number of the last record on disk
+        self._callbacks = []  # (sequence, callback) run once that record is on disk
+        self._closing = False
+        self.batches = 0
+        self.last_error = None
+        self._writer = threading.Thread(target=self._run, name='lead-journal-writer', daemon=True)
+        self._writer.start()
+
+    def _terminate_torn_line(self):
+        """End a partial last line left by a crash so the next record starts on its own line"""
+        size = os.fstat(self._fd).st_size
+        if size == 0:
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+        os.write(self._fd, b'\n')
+        os.fsync(self._fd)
+
+    def allocate_number(self, floor: int) -> int:
+        """
+        Reserve a lead number no other process writing this journal will get
+
+        Each web worker keeps its own in-memory counter, so the next free
+        number is kept in <journal>.ids and advanced under an exclusive
+        file lock. Without fcntl (Windows) only this process is covered.
+
+        Args:
+            floor: Lowest number this process may use (one past every ID it knows)
+
+        Returns:
+            The reserved number
+        """
+        if fcntl is None:
+            return floor
+        fd = self._id_file.fileno()
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            os.lseek(fd, 0, os.SEEK_SET)
+            stored = os.read(fd, 32).strip()
+            number = max(int(stored) if stored.isdigit() else 0, floor)
+            # Not fsynced: after a crash the floor replayed from the journal
+            # covers every lead whose add was acknowledged
+            os.ftruncate(fd, 0)
+            os.write(fd, str(number + 1).encode('ascii'))
+            return number
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def append(self, record: Dict) -> int:
+        """
+        Queue a record without waiting for the disk
+
+        Records are written in the order append is called, so callers that
+        need ordering append while holding their own lock and wait after
+        releasing it.
+
+        Returns:
+            Sequence number to pass to wait()
+        """
+        line = (json.dumps(record, default=str) + '\n').encode('utf-8')
+        with self._cond:
+            if self._closing:
+                raise RuntimeError('Lead journal is closed')
+            self._pending.append(line)
+            self._appended += 1
+            self._cond.notify_all()
+            return self._appended
+
+    def wait(self, sequence: int):
+        """Block until the record with this sequence number has been fsynced"""
+        with self._cond:
+            while self._synced < sequence:
+                self._cond.wait()
+
+    def when_synced(self, sequence: int, callback):
+        """
+        Call callback() once the record with this sequence number is fsynced
+
+        Runs immediately if it already is, else on the writer thread.
+        """
+        with self._cond:
+            if self._synced < sequence:
+                self._callbacks.append((sequence, callback))
+                return
+        callback()
+
+    async def wait_async(self, sequence: int):
+        """Await the fsync of a record without holding a thread"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def release():
+            if not future.done():
+                future.set_result(None)
+
+        self.when_synced(sequence, lambda: loop.call_soon_threadsafe(release))
+        await future
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                # Everything queued while the previous fsync ran goes out as one batch
+                batch, self._pending = self._pending, []
+                sequence = self._appended
+
+            try:
+                self._write(b''.join(batch))
+                os.fsync(self._fd)
+            except OSError as e:
+                # Waiters are released either way; the leads stay in memory
+                logger.error(f"Error writing lead journal {self.path}: {e}")
+                self.last_error = str(e)
+
+            with self._cond:
+                self._synced = sequence
+                self.batches += 1
+                self._cond.notify_all()
+                ready = [callback for seq, callback in self._callbacks if seq <= sequence]
+                if ready:
+                    self._callbacks = [(seq, callback) for seq, callback in self._callbacks if seq > sequence]
+
+            for callback in ready:
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error(f"Error in lead journal callback: {e}")
+
+    def _write(self, data: bytes):
+        """
+        Append a batch with a single write() call
+
+        The kernel places an O_APPEND write at the end of the file atomically,
+        unlike a buffered file object, which may split it into several
+        writes. A short write (e.g. disk full) is finished with further
+        writes.
+        """
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._fd, view):]
+
+    def close(self):
+        """Flush queued records and stop the writer thread"""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._writer.join()
+        os.close(self._fd)
+        self._id_file.close()
+
+    def status(self) -> Dict:
+        with self._cond:
+            return {
+                'path': self.path,
+                'records': self._appended,
+                'synced': self._synced,
+                'batches': self.batches,
+                'last_error': self.last_error
+            }
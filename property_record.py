@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Compact Property Records for USAhudHomes.com
+Slotted, read-only stand-ins for the property dicts loaded from JSON, with
+interned repeated strings and an enum-coded status, so each worker holds a
+fraction of the memory per listing. Records read like dicts and become
+real dicts only when serialized.
+"""
+
+import sys
+import threading
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List
+
+from flask.json.provider import DefaultJSONProvider
+
+# Fields with a dedicated slot, in the order they appear in the data files
+PROPERTY_FIELDS = (
+    'property_id', 'address', 'city', 'state', 'state_name', 'zip_code', 'county',
+    'price', 'bedrooms', 'bathrooms', 'sq_ft', 'status', 'listing_period', 'listing_source',
+    'bid_open_date', 'bid_deadline', 'created_at', 'updated_at'
+)
+
+# Low-cardinality string fields shared between listings via sys.intern
+INTERNED_FIELDS = frozenset((
+    'city', 'state', 'state_name', 'zip_code', 'county', 'listing_period',
+    'listing_source', 'bid_open_date', 'bid_deadline'
+))
+
+_SLOT_FIELDS = tuple(field for field in PROPERTY_FIELDS if field != 'status')
+_SLOT_FIELD_SET = frozenset(_SLOT_FIELDS)
+
+# Status enum: code -> value; append-only, so a code never changes meaning
+_STATUS_VALUES: List[Any] = []
+_STATUS_CODES: Dict[Any, int] = {}
+_STATUS_LOCK = threading.Lock()
+_NO_STATUS = -1
+
+_MISSING = object()
+
+
+def _status_code(value) -> int:
+    code = _STATUS_CODES.get(value)
+    if code is None:
+        with _STATUS_LOCK:
+            code = _STATUS_CODES.get(value)
+            if code is None:
+                # Publish the value before the code so readers never see a dangling code
+                _STATUS_VALUES.append(value)
+                code = _STATUS_CODES[value] = len(_STATUS_VALUES) - 1
+    return code
+
+
+class PropertyRecord(Mapping):
+    """Read-only mapping over one property listing"""
+
+    __slots__ = _SLOT_FIELDS + ('_status', '_extra')
+
+    def __init__(self, data: Dict):
+        """
+        Copy a property dict into slots
+
+        Args:
+            data: Property dictionary as loaded from JSON; keys outside
+                  PROPERTY_FIELDS are kept in a small side dict
+        """
+        for field in _SLOT_FIELDS:
+            value = data.get(field, _MISSING)
+            if field in INTERNED_FIELDS and type(value) is str:
+                value = sys.intern(value)
+            object.__setattr__(self, field, value)
+
+        object.__setattr__(self, '_status', _status_code(data['status']) if 'status' in data else _NO_STATUS)
+
+        extra = {key: value for key, value in data.items() if key not in _SLOT_FIELD_SET and key != 'status'}
+        object.__setattr__(self, '_extra', extra or None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('PropertyRecord is read-only')
+
+    def __getitem__(self, key):
+        if key in _SLOT_FIELD_SET:
+            value = getattr(self, key)
+            if value is not _MISSING:
+                return value
+        elif key == 'status':
+            if self._status != _NO_STATUS:
+                return _STATUS_VALUES[self._status]
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        for field in PROPERTY_FIELDS:
+            if field in self:
+                yield field
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> Dict:
+        """Plain dict copy, for serialization"""
+        return {key: self[key] for key in self}
+
+    def __repr__(self) -> str:
+        return f'PropertyRecord({self.to_dict()!r})'
+
+    def __reduce__(self):
+        return PropertyRecord, (self.to_dict(),)
+
+
+def compact_properties(properties: List[Dict]) -> List[PropertyRecord]:
+    """Convert loaded property dicts into PropertyRecords"""
+    return [PropertyRecord(prop) for prop in properties]
+
+
+def json_default(value):
+    """json.dumps `default` hook that serializes records (any Mapping) and falls back to str"""
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
+
+
+class RecordJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes record mappings (PropertyRecord, MappedRow) as objects"""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, Mapping):
+            return dict(o)
+        return DefaultJSONProvider.default(o)
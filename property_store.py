@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+Columnar Property Store for USAhudHomes.com
+Keeps the filterable property fields as typed NumPy arrays so a search is
+evaluated as one combined boolean mask instead of one list pass per filter
+"""
+
+import base64
+import bisect
+import heapq
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; DataService falls back to list filtering
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Supported `sort` values: name -> (field, descending)
+SORT_OPTIONS = {
+    'newest': ('created_at', True),
+    'price_asc': ('price', False),
+    'price_desc': ('price', True),
+    'bid_deadline': ('bid_deadline', False),
+}
+DEFAULT_SORT = 'newest'
+
+# Bedroom facet buckets; the first also counts fewer bedrooms, the last more
+BEDROOM_FACETS = ('1', '2', '3', '4', '5+')
+
+# Price facet band edges; the last band is open-ended
+PRICE_FACET_EDGES = (0, 50000, 100000, 150000, 200000, 300000, 500000)
+
+
+def columnar_available() -> bool:
+    """Return True when NumPy is installed and the columnar store can be used"""
+    return np is not None
+
+
+def _to_float(value) -> float:
+    """Coerce a JSON number to float, mapping missing values to NaN"""
+    if value is None or value == '':
+        return float('nan')
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def sort_key(field: str, reverse: bool = False) -> Callable[[Dict], tuple]:
+    """
+    Build a row sort key that puts missing values last in either direction
+
+    Args:
+        field: Dictionary key to sort on
+        reverse: True when the key will be used for a descending sort
+    """
+    def key(row):
+        value = row.get(field)
+        missing = value is None or value == ''
+        return (missing != reverse, 0 if missing else value)
+    return key
+
+
+def page_key(field: str, reverse: bool = False, id_field: str = 'property_id') -> Callable[[Dict], tuple]:
+    """
+    Sort key for keyset pagination: the field, then the row ID as tiebreak
+
+    The whole tuple is reversed for descending sorts, so ties on the field
+    are ordered by descending ID there.
+    """
+    field_key = sort_key(field, reverse)
+    return lambda row: (field_key(row), row[id_field])
+
+
+def encode_cursor(sort: str, value: Any, row_id: str) -> str:
+    """Encode the sort key and ID of the last row on a page as an opaque cursor"""
+    payload = json.dumps([sort, value, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, str]:
+    """
+    Decode a cursor from encode_cursor
+
+    Returns:
+        (sort field value, row ID) of the last row already returned
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another sort
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+    if cursor_sort != sort:
+        raise ValueError(f"Cursor was issued for sort={cursor_sort}")
+    if not isinstance(row_id, str) or isinstance(value, (list, dict)):
+        raise ValueError('Invalid cursor')
+    return value, row_id
+
+
+def page_rows(rows: List[Dict], field: str, reverse: bool = False, limit: int = 50,
+              after: Optional[Tuple[Any, str]] = None,
+              id_field: str = 'property_id') -> Tuple[List[Dict], bool]:
+    """
+    Return one keyset page of rows ordered by (field, id_field)
+
+    Args:
+        after: (field value, row ID) of the last row of the previous page
+
+    Returns:
+        (page rows, whether more rows follow)
+    """
+    key = page_key(field, reverse, id_field)
+
+    if after is not None:
+        value, row_id = after
+        cursor_key = key({field: value, id_field: row_id})
+        if reverse:
+            rows = [row for row in rows if key(row) < cursor_key]
+        else:
+            rows = [row for row in rows if key(row) > cursor_key]
+
+    page = top_k(rows, key, reverse=reverse, limit=limit)
+    return page, len(rows) > len(page)
+
+
+def top_k(rows: List[Dict], key: Callable, reverse: bool = False, limit: int = 50) -> List[Dict]:
+    """
+    Return sorted(rows, key=key, reverse=reverse)[:limit]
+
+    Uses a bounded heap when only a small page of a large list is wanted,
+    which is O(N log k) instead of a full O(N log N) sort.
+    """
+    if 0 < limit and limit * 8 < len(rows):
+        select = heapq.nlargest if reverse else heapq.nsmallest
+        return select(limit, rows, key=key)
+    return sorted(rows, key=key, reverse=reverse)[:limit]
+
+
+def _facet_payload(state_counts: Dict[str, int], status_counts: Dict[str, int],
+                   bedroom_counts: Sequence[int], price_counts: Sequence[int]) -> Dict:
+    """Assemble facet counts into the /api/properties/facets shape"""
+    edges = PRICE_FACET_EDGES
+    return {
+        'state': {key: count for key, count in state_counts.items() if count and key is not None},
+        'status': {key: count for key, count in status_counts.items() if count and key is not None},
+        'bedrooms': dict(zip(BEDROOM_FACETS, (int(c) for c in bedroom_counts))),
+        'price': [
+            {'min': edges[i], 'max': edges[i + 1] if i + 1 < len(edges) else None, 'count': int(count)}
+            for i, count in enumerate(price_counts)
+        ]
+    }
+
+
+def facet_counts(rows: Sequence[Dict]) -> Dict:
+    """Count rows per state, status, bedroom bucket and price band (list fallback)"""
+    state_counts: Dict[str, int] = {}
+    status_counts: Dict[str, int] = {}
+    bedroom_counts = [0] * len(BEDROOM_FACETS)
+    price_counts = [0] * len(PRICE_FACET_EDGES)
+
+    for row in rows:
+        state_counts[row.get('state')] = state_counts.get(row.get('state'), 0) + 1
+        status_counts[row.get('status')] = status_counts.get(row.get('status'), 0) + 1
+
+        bedrooms = _to_float(row.get('bedrooms'))
+        if bedrooms == bedrooms:
+            bedroom_counts[min(max(int(bedrooms), 1), len(BEDROOM_FACETS)) - 1] += 1
+
+        price = _to_float(row.get('price'))
+        if price >= 0:
+            price_counts[bisect.bisect_right(PRICE_FACET_EDGES, price) - 1] += 1
+
+    return _facet_payload(state_counts, status_counts, bedroom_counts, price_counts)
+
+
+class PropertyStore:
+    """Typed column arrays built over a list of property dictionaries"""
+
+    def __init__(self, properties: List[Dict], columns=None):
+        """
+        Build the column arrays
+
+        Args:
+            properties: Property dictionaries; rows are returned as-is from search
+            columns: Optional source of ready-made float64 columns (a MappedTable),
+                     used as zero-copy views instead of reading every row;
+                     when it stores a full index, nothing is rebuilt
+        """
+        if np is None:
+            raise RuntimeError('numpy is required for PropertyStore')
+
+        self.properties = properties
+        self.size = len(properties)
+        self.sort_keys = {}
+        self.sort_values = {}
+        self.positions = {}
+
+        # A binary snapshot carries every array below precomputed
+        index = columns.store_index() if columns is not None else None
+        if index is not None:
+            self._load_index(*index)
+            return
+
+        # Categorical columns are dictionary-encoded so equality is an int compare
+        self.state_codes, self.state_lookup = self._encode(self._values(properties, 'state', columns))
+        self.status_codes, self.status_lookup = self._encode(self._values(properties, 'status', columns))
+
+        self.price = self._numeric(properties, 'price', columns)
+        self.bedrooms = self._numeric(properties, 'bedrooms', columns)
+        self.bathrooms = self._numeric(properties, 'bathrooms', columns)
+
+        self.ids = np.array([str(v or '') for v in self._values(properties, 'property_id', columns)], dtype=str)
+        _, id_rank = np.unique(self.ids, return_inverse=True)
+
+        # Presorted permutation per sort option: `positions[sort][row]` is the
+        # row's place in that ordering, so filtered rows never need a full sort.
+        # Ties break on property_id, descending for descending sorts, to give
+        # the same total order as page_key for keyset pagination.
+        for sort, (field, reverse) in SORT_OPTIONS.items():
+            key, values = self._sort_column(properties, field, columns)
+            tiebreak = id_rank
+            if reverse:
+                key = -key
+                tiebreak = -id_rank
+            order = np.lexsort((tiebreak, key))
+            positions = np.empty(self.size, dtype=np.intp)
+            positions[order] = np.arange(self.size, dtype=np.intp)
+            self.sort_keys[sort] = key
+            self.sort_values[sort] = values
+            self.positions[sort] = positions
+
+    def index_arrays(self) -> Tuple[Dict[str, Any], Dict[str, List]]:
+        """
+        Every derived array, for storing in a binary snapshot
+
+        Returns:
+            (name -> 1-d array, categorical lookups as values in code order)
+        """
+        arrays = {
+            'state_codes': self.state_codes,
+            'status_codes': self.status_codes,
+            'price': self.price,
+            'bedrooms': self.bedrooms,
+            'bathrooms': self.bathrooms,
+            'ids': self.ids,
+        }
+        for sort in SORT_OPTIONS:
+            arrays[f'{sort}.key'] = self.sort_keys[sort]
+            arrays[f'{sort}.positions'] = self.positions[sort].astype(np.int64)
+            if self.sort_values[sort] is not None:
+                arrays[f'{sort}.values'] = self.sort_values[sort]
+        return arrays, {'state': list(self.state_lookup), 'status': list(self.status_lookup)}
+
+    def _load_index(self, arrays: Dict[str, Any], lookups: Dict[str, List]):
+        """Adopt arrays from index_arrays (read-only views into the snapshot map)"""
+        self.state_codes = arrays['state_codes']
+        self.status_codes = arrays['status_codes']
+        self.state_lookup = {value: code for code, value in enumerate(lookups['state'])}
+        self.status_lookup = {value: code for code, value in enumerate(lookups['status'])}
+        self.price = arrays['price']
+        self.bedrooms = arrays['bedrooms']
+        self.bathrooms = arrays['bathrooms']
+        self.ids = arrays['ids']
+        for sort in SORT_OPTIONS:
+            self.sort_keys[sort] = arrays[f'{sort}.key']
+            self.sort_values[sort] = arrays.get(f'{sort}.values')
+            self.positions[sort] = arrays[f'{sort}.positions']
+
+    def _encode(self, values):
+        """Dictionary-encode a categorical column into int32 codes"""
+        lookup = {}
+        codes = np.fromiter(
+            (lookup.setdefault(value, len(lookup)) for value in values),
+            dtype=np.int32, count=self.size
+        )
+        return codes, lookup
+
+    @staticmethod
+    def _values(properties: List[Dict], field: str, columns=None) -> List:
+        """One field of every row, None where missing"""
+        if columns is not None:
+            return columns.values_list(field)
+        return [p.get(field) for p in properties]
+
+    @staticmethod
+    def _numeric(properties: List[Dict], field: str, columns=None):
+        """Build a float64 column, with NaN for missing values"""
+        if columns is not None:
+            column = columns.numeric_column(field)
+            if column is not None:
+                return column
+        return np.array([_to_float(p.get(field)) for p in properties], dtype=np.float64)
+
+    def _sort_column(self, properties: List[Dict], field: str, columns=None):
+        """
+        Build an ascending float64 sort key for a field
+
+        Strings (ISO timestamps) are replaced by their dense rank. Missing
+        values become NaN, which sorts last.
+
+        Returns:
+            (key array, sorted distinct string values or None for numbers)
+        """
+        if field == 'price':
+            return self.price.copy(), None
+
+        values = np.array([v or '' for v in self._values(properties, field, columns)], dtype=str)
+        distinct, rank = np.unique(values, return_inverse=True)
+        key = rank.astype(np.float64)
+        key[values == ''] = np.nan
+        return key, distinct
+
+    def _cursor_key(self, sort: str, value) -> float:
+        """Map a raw cursor value into the float key space of a sort option"""
+        distinct = self.sort_values[sort]
+        if distinct is None:
+            key = _to_float(value)
+        else:
+            value = str(value)
+            rank = int(np.searchsorted(distinct, value))
+            exact = rank < len(distinct) and distinct[rank] == value
+            # A value no longer in the dataset falls between its neighbours
+            key = float(rank) if exact else rank - 0.5
+        return -key if SORT_OPTIONS[sort][1] else key
+
+    def after_mask(self, sort: str, value, row_id: str):
+        """Boolean mask of rows ordered after (value, row_id) for a sort option"""
+        key = self.sort_keys[sort]
+        reverse = SORT_OPTIONS[sort][1]
+        id_after = self.ids < row_id if reverse else self.ids > row_id
+        missing = np.isnan(key)
+
+        # Missing values sort last, so a cursor there only has missing rows after it
+        if value is None or value == '':
+            return missing & id_after
+
+        cursor_key = self._cursor_key(sort, value)
+        if np.isnan(cursor_key):
+            return missing & id_after
+        return missing | (key > cursor_key) | ((key == cursor_key) & id_after)
+
+    def filter_mask(self, matches: Optional[Sequence[int]] = None, state: Optional[str] = None,
+                    min_price: Optional[float] = None, max_price: Optional[float] = None,
+                    bedrooms: Optional[int] = None, bathrooms: Optional[float] = None,
+                    status: Optional[str] = None):
+        """
+        Evaluate the filters as a single boolean mask
+
+        Args:
+            matches: Row indices matching the free-text query (None means no query)
+
+        Returns:
+            Boolean array with one entry per property
+        """
+        if matches is not None:
+            mask = np.zeros(self.size, dtype=bool)
+            mask[np.asarray(matches, dtype=np.intp)] = True
+        else:
+            mask = np.ones(self.size, dtype=bool)
+
+        if state:
+            mask &= self.state_codes == self.state_lookup.get(state, -1)
+
+        if min_price is not None:
+            mask &= self.price >= min_price
+
+        if max_price is not None:
+            mask &= self.price <= max_price
+
+        if bedrooms is not None:
+            mask &= self.bedrooms >= bedrooms
+
+        if bathrooms is not None:
+            mask &= self.bathrooms >= bathrooms
+
+        if status:
+            mask &= self.status_codes == self.status_lookup.get(status, -1)
+
+        return mask
+
+    def facet_counts(self, mask) -> Dict:
+        """Count the rows selected by a filter mask per facet, one bincount per facet"""
+        states = np.bincount(self.state_codes[mask], minlength=len(self.state_lookup))
+        statuses = np.bincount(self.status_codes[mask], minlength=len(self.status_lookup))
+
+        bedrooms = self.bedrooms[mask]
+        bedrooms = bedrooms[~np.isnan(bedrooms)]
+        bedroom_buckets = np.clip(bedrooms.astype(np.int64), 1, len(BEDROOM_FACETS)) - 1
+
+        prices = self.price[mask]
+        prices = prices[prices >= 0]  # also drops NaN
+        price_bands = np.searchsorted(PRICE_FACET_EDGES, prices, side='right') - 1
+
+        return _facet_payload(
+            {state: int(states[code]) for state, code in self.state_lookup.items()},
+            {status: int(statuses[code]) for status, code in self.status_lookup.items()},
+            np.bincount(bedroom_buckets, minlength=len(BEDROOM_FACETS)),
+            np.bincount(price_bands, minlength=len(PRICE_FACET_EDGES))
+        )
+
+    def search(self, matches: Optional[Sequence[int]] = None, state: Optional[str] = None,
+               min_price: Optional[float] = None, max_price: Optional[float] = None,
+               bedrooms: Optional[int] = None, bathrooms: Optional[float] = None,
+               status: Optional[str] = None, sort: str = DEFAULT_SORT,
+               limit: int = 50, after: Optional[Tuple[Any, str]] = None):
+        """
+        Search properties with filters, ordered by one of SORT_OPTIONS
+
+        Args:
+            matches: Row indices matching the free-text query (None means no query)
+            sort: Key of SORT_OPTIONS
+            after: (sort value, property_id) of the last row of the previous page
+
+        Returns:
+            (page rows, total matching rows, whether more rows follow)
+        """
+        mask = self.filter_mask(matches=matches, state=state, min_price=min_price, max_price=max_price,
+                                bedrooms=bedrooms, bathrooms=bathrooms, status=status)
+
+        # The real match count falls out of the mask without building any rows
+        total = int(np.count_nonzero(mask))
+
+        if after is not None:
+            mask &= self.after_mask(sort, *after)
+
+        indices = np.flatnonzero(mask)
+        page = self.ordered(indices, sort, limit)
+
+        return [self.properties[i] for i in page.tolist()], total, len(indices) > len(page)
+
+    def ordered(self, indices, sort: str = DEFAULT_SORT, limit: int = 50):
+        """
+        Order row indices by a presorted permutation and keep the first `limit`
+
+        Positions are unique, so a partial selection (argpartition) followed
+        by sorting only the selected rows gives the same page as a full sort.
+        """
+        positions = self.positions[sort][indices]
+
+        if 0 < limit < len(indices):
+            selected = np.argpartition(positions, limit - 1)[:limit]
+            return indices[selected[np.argsort(positions[selected])]]
+
+        return indices[np.argsort(positions)][:limit]
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Rate Limiting for USAhudHomes.com
+Thread-safe token buckets, one per host, so concurrent scraper workers stay
+within a polite request rate without serial sleeps
+"""
+
+import logging
+import threading
+import time
+from typing import Dict
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, in bursts of up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Most tokens held at once (the burst size)
+        """
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens, sleeping until they are available
+
+        The tokens are reserved before sleeping (the balance may go negative),
+        so concurrent callers are served in arrival order.
+
+        Returns:
+            Seconds spent waiting
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.waited += wait
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class HostRateLimiter:
+    """A TokenBucket per host, created on first use"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Args:
+            rate: Requests per second allowed to each host (0 disables limiting)
+            capacity: Burst size per host
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url: str) -> float:
+        """Wait for a request slot for the URL's host; returns seconds waited"""
+        if self.rate <= 0:
+            return 0.0
+
+        host = urlsplit(url).netloc.lower()
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(host)
+                if bucket is None:
+                    bucket = self._buckets[host] = TokenBucket(self.rate, self.capacity)
+        return bucket.acquire()
+
+    def stats(self) -> Dict[str, Dict]:
+        """Seconds each host's callers have spent waiting"""
+        with self._lock:
+            return {host: {'rate': bucket.rate, 'waited_seconds': round(bucket.waited, 3)}
+                    for host, bucket in self._buckets.items()}
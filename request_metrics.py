@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Request Metrics for USAhudHomes.com
+WSGI middleware recording per-route latency and response size histograms,
+status and error counts and in-flight requests for the Flask apps, exposed
+in the Prometheus text format. Each thread writes only its own counters, so
+the request path takes no lock; a scrape sums the per-thread shards.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+from flask import Flask, Response, request
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Histogram upper bounds (the +Inf bucket is implicit)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Route label for requests that matched no URL rule (404s, 405s)
+UNMATCHED_ROUTE = 'unmatched'
+
+_ROUTE_KEY = 'request_metrics.route'
+
+
+class _Series:
+    """Counters for one (method, route) on one thread"""
+
+    __slots__ = ('latency', 'latency_sum', 'size', 'size_sum', 'statuses', 'errors')
+
+    def __init__(self):
+        self.latency = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.size = [0] * (len(SIZE_BUCKETS) + 1)
+        self.size_sum = 0
+        self.statuses: Dict[int, int] = {}
+        self.errors = 0
+
+    def merge(self, other: '_Series'):
+        self.latency = [a + b for a, b in zip(self.latency, other.latency)]
+        self.latency_sum += other.latency_sum
+        self.size = [a + b for a, b in zip(self.size, other.size)]
+        self.size_sum += other.size_sum
+        for status, count in list(other.statuses.items()):
+            self.statuses[status] = self.statuses.get(status, 0) + count
+        self.errors += other.errors
+
+
+class _Shard:
+    """One thread's counters; only that thread writes them"""
+
+    __slots__ = ('thread', 'series', 'started', 'finished')
+
+    def __init__(self, thread: threading.Thread):
+        self.thread = thread
+        self.series: Dict[Tuple[str, str], _Series] = {}
+        self.started = 0
+        self.finished = 0
+
+
+class _BodyIterator:
+    """Passes a response body through, counting bytes, and records the request on close()"""
+
+    def __init__(self, body, on_close):
+        self._body = body
+        self._on_close = on_close
+        self.bytes = 0
+
+    def __iter__(self):
+        for chunk in self._body:
+            self.bytes += len(chunk)
+            yield chunk
+
+    def close(self):
+        try:
+            if hasattr(self._body, 'close'):
+                self._body.close()
+        finally:
+            self._on_close(self.bytes)
+
+
+class RequestMetrics:
+    """Per-route request metrics for one Flask app"""
+
+    def __init__(self, app_name: str):
+        """
+        Args:
+            app_name: Value of the `app` label on every series
+        """
+        self.app_name = app_name
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        # Totals of shards whose thread has exited (threaded servers churn threads)
+        self._retired = _Shard(None)
+        self._lock = threading.Lock()  # guards the shard list, taken once per thread and per scrape
+
+    def init_app(self, app: Flask):
+        """Wrap the app's WSGI callable and tag each request with its URL rule"""
+        app.wsgi_app = self.middleware(app.wsgi_app)
+
+        @app.before_request
+        def _tag_route():
+            if request.url_rule is not None:
+                request.environ[_ROUTE_KEY] = request.url_rule.rule
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard(threading.current_thread())
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def _observe(self, method: str, route: str, status: int, seconds: float, size: int):
+        shard = self._shard()
+        series = shard.series.get((method, route))
+        if series is None:
+            series = shard.series[(method, route)] = _Series()
+
+        series.latency[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        series.latency_sum += seconds
+        series.size[bisect_left(SIZE_BUCKETS, size)] += 1
+        series.size_sum += size
+        series.statuses[status] = series.statuses.get(status, 0) + 1
+        if status >= 500:
+            series.errors += 1
+        shard.finished += 1
+
+    def middleware(self, wsgi_app):
+        """WSGI middleware timing each request until its body has been sent"""
+        def metrics_app(environ, start_response):
+            started = time.perf_counter()
+            self._shard().started += 1
+            captured = {'status': 500}
+
+            def capture_start_response(status, headers, exc_info=None):
+                captured['status'] = int(status.split(' ', 1)[0])
+                return start_response(status, headers, exc_info)
+
+            def record(size):
+                self._observe(environ.get('REQUEST_METHOD', 'GET'), environ.get(_ROUTE_KEY, UNMATCHED_ROUTE),
+                              captured['status'], time.perf_counter() - started, size)
+
+            try:
+                body = wsgi_app(environ, capture_start_response)
+            except Exception:
+                captured['status'] = 500
+                record(0)
+                raise
+            return _BodyIterator(body, record)
+
+        return metrics_app
+
+    def _collect(self) -> Tuple[Dict[Tuple[str, str], _Series], int]:
+        """Sum every shard; returns (series by (method, route), requests in flight)"""
+        with self._lock:
+            live = []
+            for shard in self._shards:
+                if shard.thread.is_alive():
+                    live.append(shard)
+                else:
+                    self._fold(self._retired, shard)
+            self._shards = live
+            shards = [self._retired] + live
+
+        totals: Dict[Tuple[str, str], _Series] = {}
+        in_flight = 0
+        for shard in shards:
+            # Finished is read before started so a request finishing meanwhile never counts below zero
+            finished = shard.finished
+            in_flight += shard.started - finished
+            for key, series in list(shard.series.items()):
+                total = totals.get(key)
+                if total is None:
+                    total = totals[key] = _Series()
+                total.merge(series)
+        return totals, max(in_flight, 0)
+
+    @staticmethod
+    def _fold(target: _Shard, shard: _Shard):
+        target.started += shard.started
+        target.finished += shard.finished
+        for key, series in shard.series.items():
+            if key not in target.series:
+                target.series[key] = _Series()
+            target.series[key].merge(series)
+
+    def render(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+        totals, in_flight = self._collect()
+        app = _escape(self.app_name)
+        lines = []
+
+        def header(name, kind, description):
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        header('http_requests_in_flight', 'gauge', 'Requests currently being handled')
+        lines.append(f'http_requests_in_flight{{app="{app}"}} {in_flight}')
+
+        ordered = sorted(totals.items())
+        header('http_requests_total', 'counter', 'Requests by route and status code')
+        for (method, route), series in ordered:
+            labels = f'app="{app}",method="{method}",route="{_escape(route)}"'
+            for status, count in sorted(series.statuses.items()):
+                lines.append(f'http_requests_total{{{labels},status="{status}"}} {count}')
+
+        header('http_request_errors_total', 'counter', 'Requests answered with a 5xx status or an exception')
+        for (method, route), series in ordered:
+            labels = f'app="{app}",method="{method}",route="{_escape(route)}"'
+            lines.append(f'http_request_errors_total{{{labels}}} {series.errors}')
+
+        for name, description, buckets, attr in (
+            ('http_request_duration_seconds', 'Time until the response body was sent', LATENCY_BUCKETS, 'latency'),
+            ('http_response_size_bytes', 'Response body size', SIZE_BUCKETS, 'size'),
+        ):
+            header(name, 'histogram', description)
+            for (method, route), series in ordered:
+                labels = f'app="{app}",method="{method}",route="{_escape(route)}"'
+                counts = getattr(series, attr)
+                cumulative = 0
+                for bound, count in zip(buckets + ('+Inf',), counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{{labels}}} {getattr(series, attr + "_sum")}')
+                lines.append(f'{name}_count{{{labels}}} {cumulative}')
+
+        return '\n'.join(lines) + '\n'
+
+    def response(self) -> Response:
+        """Flask response for a /api/metrics route"""
+        return Response(self.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
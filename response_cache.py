@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Response Cache for USAhudHomes.com
+In-process LRU cache of serialized JSON responses with strong ETags, so
+repeated searches skip filtering and serialization and browsers/CDNs can
+revalidate with If-None-Match
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from flask import Response, request
+
+from json_fragments import dumps
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Thread-safe LRU of (body bytes, etag) keyed by a normalized request tuple"""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key: Hashable) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, body: bytes) -> Tuple[bytes, str]:
+        """Store a response body and return it with its strong ETag"""
+        entry = (body, hashlib.blake2b(body, digest_size=16).hexdigest())
+        if self.maxsize <= 0:
+            return entry
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+def cached_body(cache: ResponseCache, key: Hashable, build_payload: Callable[[], Dict]) -> Tuple[bytes, str]:
+    """
+    The cached (body, etag) for a key, building and storing the body on a miss
+
+    Args:
+        cache: ResponseCache to read and fill
+        key: Normalized request key; include the dataset version so a reload
+             never serves stale data
+        build_payload: Called on a cache miss to produce the response dict, or
+                       the encoded JSON body as bytes
+
+    Returns:
+        The newline-terminated JSON body (as jsonify writes it) and its ETag
+    """
+    entry = cache.get(key)
+    if entry is None:
+        payload = build_payload()
+        body = payload if isinstance(payload, bytes) else dumps(payload)
+        entry = cache.put(key, body + b'\n')
+    return entry
+
+
+def cached_json_response(cache: ResponseCache, key: Hashable, build_payload: Callable[[], Dict]):
+    """
+    Serve a JSON payload through the cache with ETag revalidation
+
+    Args:
+        cache: ResponseCache to read and fill
+        key: Normalized request key (see cached_body)
+        build_payload: Called on a cache miss to produce the response dict or bytes
+
+    Returns:
+        Flask response: 304 when If-None-Match matches, else the cached JSON
+    """
+    body, etag = cached_body(cache, key, build_payload)
+    if request.if_none_match.contains(etag):
+        cache.record_not_modified()
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+N-gram Search Index for USAhudHomes.com
+Inverted index over the free-text property fields so substring searches are
+answered by intersecting postings lists instead of scanning every property
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Fields matched by the `query` filter of DataService.search_properties
+SEARCH_FIELDS = ('address', 'city', 'county', 'property_id')
+
+# Joins the fields of one document; it never appears in a lowercased query,
+# so grams spanning two fields can never match
+FIELD_SEPARATOR = '\x00'
+
+
+class NgramIndex:
+    """Maps character trigrams to the documents containing them"""
+
+    def __init__(self, fields: Iterable[str] = SEARCH_FIELDS, gram_size: int = 3):
+        self.fields = tuple(fields)
+        self.gram_size = gram_size
+        self.postings: Dict[str, Set[int]] = {}
+        self.texts: Dict[int, str] = {}
+
+    def build(self, documents: List[Dict]):
+        """Index a list of documents, using list positions as document IDs"""
+        self.postings = {}
+        self.texts = {}
+        for doc_id, document in enumerate(documents):
+            self.add(doc_id, document)
+        logger.info(f"Built search index: {len(self.texts)} documents, {len(self.postings)} grams")
+
+    def _text(self, document: Dict) -> str:
+        return FIELD_SEPARATOR.join(str(document.get(field) or '').lower() for field in self.fields)
+
+    def _grams(self, text: str) -> Set[str]:
+        """All grams that do not cross a field boundary"""
+        size = self.gram_size
+        grams = set()
+        for part in text.split(FIELD_SEPARATOR):
+            grams.update(part[i:i + size] for i in range(len(part) - size + 1))
+        return grams
+
+    def add(self, doc_id: int, document: Dict):
+        """Add or replace a document"""
+        if doc_id in self.texts:
+            self.remove(doc_id)
+
+        text = self._text(document)
+        self.texts[doc_id] = text
+        postings = self.postings
+        for gram in self._grams(text):
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = {doc_id}
+            else:
+                posting.add(doc_id)
+
+    def remove(self, doc_id: int):
+        """Remove a document from the index"""
+        text = self.texts.pop(doc_id, None)
+        if text is None:
+            return
+
+        for gram in self._grams(text):
+            posting = self.postings.get(gram)
+            if posting is not None:
+                posting.discard(doc_id)
+                if not posting:
+                    del self.postings[gram]
+
+    def search(self, query: str) -> Optional[List[int]]:
+        """
+        Find documents where any indexed field contains `query` (case-insensitive)
+
+        Args:
+            query: Free-text query
+
+        Returns:
+            Sorted list of matching document IDs, or None for an empty query
+        """
+        if not query:
+            return None
+
+        query = query.lower()
+
+        # Queries shorter than a gram have no postings list; scan the
+        # pre-lowercased texts instead of re-lowercasing every field
+        if len(query) < self.gram_size:
+            return sorted(doc_id for doc_id, text in self.texts.items() if query in text)
+
+        grams = {query[i:i + self.gram_size] for i in range(len(query) - self.gram_size + 1)}
+        postings = []
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if not posting:
+                return []
+            postings.append(posting)
+
+        # Intersect smallest-first, then verify: shared grams do not imply a substring
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                return []
+
+        texts = self.texts
+        return sorted(doc_id for doc_id in candidates if query in texts[doc_id])
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+ASGI API for USAhudHomes.com
+The /api/* routes of src/main.py as non-blocking handlers over the same
+DataService. Lead writes await their journal fsync instead of holding a
+worker thread, so one process can keep thousands of slow clients open.
+The React frontend is still served by the Flask app (or the CDN).
+
+Run with any ASGI server, e.g.:
+    uvicorn --app-dir src asgi:app --host 0.0.0.0 --port 5000
+"""
+
+import json
+import logging
+import os
+import re
+import sys
+from urllib.parse import parse_qsl
+
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import parse_etags
+
+# Allow importing sibling modules from the project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api_handlers as api
+from api_handlers import APIError
+from data_service import DataService
+from export_stream import EXPORT_FORMATS, LEAD_EXPORT_FIELDS, PROPERTY_EXPORT_FIELDS, export_chunks, export_filename
+from json_fragments import dumps
+from response_cache import ResponseCache, cached_body
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+data_service = DataService()
+
+# Hot-reload newer data files in the background (seconds; 0 disables)
+DATA_RELOAD_INTERVAL = float(os.getenv('DATA_RELOAD_INTERVAL', 30))
+if DATA_RELOAD_INTERVAL > 0:
+    data_service.start_watcher(DATA_RELOAD_INTERVAL)
+
+property_cache = ResponseCache(maxsize=int(os.getenv('RESPONSE_CACHE_SIZE', 256)))
+facet_cache = ResponseCache(maxsize=int(os.getenv('RESPONSE_CACHE_SIZE', 256)))
+
+# Request bodies are small JSON documents
+MAX_BODY_BYTES = 1024 * 1024
+
+CORS_HEADERS = [(b'access-control-allow-origin', b'*')]
+
+
+class Request:
+    """The parts of an ASGI HTTP request the handlers need"""
+
+    def __init__(self, scope, receive):
+        self.method = scope['method']
+        self.path = scope['path']
+        self.args = MultiDict(parse_qsl(scope.get('query_string', b'').decode('latin-1'),
+                                        keep_blank_values=True))
+        self.headers = {name.decode('latin-1').lower(): value.decode('latin-1')
+                        for name, value in scope.get('headers', [])}
+        self._receive = receive
+
+    async def body(self) -> bytes:
+        chunks = []
+        size = 0
+        while True:
+            message = await self._receive()
+            if message['type'] == 'http.disconnect':
+                raise APIError(400, 'Client disconnected')
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                raise APIError(413, 'Request body too large')
+            chunks.append(chunk)
+            if not message.get('more_body'):
+                return b''.join(chunks)
+
+    async def json(self):
+        """Parsed JSON body, or None if it is missing or malformed (Flask's get_json(silent=True))"""
+        try:
+            return json.loads(await self.body())
+        except ValueError:
+            return None
+
+    def if_none_match(self, etag: str) -> bool:
+        return parse_etags(self.headers.get('if-none-match')).contains(etag)
+
+
+class Response:
+    """A complete or streamed HTTP response"""
+
+    def __init__(self, body=b'', status: int = 200, content_type: str = 'application/json',
+                 headers=None, chunks=None):
+        """
+        Args:
+            body: Complete body bytes
+            status: HTTP status
+            content_type: Content-Type header
+            headers: Extra (name, value) string pairs
+            chunks: Iterator of bytes/str sent instead of body, one message each
+        """
+        self.body = body
+        self.status = status
+        self.headers = [(b'content-type', content_type.encode('latin-1'))] + CORS_HEADERS
+        self.headers += [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                         for name, value in headers or ()]
+        self.chunks = chunks
+
+    async def __call__(self, send, head: bool = False):
+        headers = list(self.headers)
+        if self.chunks is None:
+            headers.append((b'content-length', str(len(self.body)).encode()))
+        await send({'type': 'http.response.start', 'status': self.status, 'headers': headers})
+
+        if head:
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        if self.chunks is None:
+            await send({'type': 'http.response.body', 'body': self.body})
+            return
+        # Each send waits for the transport to drain, so a slow client never
+        # buffers more than a chunk of the export
+        for chunk in self.chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+
+
+def json_response(payload, status: int = 200) -> Response:
+    """JSON response for a payload or an already encoded body (newline-terminated like jsonify)"""
+    body = payload if isinstance(payload, bytes) else dumps(payload)
+    return Response(body + b'\n', status=status)
+
+
+def error_response(message: str, status: int) -> Response:
+    return json_response({'error': message}, status)
+
+
+def cached_json_response(request: Request, cache: ResponseCache, key, build_payload) -> Response:
+    """response_cache.cached_json_response for ASGI requests"""
+    body, etag = cached_body(cache, key, build_payload)
+    headers = [('ETag', f'"{etag}"'), ('Cache-Control', 'no-cache')]
+    if request.if_none_match(etag):
+        cache.record_not_modified()
+        return Response(status=304, headers=headers)
+    return Response(body, headers=headers)
+
+
+def export_stream(chunks, export_format: str, name: str) -> Response:
+    disposition = f'attachment; filename="{export_filename(name, export_format)}"'
+    return Response(content_type=EXPORT_FORMATS[export_format], chunks=chunks,
+                    headers=[('Content-Disposition', disposition)])
+
+
+# API Routes
+
+async def get_properties(request):
+    """Get properties with optional filters"""
+    search = api.property_search_args(data_service, request.args)
+    return cached_json_response(request, property_cache, api.property_page_cache_key(data_service, search),
+                                lambda: api.property_page_body(data_service, search))
+
+
+async def get_property_facets(request):
+    """Get listing counts per state, status, bedroom bucket and price band under the filters"""
+    filters = api.property_filter_args(data_service, request.args)
+    return cached_json_response(request, facet_cache, api.facets_cache_key(data_service, filters),
+                                lambda: api.facets_payload(data_service, filters))
+
+
+async def get_property(request, property_id):
+    """Get a specific property by ID"""
+    return json_response(api.property_body(data_service, property_id))
+
+
+async def get_properties_batch(request):
+    """Get several properties by ID in one request"""
+    property_ids = api.batch_property_ids(await request.json())
+    return json_response(api.properties_batch_body(data_service, property_ids))
+
+
+async def get_leads(request):
+    """Get leads with optional status filter"""
+    return json_response(api.leads_page_payload(data_service, request.args))
+
+
+async def create_lead(request):
+    """Create a new lead"""
+    lead_data = api.validate_lead(await request.json())
+    lead = await data_service.add_lead_async(lead_data)
+    return json_response(lead, 201)
+
+
+async def update_lead_status(request, lead_id):
+    """Update lead status"""
+    new_status = api.lead_status_arg(await request.json())
+    lead = await data_service.update_lead_status_async(lead_id, new_status)
+    return json_response(api.found_lead(lead))
+
+
+async def get_lead_brokers(request, lead_id):
+    """Get brokers to route a lead to, HUD-registered first"""
+    return json_response(api.lead_brokers_payload(data_service, lead_id))
+
+
+async def get_brokers(request):
+    """Get brokers with optional state filter"""
+    return json_response(api.brokers_payload(data_service, request.args))
+
+
+async def export_properties(request):
+    """Stream every property matching the search filters as NDJSON or CSV"""
+    filters = api.property_filter_args(data_service, request.args)
+    sort = api.sort_arg(request.args)
+    export_format = api.export_format_arg(request.args)
+
+    rows = data_service.iter_properties(**filters, sort=sort)
+    chunks = export_chunks(rows, export_format, PROPERTY_EXPORT_FIELDS, encode=data_service.property_json)
+    return export_stream(chunks, export_format, 'properties')
+
+
+async def export_leads(request):
+    """Stream leads, optionally filtered by status, as NDJSON or CSV"""
+    export_format = api.export_format_arg(request.args)
+
+    rows = data_service.iter_leads(status=request.args.get('status'))
+    return export_stream(export_chunks(rows, export_format, LEAD_EXPORT_FIELDS), export_format, 'leads')
+
+
+async def get_stats(request):
+    """Get dashboard statistics"""
+    return json_response(data_service.get_stats())
+
+
+async def health_check(request):
+    """Health check endpoint"""
+    return json_response(api.health_payload(data_service, property_cache, facet_cache))
+
+
+# (method, path pattern, handler); path parameters are passed as keyword arguments
+ROUTES = [
+    ('GET', r'/api/properties', get_properties),
+    ('GET', r'/api/properties/facets', get_property_facets),
+    ('POST', r'/api/properties/batch', get_properties_batch),
+    ('GET', r'/api/properties/(?P<property_id>[^/]+)', get_property),
+    ('GET', r'/api/leads', get_leads),
+    ('POST', r'/api/leads', create_lead),
+    ('PUT', r'/api/leads/(?P<lead_id>[^/]+)/status', update_lead_status),
+    ('GET', r'/api/leads/(?P<lead_id>[^/]+)/brokers', get_lead_brokers),
+    ('GET', r'/api/brokers', get_brokers),
+    ('GET', r'/api/export/properties', export_properties),
+    ('GET', r'/api/export/leads', export_leads),
+    ('GET', r'/api/stats', get_stats),
+    ('GET', r'/api/health', health_check),
+]
+
+_ROUTES = [(method, re.compile(pattern + '$'), handler) for method, pattern, handler in ROUTES]
+
+
+def route(method: str, path: str):
+    """
+    Find the handler for a request
+
+    Returns:
+        (handler, path parameters), or (None, allowed methods) when nothing matches
+    """
+    allowed = []
+    for route_method, pattern, handler in _ROUTES:
+        match = pattern.match(path)
+        if match:
+            if route_method == method or (method == 'HEAD' and route_method == 'GET'):
+                return handler, match.groupdict()
+            allowed.append(route_method)
+    return None, allowed
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            data_service.close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI application"""
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    request = Request(scope, receive)
+    handler, params = route(request.method, request.path)
+
+    if handler is None:
+        if request.method == 'OPTIONS' and params:
+            # CORS preflight, answered as flask-cors does
+            response = Response(status=200, content_type='text/html', headers=[
+                ('Access-Control-Allow-Methods', ', '.join(sorted(set(params)))),
+                ('Access-Control-Allow-Headers', request.headers.get('access-control-request-headers', '*'))
+            ])
+        elif params:
+            response = error_response('Method not allowed', 405)
+        else:
+            response = error_response('Not found', 404)
+    else:
+        try:
+            response = await handler(request, **params)
+        except APIError as e:
+            response = error_response(e.message, e.status)
+        except Exception:
+            logger.exception(f"Error handling {request.method} {request.path}")
+            response = error_response('Internal server error', 500)
+
+    await response(send, head=request.method == 'HEAD')
@@ -4,317 +4,162 @@ Production Flask App for USAhudHomes.com
 Serves the React frontend and provides API endpoints
 """
 
-from flask import Flask, jsonify, request, send_from_directory, send_file
+from flask import Flask, jsonify, request
 from flask_cors import CORS
-import json
 import os
-from datetime import datetime
 import logging
+import sys
+
+# Allow importing sibling modules from the project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api_handlers as api
+from api_handlers import APIError
+from data_service import DataService
+from export_stream import LEAD_EXPORT_FIELDS, PROPERTY_EXPORT_FIELDS, export_response
+from json_fragments import json_body_response
+from property_record import RecordJSONProvider
+from request_metrics import RequestMetrics
+from response_cache import ResponseCache, cached_json_response
+from static_assets import StaticAssets
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__, static_folder='dist', static_url_path='')
+# Static files are served by StaticAssets below, not Flask's static route
+app = Flask(__name__, static_folder=None)
 CORS(app)  # Enable CORS for all routes
+app.json = RecordJSONProvider(app)  # Serialize compact property records
 
-class DataService:
-    def __init__(self):
-        self.properties = []
-        self.leads = []
-        self.brokers = []
-        self.load_mock_data()
-    
-    def load_mock_data(self):
-        """Load mock data from JSON files"""
-        try:
-            # Find the most recent mock data files
-            files = os.listdir('.')
-            property_files = [f for f in files if f.startswith('mock_properties_')]
-            lead_files = [f for f in files if f.startswith('mock_leads_')]
-            broker_files = [f for f in files if f.startswith('mock_brokers_')]
-            
-            if property_files:
-                latest_property_file = sorted(property_files)[-1]
-                with open(latest_property_file, 'r') as f:
-                    self.properties = json.load(f)
-                logger.info(f"Loaded {len(self.properties)} properties from {latest_property_file}")
-            
-            if lead_files:
-                latest_lead_file = sorted(lead_files)[-1]
-                with open(latest_lead_file, 'r') as f:
-                    self.leads = json.load(f)
-                logger.info(f"Loaded {len(self.leads)} leads from {latest_lead_file}")
-            
-            if broker_files:
-                latest_broker_file = sorted(broker_files)[-1]
-                with open(latest_broker_file, 'r') as f:
-                    self.brokers = json.load(f)
-                logger.info(f"Loaded {len(self.brokers)} brokers from {latest_broker_file}")
-                
-        except Exception as e:
-            logger.error(f"Error loading mock data: {e}")
-    
-    def search_properties(self, query=None, state=None, min_price=None, max_price=None, 
-                         bedrooms=None, bathrooms=None, status=None, limit=50):
-        """Search properties with filters"""
-        filtered_properties = self.properties.copy()
-        
-        # Apply filters
-        if query:
-            query = query.lower()
-            filtered_properties = [p for p in filtered_properties if 
-                                 query in p['address'].lower() or 
-                                 query in p['city'].lower() or 
-                                 query in p['county'].lower() or
-                                 query in p['property_id'].lower()]
-        
-        if state:
-            filtered_properties = [p for p in filtered_properties if p['state'] == state]
-        
-        if min_price is not None:
-            filtered_properties = [p for p in filtered_properties if p['price'] >= min_price]
-        
-        if max_price is not None:
-            filtered_properties = [p for p in filtered_properties if p['price'] <= max_price]
-        
-        if bedrooms is not None:
-            filtered_properties = [p for p in filtered_properties if p['bedrooms'] >= bedrooms]
-        
-        if bathrooms is not None:
-            filtered_properties = [p for p in filtered_properties if p['bathrooms'] >= bathrooms]
-        
-        if status:
-            filtered_properties = [p for p in filtered_properties if p['status'] == status]
-        
-        # Sort by most recent first
-        filtered_properties.sort(key=lambda x: x['created_at'], reverse=True)
-        
-        return filtered_properties[:limit]
-    
-    def get_property_by_id(self, property_id):
-        """Get a specific property by ID"""
-        for prop in self.properties:
-            if prop['property_id'] == property_id:
-                return prop
-        return None
-    
-    def add_lead(self, lead_data):
-        """Add a new lead"""
-        lead_id = f"lead-{len(self.leads) + 1:03d}"
-        lead = {
-            "lead_id": lead_id,
-            "name": lead_data.get('name'),
-            "email": lead_data.get('email'),
-            "phone": lead_data.get('phone'),
-            "state_of_interest": lead_data.get('state', 'NC'),
-            "property_id": lead_data.get('propertyId'),
-            "status": "New",
-            "created_at": datetime.now().isoformat(),
-            "notes": f"Interested in property {lead_data.get('propertyId', 'general inquiry')}"
-        }
-        
-        self.leads.append(lead)
-        logger.info(f"Added new lead: {lead_id}")
-        return lead
-    
-    def get_leads(self, status=None, limit=50):
-        """Get leads with optional status filter"""
-        filtered_leads = self.leads.copy()
-        
-        if status and status != 'all':
-            filtered_leads = [l for l in filtered_leads if l['status'].lower() == status.lower()]
-        
-        # Sort by most recent first
-        filtered_leads.sort(key=lambda x: x['created_at'], reverse=True)
-        
-        return filtered_leads[:limit]
-    
-    def update_lead_status(self, lead_id, new_status):
-        """Update lead status"""
-        for lead in self.leads:
-            if lead['lead_id'] == lead_id:
-                lead['status'] = new_status
-                lead['updated_at'] = datetime.now().isoformat()
-                logger.info(f"Updated lead {lead_id} status to {new_status}")
-                return lead
-        return None
-    
-    def get_brokers(self, state=None):
-        """Get brokers, optionally filtered by state coverage"""
-        filtered_brokers = self.brokers.copy()
-        
-        if state:
-            filtered_brokers = [b for b in filtered_brokers if state in b['coverage_states']]
-        
-        return filtered_brokers
+# Per-route latency, size and error metrics, scraped at /api/metrics
+request_metrics = RequestMetrics('usahudhomes')
+request_metrics.init_app(app)
 
 # Initialize data service
 data_service = DataService()
 
+# Hot-reload newer data files in the background (seconds; 0 disables)
+DATA_RELOAD_INTERVAL = float(os.getenv('DATA_RELOAD_INTERVAL', 30))
+if DATA_RELOAD_INTERVAL > 0:
+    data_service.start_watcher(DATA_RELOAD_INTERVAL)
+
+# Serialized /api/properties and /api/properties/facets responses, keyed by
+# normalized filters + data version
+property_cache = ResponseCache(maxsize=int(os.getenv('RESPONSE_CACHE_SIZE', 256)))
+facet_cache = ResponseCache(maxsize=int(os.getenv('RESPONSE_CACHE_SIZE', 256)))
+
+# Built frontend, indexed and precompressed once at startup
+STATIC_DIR = os.getenv('STATIC_DIR') or next(
+    (d for d in (os.path.join(app.root_path, 'dist'), os.path.abspath('dist')) if os.path.isdir(d)),
+    os.path.abspath('dist')
+)
+static_assets = StaticAssets(STATIC_DIR)
+
+@app.errorhandler(APIError)
+def api_error(e):
+    """Answer request errors raised by api_handlers as JSON"""
+    return jsonify({'error': e.message}), e.status
+
 # API Routes
 @app.route('/api/properties', methods=['GET'])
 def get_properties():
     """Get properties with optional filters"""
-    query = request.args.get('query')
-    state = request.args.get('state')
-    min_price = request.args.get('min_price', type=int)
-    max_price = request.args.get('max_price', type=int)
-    bedrooms = request.args.get('bedrooms', type=int)
-    bathrooms = request.args.get('bathrooms', type=float)
-    status = request.args.get('status')
-    limit = request.args.get('limit', 50, type=int)
-    
-    properties = data_service.search_properties(
-        query=query, state=state, min_price=min_price, max_price=max_price,
-        bedrooms=bedrooms, bathrooms=bathrooms, status=status, limit=limit
-    )
-    
-    return jsonify({
-        'properties': properties,
-        'total': len(properties),
-        'filters_applied': {
-            'query': query,
-            'state': state,
-            'min_price': min_price,
-            'max_price': max_price,
-            'bedrooms': bedrooms,
-            'bathrooms': bathrooms,
-            'status': status
-        }
-    })
+    search = api.property_search_args(data_service, request.args)
+    return cached_json_response(property_cache, api.property_page_cache_key(data_service, search),
+                                lambda: api.property_page_body(data_service, search))
+
+@app.route('/api/properties/facets', methods=['GET'])
+def get_property_facets():
+    """Get listing counts per state, status, bedroom bucket and price band under the filters"""
+    filters = api.property_filter_args(data_service, request.args)
+    return cached_json_response(facet_cache, api.facets_cache_key(data_service, filters),
+                                lambda: api.facets_payload(data_service, filters))
 
 @app.route('/api/properties/<property_id>', methods=['GET'])
 def get_property(property_id):
     """Get a specific property by ID"""
-    property_data = data_service.get_property_by_id(property_id)
-    
-    if property_data:
-        return jsonify(property_data)
-    else:
-        return jsonify({'error': 'Property not found'}), 404
+    return json_body_response(api.property_body(data_service, property_id))
+
+@app.route('/api/properties/batch', methods=['POST'])
+def get_properties_batch():
+    """Get several properties by ID in one request"""
+    property_ids = api.batch_property_ids(request.get_json(silent=True))
+    return json_body_response(api.properties_batch_body(data_service, property_ids))
 
 @app.route('/api/leads', methods=['GET'])
 def get_leads():
     """Get leads with optional status filter"""
-    status = request.args.get('status')
-    limit = request.args.get('limit', 50, type=int)
-    
-    leads = data_service.get_leads(status=status, limit=limit)
-    
-    return jsonify({
-        'leads': leads,
-        'total': len(leads),
-        'status_filter': status
-    })
+    return jsonify(api.leads_page_payload(data_service, request.args))
 
 @app.route('/api/leads', methods=['POST'])
 def create_lead():
     """Create a new lead"""
-    lead_data = request.json
-    
-    # Validate required fields
-    required_fields = ['name', 'email', 'phone', 'state']
-    for field in required_fields:
-        if not lead_data.get(field):
-            return jsonify({'error': f'Missing required field: {field}'}), 400
-    
+    lead_data = api.validate_lead(request.get_json(silent=True))
     lead = data_service.add_lead(lead_data)
     return jsonify(lead), 201
 
 @app.route('/api/leads/<lead_id>/status', methods=['PUT'])
 def update_lead_status(lead_id):
     """Update lead status"""
-    data = request.json
-    new_status = data.get('status')
-    
-    if not new_status:
-        return jsonify({'error': 'Status is required'}), 400
-    
-    lead = data_service.update_lead_status(lead_id, new_status)
-    
-    if lead:
-        return jsonify(lead)
-    else:
-        return jsonify({'error': 'Lead not found'}), 404
+    new_status = api.lead_status_arg(request.get_json(silent=True))
+    return jsonify(api.found_lead(data_service.update_lead_status(lead_id, new_status)))
+
+@app.route('/api/leads/<lead_id>/brokers', methods=['GET'])
+def get_lead_brokers(lead_id):
+    """Get brokers to route a lead to, HUD-registered first"""
+    return jsonify(api.lead_brokers_payload(data_service, lead_id))
 
 @app.route('/api/brokers', methods=['GET'])
 def get_brokers():
     """Get brokers with optional state filter"""
-    state = request.args.get('state')
+    return jsonify(api.brokers_payload(data_service, request.args))
+
+@app.route('/api/export/properties', methods=['GET'])
+def export_properties():
+    """Stream every property matching the search filters as NDJSON or CSV"""
+    filters = api.property_filter_args(data_service, request.args)
+    sort = api.sort_arg(request.args)
+    export_format = api.export_format_arg(request.args)
     
-    brokers = data_service.get_brokers(state=state)
+    rows = data_service.iter_properties(**filters, sort=sort)
+    return export_response(rows, export_format, PROPERTY_EXPORT_FIELDS, 'properties',
+                           encode=data_service.property_json)
+
+@app.route('/api/export/leads', methods=['GET'])
+def export_leads():
+    """Stream leads, optionally filtered by status, as NDJSON or CSV"""
+    export_format = api.export_format_arg(request.args)
     
-    return jsonify({
-        'brokers': brokers,
-        'total': len(brokers),
-        'state_filter': state
-    })
+    rows = data_service.iter_leads(status=request.args.get('status'))
+    return export_response(rows, export_format, LEAD_EXPORT_FIELDS, 'leads')
 
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
     """Get dashboard statistics"""
-    total_properties = len(data_service.properties)
-    available_properties = len([p for p in data_service.properties if p['status'] == 'Available'])
-    new_listings = len([p for p in data_service.properties if p['status'] == 'New Listing'])
-    
-    total_leads = len(data_service.leads)
-    active_leads = len([l for l in data_service.leads if l['status'] in ['New', 'Contacted', 'Active']])
-    closed_leads = len([l for l in data_service.leads if l['status'] == 'Closed'])
-    
-    # Calculate average price
-    if data_service.properties:
-        avg_price = sum(p['price'] for p in data_service.properties) / len(data_service.properties)
-    else:
-        avg_price = 0
-    
-    return jsonify({
-        'properties': {
-            'total': total_properties,
-            'available': available_properties,
-            'new_listings': new_listings,
-            'average_price': round(avg_price)
-        },
-        'leads': {
-            'total': total_leads,
-            'active': active_leads,
-            'closed': closed_leads,
-            'conversion_rate': round((closed_leads / total_leads * 100) if total_leads > 0 else 0, 1)
-        },
-        'brokers': {
-            'total': len(data_service.brokers),
-            'hud_registered': len([b for b in data_service.brokers if b.get('hud_registered', False)])
-        }
-    })
+    return jsonify(data_service.get_stats())
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
-        'data_loaded': {
-            'properties': len(data_service.properties),
-            'leads': len(data_service.leads),
-            'brokers': len(data_service.brokers)
-        }
-    })
+    return jsonify(api.health_payload(data_service, property_cache, facet_cache))
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Request metrics in the Prometheus text format"""
+    return request_metrics.response()
 
 # Serve React app
 @app.route('/')
 def serve_index():
     """Serve the React app index.html"""
-    return send_file('dist/index.html')
+    return static_assets.response('index.html')
 
 @app.route('/<path:path>')
 def serve_static_files(path):
     """Serve static files or React app for client-side routing"""
-    # Check if it's a static file
-    if os.path.exists(os.path.join('dist', path)):
-        return send_from_directory('dist', path)
-    
-    # For client-side routing, serve index.html
-    return send_file('dist/index.html')
+    # Unknown paths fall back to index.html for client-side routing
+    return static_assets.response(path)
 
 if __name__ == '__main__':
     print("🏠 Starting USAhudHomes.com Production Server...")
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Static Asset Serving for USAhudHomes.com
+Indexes the built frontend (dist/) once at startup, precompresses text
+assets and serves them with long-lived cache headers, so a request for a
+static file or a client-side route needs no filesystem checks
+"""
+
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from flask import Response, request
+from werkzeug.wsgi import wrap_file
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; prebuilt .br files are still served
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Content types worth compressing (images and fonts are already compressed)
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/javascript', 'application/json', 'application/xml',
+    'image/svg+xml', 'application/wasm', 'text/javascript'
+)
+
+# Files smaller than this are not worth a compressed variant
+MIN_COMPRESS_SIZE = 1024
+
+# Files up to this size are held in memory; larger ones (photos) are
+# streamed from disk
+MAX_CACHED_SIZE = 256 * 1024
+
+# Bundler output with a content hash in its name, e.g. assets/index-CrmKjufW.js
+HASHED_ASSET = re.compile(r'^assets/.+-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$')
+
+CACHE_IMMUTABLE = 'public, max-age=31536000, immutable'
+CACHE_REVALIDATE = 'no-cache'
+CACHE_DEFAULT = 'public, max-age=3600'
+
+# Preference order when the client accepts several encodings
+ENCODINGS = ('br', 'gzip')
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+@dataclass
+class StaticAsset:
+    path: str
+    size: int
+    mimetype: str
+    etag: str
+    cache_control: str
+    # Uncompressed body, or None if the file is streamed from disk
+    body: Optional[bytes] = None
+    # Content-Encoding -> compressed body
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+
+class StaticAssets:
+    """In-memory index of a built frontend directory"""
+
+    def __init__(self, root: str, index_file: str = 'index.html', precompress: bool = True):
+        """
+        Index every file under root
+
+        Args:
+            root: Build output directory (dist/)
+            index_file: Page served for client-side routes
+            precompress: Build gzip (and brotli, if installed) variants of text assets
+        """
+        self.root = os.path.abspath(root)
+        self.index_file = index_file
+        self.assets: Dict[str, StaticAsset] = {}
+        self.compressed_bytes = 0
+        self.cached_bytes = 0
+
+        for directory, _, filenames in os.walk(self.root):
+            present = set(filenames)
+            for filename in filenames:
+                if filename.endswith(('.gz', '.br')) and filename[:-3] in present:
+                    continue  # served as a variant of the original
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, self.root).replace(os.sep, '/')
+                try:
+                    self.assets[name] = self._index(name, path, precompress)
+                except OSError as e:
+                    logger.error(f"Error indexing static file {path}: {e}")
+
+        logger.info(f"Indexed {len(self.assets)} static files from {self.root} "
+                    f"({self.cached_bytes} bytes held in memory, "
+                    f"{self.compressed_bytes} bytes of precompressed variants)")
+
+    def _index(self, name: str, path: str, precompress: bool) -> StaticAsset:
+        stat = os.stat(path)
+        mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+        if HASHED_ASSET.match(name):
+            cache_control = CACHE_IMMUTABLE
+        elif name == self.index_file:
+            cache_control = CACHE_REVALIDATE
+        else:
+            cache_control = CACHE_DEFAULT
+
+        asset = StaticAsset(path=path, size=stat.st_size, mimetype=mimetype,
+                            etag=f'{stat.st_size:x}-{stat.st_mtime_ns:x}', cache_control=cache_control)
+
+        # Variants built ahead of time (e.g. by the bundler) take precedence
+        for encoding, suffix in ENCODING_SUFFIXES.items():
+            if os.path.exists(path + suffix):
+                with open(path + suffix, 'rb') as f:
+                    asset.encoded[encoding] = f.read()
+
+        compress = precompress and stat.st_size >= MIN_COMPRESS_SIZE and mimetype.startswith(COMPRESSIBLE_TYPES)
+        content = None
+        if compress or stat.st_size <= MAX_CACHED_SIZE:
+            with open(path, 'rb') as f:
+                content = f.read()
+        if stat.st_size <= MAX_CACHED_SIZE:
+            asset.body = content
+
+        if compress:
+            asset.etag = hashlib.blake2b(content, digest_size=12).hexdigest()
+            if 'gzip' not in asset.encoded:
+                asset.encoded['gzip'] = gzip.compress(content, compresslevel=9, mtime=0)
+            if 'br' not in asset.encoded and brotli is not None:
+                asset.encoded['br'] = brotli.compress(content)
+
+        # Keep only variants that are actually smaller
+        asset.encoded = {enc: body for enc, body in asset.encoded.items() if len(body) < asset.size}
+        self.compressed_bytes += sum(len(body) for body in asset.encoded.values())
+        self.cached_bytes += len(asset.body or b'')
+        return asset
+
+    def lookup(self, path: str) -> Optional[StaticAsset]:
+        """Asset for a URL path, the index page for client-side routes, or None"""
+        path = path.lstrip('/')
+        asset = self.assets.get(path)
+        # A missing bundle chunk is a 404, not HTML the browser would try to execute
+        if asset is None and not HASHED_ASSET.match(path):
+            asset = self.assets.get(self.index_file)
+        return asset
+
+    def response(self, path: str) -> Response:
+        """
+        Serve a static file, falling back to the index page for client-side routes
+
+        Picks a precompressed variant from Accept-Encoding and answers
+        If-None-Match with 304. Bodies come from memory; only files larger
+        than MAX_CACHED_SIZE are opened per request.
+        """
+        asset = self.lookup(path)
+        if asset is None:
+            return Response('Not Found', status=404, mimetype='text/plain')
+
+        encoding = None
+        if asset.encoded:
+            accepted = request.accept_encodings
+            encoding = next((enc for enc in ENCODINGS if enc in asset.encoded and accepted[enc] > 0), None)
+
+        etag = f'{asset.etag}-{encoding}' if encoding else asset.etag
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        elif encoding:
+            response = Response(asset.encoded[encoding], mimetype=asset.mimetype)
+            response.headers['Content-Encoding'] = encoding
+        elif asset.body is not None:
+            response = Response(asset.body, mimetype=asset.mimetype)
+        else:
+            body = wrap_file(request.environ, open(asset.path, 'rb'))
+            response = Response(body, mimetype=asset.mimetype, direct_passthrough=True)
+            response.content_length = asset.size
+
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = asset.cache_control
+        if asset.encoded:
+            response.vary.add('Accept-Encoding')
+        return response
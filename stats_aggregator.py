@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Dashboard Statistics Aggregator for USAhudHomes.com
+Maintains the /api/stats counters incrementally so reading them is O(1)
+"""
+
+import logging
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Lead statuses counted as "active" on the dashboard
+ACTIVE_LEAD_STATUSES = ('New', 'Contacted', 'Active')
+
+
+class StatsAggregator:
+    """Running counts and sums behind the dashboard statistics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.property_total = 0
+        self.property_status_counts = Counter()
+        self.price_sum = 0
+        self.lead_total = 0
+        self.lead_status_counts = Counter()
+        self.broker_total = 0
+        self.broker_hud_registered = 0
+
+    def rebuild(self, properties: List[Dict], leads: List[Dict], brokers: List[Dict],
+                property_totals: Optional[Tuple[Counter, float]] = None):
+        """
+        Recount everything from scratch (used on data load)
+
+        Args:
+            property_totals: Precomputed (status counts, price sum) for the
+                             properties, e.g. from a binary snapshot
+        """
+        if property_totals is not None:
+            property_status_counts, price_sum = property_totals
+        else:
+            property_status_counts = Counter(p['status'] for p in properties)
+            price_sum = sum(p.get('price') or 0 for p in properties)
+        lead_status_counts = Counter(l['status'] for l in leads)
+        broker_hud_registered = sum(1 for b in brokers if b.get('hud_registered', False))
+
+        with self._lock:
+            self.property_total = len(properties)
+            self.property_status_counts = property_status_counts
+            self.price_sum = price_sum
+            self.lead_total = len(leads)
+            self.lead_status_counts = lead_status_counts
+            self.broker_total = len(brokers)
+            self.broker_hud_registered = broker_hud_registered
+
+    def lead_added(self, lead: Dict):
+        """Count a newly added lead"""
+        with self._lock:
+            self.lead_total += 1
+            self.lead_status_counts[lead['status']] += 1
+
+    def lead_status_changed(self, old_status: str, new_status: str):
+        """Move one lead between status buckets"""
+        with self._lock:
+            self.lead_status_counts[old_status] -= 1
+            self.lead_status_counts[new_status] += 1
+
+    def snapshot(self) -> Dict:
+        """Return the statistics in the /api/stats response shape"""
+        with self._lock:
+            total_properties = self.property_total
+            total_leads = self.lead_total
+            active_leads = sum(self.lead_status_counts[s] for s in ACTIVE_LEAD_STATUSES)
+            closed_leads = self.lead_status_counts['Closed']
+            avg_price = self.price_sum / total_properties if total_properties else 0
+
+            return {
+                'properties': {
+                    'total': total_properties,
+                    'available': self.property_status_counts['Available'],
+                    'new_listings': self.property_status_counts['New Listing'],
+                    'average_price': round(avg_price)
+                },
+                'leads': {
+                    'total': total_leads,
+                    'active': active_leads,
+                    'closed': closed_leads,
+                    'conversion_rate': round((closed_leads / total_leads * 100) if total_leads > 0 else 0, 1)
+                },
+                'brokers': {
+                    'total': self.broker_total,
+                    'hud_registered': self.broker_hud_registered
+                }
+            }
+
+    @classmethod
+    def compute(cls, properties: List[Dict], leads: List[Dict], brokers: List[Dict]) -> Dict:
+        """Compute the statistics with a full scan (reference for verification)"""
+        aggregator = cls()
+        aggregator.rebuild(properties, leads, brokers)
+        return aggregator.snapshot()
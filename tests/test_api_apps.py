@@ -0,0 +1,167 @@
+import asyncio
+import importlib.util
+import json
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_app(name, path):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope='module')
+def apps(tmp_path_factory):
+    """The Flask and ASGI apps over one DataService (data files from the repo, journal in tmp)"""
+    env = {'DATA_RELOAD_INTERVAL': '0', 'DATA_SNAPSHOT_FILE': '',
+           'LEAD_JOURNAL_FILE': str(tmp_path_factory.mktemp('journal') / 'leads.jsonl')}
+    saved_env = {name: os.environ.get(name) for name in env}
+    saved_cwd = os.getcwd()
+    os.environ.update(env)
+    os.chdir(ROOT)
+    try:
+        flask_main = load_app('flask_main', 'src/main.py')
+        asgi_main = load_app('asgi_main', 'src/asgi.py')
+    finally:
+        os.chdir(saved_cwd)
+        for name, value in saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+    asgi_main.data_service.close()
+    asgi_main.data_service = flask_main.data_service
+    yield flask_main, asgi_main
+    flask_main.data_service.close()
+
+
+def asgi_call(app, method, url, body=b'', headers=()):
+    path, _, query = url.partition('?')
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query.encode(),
+             'headers': [(name.encode(), value.encode()) for name, value in headers]}
+    response = {'body': b''}
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+            response['headers'] = {name.decode(): value.decode() for name, value in message['headers']}
+        else:
+            response['body'] += message.get('body', b'')
+
+    asyncio.run(app(scope, receive, send))
+    return response
+
+
+def flask_call(app, method, url, body=b'', headers=()):
+    response = app.test_client().open(url, method=method, data=body, headers=dict(headers),
+                                      content_type='application/json' if body else None)
+    return {'status': response.status_code, 'body': response.get_data(),
+            'headers': {name.lower(): value for name, value in response.headers.items()}}
+
+
+def both(apps, method, url, body=b'', headers=()):
+    flask_main, asgi_main = apps
+    for module in apps:
+        module.property_cache.clear()
+        module.facet_cache.clear()
+    return (flask_call(flask_main.app, method, url, body, headers),
+            asgi_call(asgi_main.app, method, url, body, headers))
+
+
+GET_URLS = [
+    '/api/properties?limit=5',
+    '/api/properties?state=TX&sort=price_asc&limit=3',
+    '/api/properties?query=oak&sort=bid_deadline',
+    '/api/properties?sort=bad',
+    '/api/properties?lat=999',
+    '/api/properties?cursor=zzz',
+    '/api/properties/nope',
+    '/api/properties/facets?bedrooms=3',
+    '/api/leads?limit=3',
+    '/api/leads?cursor=zzz',
+    '/api/leads/lead-001/brokers',
+    '/api/leads/nope/brokers',
+    '/api/brokers?state=NC&ranked=true',
+    '/api/stats',
+    '/api/export/properties?format=xml',
+]
+
+
+@pytest.mark.parametrize('url', GET_URLS)
+def test_get_routes_match(apps, url):
+    flask_response, asgi_response = both(apps, 'GET', url)
+    assert flask_response['status'] == asgi_response['status']
+    assert json.loads(flask_response['body']) == json.loads(asgi_response['body'])
+
+
+@pytest.mark.parametrize('url', ['/api/properties?lat=35.8&lng=-78.6&radius_miles=25',
+                                 '/api/properties/facets?bbox=35,-79,36,-78',
+                                 '/api/export/properties?bbox=35,-79,36,-78'])
+def test_geo_search_without_coordinates_is_unavailable(apps, url):
+    # The repo's data files carry no coordinates and no ZIP centroid table ships
+    flask_response, asgi_response = both(apps, 'GET', url)
+    assert flask_response['status'] == asgi_response['status'] == 503
+    assert json.loads(flask_response['body']) == json.loads(asgi_response['body'])
+
+
+def test_cached_bodies_and_etags_are_identical(apps):
+    flask_response, asgi_response = both(apps, 'GET', '/api/properties/facets?state=NC')
+    assert flask_response['body'] == asgi_response['body']
+    assert flask_response['headers']['etag'] == asgi_response['headers']['etag']
+
+
+@pytest.mark.parametrize('url', ['/api/export/properties?format=csv&sort=price_desc',
+                                 '/api/export/leads?format=csv'])
+def test_exports_match(apps, url):
+    flask_response, asgi_response = both(apps, 'GET', url)
+    assert flask_response['status'] == asgi_response['status'] == 200
+    assert flask_response['body'] == asgi_response['body']
+
+
+WRITE_ERRORS = [
+    ('POST', '/api/properties/batch', b'{"property_ids": "x"}'),
+    ('POST', '/api/properties/batch', b'{"property_ids": [1]}'),
+    ('POST', '/api/properties/batch', b'not json'),
+    ('POST', '/api/leads', b'{"name": "Ann"}'),
+    ('POST', '/api/leads', b'[1]'),
+    ('PUT', '/api/leads/lead-001/status', b'{}'),
+    ('PUT', '/api/leads/nope/status', b'{"status": "Closed"}'),
+]
+
+
+@pytest.mark.parametrize('method,url,body', WRITE_ERRORS)
+def test_write_errors_match(apps, method, url, body):
+    flask_response, asgi_response = both(apps, method, url, body)
+    assert flask_response['status'] == asgi_response['status']
+    assert flask_response['status'] in (400, 404)
+    assert json.loads(flask_response['body']) == json.loads(asgi_response['body'])
+
+
+def test_batch_lookup_matches(apps):
+    flask_main, _ = apps
+    known = [prop['property_id'] for prop in flask_main.data_service.properties[:3]]
+    body = json.dumps({'property_ids': [known[2], 'nope', known[0]]}).encode()
+    flask_response, asgi_response = both(apps, 'POST', '/api/properties/batch', body)
+    assert flask_response['status'] == asgi_response['status'] == 200
+    assert flask_response['body'] == asgi_response['body']
+    payload = json.loads(flask_response['body'])
+    assert [prop['property_id'] for prop in payload['properties']] == [known[2], known[0]]
+    assert payload['not_found'] == ['nope']
+
+
+def test_leads_created_through_either_app(apps):
+    lead = b'{"name": "Ann", "email": "ann@example.com", "phone": "555-0100", "state": "GA"}'
+    flask_response, asgi_response = both(apps, 'POST', '/api/leads', lead)
+    assert flask_response['status'] == asgi_response['status'] == 201
+    created = [json.loads(r['body']) for r in (flask_response, asgi_response)]
+    assert created[0]['lead_id'] != created[1]['lead_id']
+    assert {lead['state_of_interest'] for lead in created} == {'GA'}
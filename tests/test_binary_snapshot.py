@@ -0,0 +1,125 @@
+import json
+import random
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from binary_snapshot import MappedRows, MappedSnapshot, compile_snapshot
+from data_service import DataService
+from geo_index import parse_geo_args
+from property_store import SORT_OPTIONS
+
+STATES = ['NC', 'GA', 'TX', 'FL']
+STATUSES = ['Available', 'New Listing', 'Pending', None]
+
+
+def make_properties(count=300, seed=3):
+    rng = random.Random(seed)
+    properties = []
+    for i in range(count):
+        prop = {
+            'property_id': f'387-{rng.randrange(count * 2):06d}',  # some IDs repeat
+            'address': f'{rng.randint(100, 9999)} {rng.choice(["Oak Ave", "Maple St", "Pine Rd"])}',
+            'city': rng.choice(['Raleigh', 'Atlanta', 'Austin']),
+            'state': rng.choice(STATES),
+            'zip_code': f'{rng.randrange(27000, 27100)}',
+            'status': rng.choice(STATUSES),
+            'bedrooms': rng.randint(1, 6),
+            'bathrooms': rng.choice([1, 1.5, 2, 3]),
+            'created_at': f'2026-0{rng.randint(1, 9)}-{rng.randint(10, 28)}T10:00:00',
+        }
+        if rng.random() < 0.9:
+            prop['price'] = rng.randrange(40000, 450000, 5000)
+        if rng.random() < 0.8:
+            prop['bid_deadline'] = f'2026-1{rng.randint(0, 2)}-{rng.randint(10, 28)}'
+        if rng.random() < 0.5:
+            prop['latitude'] = rng.uniform(30, 36)
+            prop['longitude'] = rng.uniform(-98, -78)
+        properties.append(prop)
+    return properties
+
+
+@pytest.fixture(scope='module')
+def services(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp('data')
+    properties = make_properties()
+    (data_dir / 'mock_properties_20260101_000000.json').write_text(json.dumps(properties))
+    (data_dir / 'mock_leads_20260101_000000.json').write_text('[]')
+    (data_dir / 'mock_brokers_20260101_000000.json').write_text('[]')
+    # Rows without coordinates are placed by ZIP centroid (half of the ZIPs have one)
+    (data_dir / 'zip_centroids.csv').write_text('zip,lat,lng\n' + ''.join(
+        f'{zip_code},{33.0 + (zip_code % 10) / 10},-84.0\n' for zip_code in range(27000, 27100, 2)))
+
+    snapshot_path = str(data_dir / 'data_snapshot.bin')
+    compile_snapshot({'properties': properties, 'leads': [], 'brokers': []}, snapshot_path)
+
+    from_json = DataService(data_dir=str(data_dir), journal_path='')
+    from_snapshot = DataService(data_dir=str(data_dir), snapshot_path=snapshot_path, journal_path='')
+    yield properties, from_json, from_snapshot
+    from_json.close()
+    from_snapshot.close()
+
+
+def pages(service, sort, limit=40, **filters):
+    result, cursor = [], None
+    while True:
+        page = service.search_properties_page(**filters, sort=sort, limit=limit, cursor=cursor)
+        result.append((service.properties_json(page['properties']), page['total']))
+        cursor = page['next_cursor']
+        if not cursor:
+            return result
+
+
+def test_indexes_are_read_from_the_map(services):
+    _, _, from_snapshot = services
+    snapshot = from_snapshot.snapshot
+    assert isinstance(snapshot.properties, MappedRows)
+    store = snapshot.property_store
+    for sort in SORT_OPTIONS:
+        assert not store.positions[sort].flags.writeable  # a view into the map, not a rebuilt array
+
+
+@pytest.mark.parametrize('sort', list(SORT_OPTIONS))
+@pytest.mark.parametrize('filters', [
+    {},
+    {'state': 'TX', 'min_price': 100000},
+    {'query': 'maple', 'bedrooms': 3},
+    {'geo': parse_geo_args(lat=33.5, lng=-84.0, radius_miles=150)},
+])
+def test_search_matches_json_load(services, sort, filters):
+    _, from_json, from_snapshot = services
+    assert pages(from_snapshot, sort, **filters) == pages(from_json, sort, **filters)
+
+
+def test_id_lookup_keeps_first_occurrence(services):
+    properties, from_json, from_snapshot = services
+    for prop in properties:
+        assert dict(from_snapshot.get_property_by_id(prop['property_id'])) == dict(
+            from_json.get_property_by_id(prop['property_id']))
+    assert from_snapshot.get_property_by_id('387-0000001') is None
+    assert from_snapshot.get_property_by_id('') is None
+
+
+def test_geo_index_and_stats_match_json_load(services):
+    _, from_json, from_snapshot = services
+    json_geo, snapshot_geo = from_json.snapshot.geo_index, from_snapshot.snapshot.geo_index
+    assert snapshot_geo.located == json_geo.located > 0
+    assert {cell: rows.tolist() for cell, rows in snapshot_geo.cells.items()} == \
+        {cell: rows.tolist() for cell, rows in json_geo.cells.items()}
+    assert from_snapshot.get_stats() == from_json.get_stats()
+
+
+def test_snapshot_without_indexes_still_loads(services, tmp_path):
+    properties, from_json, _ = services
+    path = str(tmp_path / 'old.bin')
+    compile_snapshot({'properties': properties, 'leads': [], 'brokers': []}, path)
+    table = MappedSnapshot(path).tables['properties']
+    del table.spec['indexes']  # as written before the indexes were stored
+
+    assert table.id_index() is None and table.store_index() is None and table.totals() is None
+    service = DataService(data_dir=str(tmp_path), journal_path='')
+    service.snapshot.properties = table.rows()
+    service.snapshot.property_columns = table
+    service.snapshot.build_property_indexes(use_columnar=True)
+    assert pages(service, 'price_asc') == pages(from_json, 'price_asc')
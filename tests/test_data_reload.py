@@ -0,0 +1,106 @@
+import json
+import os
+import threading
+
+import pytest
+
+import data_service as data_service_module
+from data_service import DataService, find_data_files, property_file_prefixes
+
+
+def properties(count, city):
+    return [{'property_id': f'387-{i:06d}', 'city': city, 'state': 'NC', 'status': 'Available',
+             'price': 100000 + i, 'bedrooms': 3, 'bathrooms': 2, 'created_at': '2026-01-01T10:00:00'}
+            for i in range(count)]
+
+
+def write(path, rows):
+    # Written aside and renamed in, as a data refresh job would
+    path.with_suffix('.tmp').write_text(json.dumps(rows))
+    os.replace(path.with_suffix('.tmp'), path)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    write(tmp_path / 'mock_properties_20260101_000000.json', properties(20, 'Raleigh'))
+    write(tmp_path / 'mock_leads_20260101_000000.json', [])
+    write(tmp_path / 'mock_brokers_20260101_000000.json', [])
+    return tmp_path
+
+
+def test_nationwide_file_is_opt_in(data_dir, monkeypatch):
+    write(data_dir / 'nationwide_properties_20260301_000000.json', properties(5, 'Austin'))
+    assert find_data_files(str(data_dir))['properties'] == 'mock_properties_20260101_000000.json'
+
+    monkeypatch.setenv('PROPERTY_FILE_PREFIXES', 'mock_properties_, nationwide_properties_')
+    monkeypatch.setitem(data_service_module.DATA_FILE_PREFIXES, 'properties', property_file_prefixes())
+    assert find_data_files(str(data_dir))['properties'] == 'nationwide_properties_20260301_000000.json'
+
+
+def test_reload_swaps_in_newer_file(data_dir):
+    service = DataService(data_dir=str(data_dir), journal_path='')
+    try:
+        old_snapshot, version = service.snapshot, service.data_version
+        lead = service.add_lead({'name': 'Ann', 'email': 'ann@example.com', 'phone': '555-0100'})
+        assert service.load_mock_data(force=False) is False  # nothing changed
+
+        write(data_dir / 'mock_properties_20260201_000000.json', properties(30, 'Durham'))
+        write(data_dir / 'mock_leads_20260201_000000.json', [])
+        assert service.load_mock_data(force=False) is True
+
+        assert service.data_version == version + 1
+        assert service.search_properties_page(limit=1)['total'] == 30
+        assert service.get_property_by_id('387-000025')['city'] == 'Durham'
+        assert service.get_stats()['properties']['total'] == 30
+        # Runtime leads survive a reload of the lead file
+        assert service.update_lead_status(lead['lead_id'], 'Contacted')['status'] == 'Contacted'
+        # A reader holding the old snapshot still sees the whole old dataset
+        assert len(old_snapshot.properties) == 20
+        assert old_snapshot.properties_by_id['387-000001']['city'] == 'Raleigh'
+    finally:
+        service.close()
+
+
+def test_unreadable_file_keeps_old_data(data_dir):
+    service = DataService(data_dir=str(data_dir), journal_path='')
+    try:
+        (data_dir / 'mock_properties_20260201_000000.json').write_text('[{"property_id": ')
+        assert service.load_mock_data(force=False) is False
+        assert len(service.properties) == 20
+        assert service.reload_status()['last_error']
+    finally:
+        service.close()
+
+
+def test_readers_never_see_a_mixed_dataset(data_dir):
+    service = DataService(data_dir=str(data_dir), journal_path='')
+    datasets = {20: 'Raleigh', 30: 'Durham'}
+    seen, errors, stop = set(), [], threading.Event()
+
+    def read():
+        while not stop.is_set():
+            try:
+                page = service.search_properties_page(limit=100)
+                cities = {prop['city'] for prop in page['properties']}
+                if cities != {datasets.get(page['total'])}:
+                    errors.append((page['total'], cities))
+                seen.add(page['total'])
+            except Exception as e:
+                errors.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    try:
+        for i in range(10):
+            count = 30 if i % 2 == 0 else 20
+            write(data_dir / f'mock_properties_20260201_0000{i:02d}.json', properties(count, datasets[count]))
+            assert service.load_mock_data(force=False) is True
+    finally:
+        stop.set()
+        for reader in readers:
+            reader.join()
+        service.close()
+
+    assert errors == []
+    assert seen and seen <= {20, 30}
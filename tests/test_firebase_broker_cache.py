@@ -0,0 +1,74 @@
+import pytest
+
+pytest.importorskip('firebase_admin')
+
+from firebase_service import FirebaseService
+
+
+class FakeDoc:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeBrokers:
+    """The 'brokers' collection: document().set() and array_contains queries"""
+
+    def __init__(self):
+        self.docs = {}
+        self.queries = 0
+        self._doc_id = None
+        self._state = None
+
+    def document(self, doc_id):
+        self._doc_id = doc_id
+        return self
+
+    def set(self, data):
+        self.docs[self._doc_id] = data
+
+    def where(self, field, op, state):
+        self._state = state
+        return self
+
+    def stream(self):
+        self.queries += 1
+        return [FakeDoc(doc_id, data) for doc_id, data in self.docs.items()
+                if self._state in data.get('coverage_states', [])]
+
+
+class FakeDB:
+    def __init__(self):
+        self.brokers = FakeBrokers()
+
+    def collection(self, name):
+        assert name == 'brokers'
+        return self.brokers
+
+
+@pytest.fixture
+def service():
+    service = FirebaseService.__new__(FirebaseService)
+    service.db = FakeDB()
+    service.broker_cache_ttl = 300
+    service._brokers_by_state = {}
+    service._broker_generation = 0
+    return service
+
+
+def broker_ids(brokers):
+    return [broker['id'] for broker in brokers]
+
+
+def test_dropped_state_stops_returning_broker(service):
+    service.add_broker({'broker_id': 'b1', 'coverage_states': ['NC', 'SC']})
+    assert broker_ids(service.get_brokers_by_state('SC')) == ['b1']
+    assert broker_ids(service.get_brokers_by_state('SC')) == ['b1']
+    assert service.db.brokers.queries == 1  # second call served from the cache
+
+    service.add_broker({'broker_id': 'b1', 'coverage_states': ['NC']})
+    assert service.get_brokers_by_state('SC') == []
+    assert broker_ids(service.get_brokers_by_state('NC')) == ['b1']
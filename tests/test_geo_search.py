@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from data_service import DataService
+from geo_index import haversine_miles
+from tests.test_api_apps import load_app
+
+# Raleigh downtown; Durham is ~23 miles away, Charlotte ~130
+RALEIGH = (35.7796, -78.6382)
+
+PROPERTIES = [
+    {'property_id': '387-000001', 'city': 'Raleigh', 'zip_code': '27601', 'latitude': 35.7796, 'longitude': -78.6382},
+    {'property_id': '387-000002', 'city': 'Cary', 'zip_code': '27511'},  # placed by ZIP centroid
+    {'property_id': '387-000003', 'city': 'Durham', 'zip_code': '27701', 'latitude': 35.9940, 'longitude': -78.8986},
+    {'property_id': '387-000004', 'city': 'Charlotte', 'zip_code': '28202'},  # placed by ZIP centroid
+    {'property_id': '387-000005', 'city': 'Nowhere', 'zip_code': '99999'},  # no coordinates at all
+]
+CENTROIDS = {'27511': (35.7641, -78.7786), '28202': (35.2271, -80.8431)}
+
+
+@pytest.fixture(scope='module')
+def client(tmp_path_factory, monkeypatch_module):
+    data_dir = tmp_path_factory.mktemp('geo')
+    rows = [{'state': 'NC', 'status': 'Available', 'price': 100000 + i * 1000, 'bedrooms': 3,
+             'bathrooms': 2, 'created_at': f'2026-01-0{i + 1}T10:00:00', **prop}
+            for i, prop in enumerate(PROPERTIES)]
+    (data_dir / 'mock_properties_20260101_000000.json').write_text(json.dumps(rows))
+    (data_dir / 'mock_leads_20260101_000000.json').write_text('[]')
+    (data_dir / 'mock_brokers_20260101_000000.json').write_text('[]')
+    (data_dir / 'zip_centroids.csv').write_text(
+        'zip,lat,lng\n' + ''.join(f'{zip_code},{lat},{lng}\n' for zip_code, (lat, lng) in CENTROIDS.items()))
+
+    monkeypatch_module.setenv('DATA_RELOAD_INTERVAL', '0')
+    monkeypatch_module.setenv('DATA_SNAPSHOT_FILE', '')
+    main = load_app('geo_main', 'src/main.py')
+    main.data_service.close()
+    main.data_service = DataService(data_dir=str(data_dir), journal_path='')
+    yield main.app.test_client()
+    main.data_service.close()
+
+
+@pytest.fixture(scope='module')
+def monkeypatch_module():
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        yield monkeypatch
+
+
+def cities(response):
+    assert response.status_code == 200
+    return sorted(prop['city'] for prop in response.get_json()['properties'])
+
+
+def test_radius_search(client):
+    lat, lng = RALEIGH
+    assert cities(client.get(f'/api/properties?lat={lat}&lng={lng}&radius_miles=10')) == ['Cary', 'Raleigh']
+    assert cities(client.get(f'/api/properties?lat={lat}&lng={lng}&radius_miles=30')) == \
+        ['Cary', 'Durham', 'Raleigh']
+    assert haversine_miles(*RALEIGH, *CENTROIDS['28202']) > 100
+    assert cities(client.get(f'/api/properties?lat={lat}&lng={lng}&radius_miles=200')) == \
+        ['Cary', 'Charlotte', 'Durham', 'Raleigh']
+
+
+def test_bbox_search(client):
+    assert cities(client.get('/api/properties?bbox=35.9,-79.0,36.1,-78.8')) == ['Durham']
+    assert cities(client.get('/api/properties?bbox=35.0,-81.0,35.9,-78.7')) == ['Cary', 'Charlotte']
+
+
+def test_radius_and_bbox_combine(client):
+    lat, lng = RALEIGH
+    response = client.get(f'/api/properties?lat={lat}&lng={lng}&radius_miles=30&bbox=35.7,-78.7,36.1,-78.5')
+    assert cities(response) == ['Raleigh']
+
+
+def test_facets_and_health_count_geocoded_rows(client):
+    facets = client.get('/api/properties/facets?bbox=35.0,-81.0,37.0,-78.0').get_json()
+    assert facets['total'] == 4
+    assert client.get('/api/health').get_json()['data_reload']['geocoded_properties'] == 4
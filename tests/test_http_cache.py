@@ -0,0 +1,141 @@
+import os
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from http_cache import install_cache
+from hud_scraper import HUDPropertyScraper
+
+URL = 'https://www.hudhomestore.gov/searchresult?citystate=NC'
+
+
+class Origin:
+    """Stands in for the network under HTTPAdapter.send, honouring conditional requests"""
+
+    def __init__(self):
+        self.resources = {}
+        self.requests = []
+
+    def serve(self, url, body, **headers):
+        self.resources[url] = (body, {name.replace('_', '-'): value for name, value in headers.items()})
+
+    def send(self, request, stream=False, **kwargs):
+        self.requests.append(request)
+        body, headers = self.resources[request.url]
+        etag, modified = headers.get('ETag'), headers.get('Last-Modified')
+        not_modified = (request.headers.get('If-None-Match') == etag if etag
+                        else modified and request.headers.get('If-Modified-Since') == modified)
+
+        response = requests.Response()
+        response.status_code = 304 if not_modified else 200
+        response.headers = CaseInsensitiveDict(headers, **{'Content-Length': str(len(body))})
+        response._content = b'' if not_modified else body
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        return response
+
+
+@pytest.fixture
+def origin(monkeypatch):
+    origin = Origin()
+    monkeypatch.setattr(HTTPAdapter, 'send', lambda adapter, request, **kwargs: origin.send(request, **kwargs))
+    return origin
+
+
+@pytest.fixture
+def session(tmp_path):
+    session = requests.Session()
+    session.cache = install_cache(session, str(tmp_path / 'cache'))
+    return session
+
+
+def test_unchanged_page_is_revalidated_and_served_from_disk(origin, session):
+    origin.serve(URL, b'<html>page one</html>', ETag='"v1"', Last_Modified='Mon, 05 Oct 2026 10:00:00 GMT')
+    first = session.get(URL)
+    assert first.content == b'<html>page one</html>'
+    assert 'If-None-Match' not in origin.requests[0].headers
+
+    second = session.get(URL)
+    assert origin.requests[1].headers['If-None-Match'] == '"v1"'
+    assert origin.requests[1].headers['If-Modified-Since'] == 'Mon, 05 Oct 2026 10:00:00 GMT'
+    assert second.status_code == 200 and second.from_cache
+    assert second.text == '<html>page one</html>'
+    assert 'Content-Length' not in second.headers  # transfer headers are not stored
+    assert session.cache.stats() == {'directory': session.cache.directory, 'hits': 1, 'misses': 1,
+                                     'stores': 1, 'bytes_saved': 21, 'hit_rate': 0.5}
+
+
+def test_last_modified_alone_is_a_validator(origin, session):
+    origin.serve(URL, b'body', Last_Modified='Mon, 05 Oct 2026 10:00:00 GMT')
+    session.get(URL)
+    assert session.get(URL).from_cache
+
+
+def test_changed_page_replaces_the_stored_copy(origin, session):
+    origin.serve(URL, b'old', ETag='"v1"')
+    session.get(URL)
+    origin.serve(URL, b'new', ETag='"v2"')
+    response = session.get(URL)
+    assert response.content == b'new' and not getattr(response, 'from_cache', False)
+
+    response = session.get(URL)
+    assert origin.requests[-1].headers['If-None-Match'] == '"v2"'
+    assert response.from_cache and response.content == b'new'
+
+
+def test_uncacheable_responses_are_not_kept(origin, session):
+    origin.serve(URL, b'private', ETag='"v1"', Cache_Control='no-store')
+    session.get(URL)
+    assert session.cache.get(URL) is None
+
+    origin.serve(URL, b'stored', ETag='"v1"')
+    session.get(URL)
+    assert session.cache.get(URL).body == b'stored'
+    # Once the page stops sending validators the stored copy can never be revalidated
+    origin.serve(URL, b'no validators')
+    session.get(URL)
+    assert session.cache.get(URL) is None
+
+
+def test_not_modified_refreshes_stored_validators(origin, session):
+    origin.serve(URL, b'body', ETag='"v1"', Last_Modified='Mon, 05 Oct 2026 10:00:00 GMT')
+    session.get(URL)
+    origin.serve(URL, b'body', ETag='"v1"', Last_Modified='Tue, 06 Oct 2026 10:00:00 GMT')
+    assert session.get(URL).from_cache
+    assert session.cache.get(URL).last_modified == 'Tue, 06 Oct 2026 10:00:00 GMT'
+
+
+def test_caller_validators_and_other_methods_bypass_the_cache(origin, session):
+    origin.serve(URL, b'body', ETag='"v1"')
+    session.get(URL)
+    session.get(URL, headers={'If-None-Match': '"mine"'})
+    assert origin.requests[-1].headers['If-None-Match'] == '"mine"'
+
+    response = session.post(URL)
+    assert response.content == b'body'
+    assert 'If-None-Match' not in origin.requests[-1].headers
+
+
+def test_truncated_body_is_a_miss(origin, session):
+    origin.serve(URL, b'a full page body', ETag='"v1"')
+    session.get(URL)
+    path = session.cache._path(URL) + '.body'
+    with open(path, 'wb') as f:
+        f.write(b'a full')
+    assert session.cache.get(URL) is None
+
+    response = session.get(URL)
+    assert 'If-None-Match' not in origin.requests[-1].headers
+    assert response.content == b'a full page body'
+    assert os.path.getsize(path) == len(b'a full page body')
+
+
+def test_scraper_fetches_through_the_cache(origin, tmp_path):
+    scraper = HUDPropertyScraper(requests_per_second=0, cache_dir=str(tmp_path / 'hud'))
+    origin.serve(URL, b'<html></html>', ETag='"v1"')
+    assert not getattr(scraper.fetch(URL), 'from_cache', False)
+    assert scraper.fetch(URL).from_cache
+    assert scraper.http_cache.stats()['hits'] == 1
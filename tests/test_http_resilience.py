@@ -0,0 +1,98 @@
+import time
+
+import pytest
+import requests
+
+from http_resilience import CircuitBreaker, CircuitOpenError
+from hud_scraper import HUDPropertyScraper
+
+URL = 'https://www.hudhomestore.gov/searchresult?citystate=NC'
+HOST = 'www.hudhomestore.gov'
+
+
+class FakeResponse:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.headers = {}
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    """Stands in for requests.Session.get, playing back queued outcomes"""
+
+    def __init__(self):
+        self.outcomes = []
+        self.calls = 0
+
+    def get(self, url, timeout=None):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def scraper():
+    scraper = HUDPropertyScraper(requests_per_second=0, cache_dir='', max_retries=1, failure_threshold=2)
+    scraper.retry_policy.backoff = 0
+    scraper.circuit_breaker.reset_timeout = 0.05
+    scraper.session = FakeSession()
+    return scraper
+
+
+def state(scraper):
+    return scraper.circuit_breaker.stats()[HOST]['state']
+
+
+def open_circuit(scraper):
+    scraper.session.outcomes = [requests.ConnectionError('down')] * 4
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            scraper.fetch(URL)
+    assert state(scraper) == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        scraper.fetch(URL)
+
+
+def test_failed_trial_reopens_then_host_recovers(scraper):
+    open_circuit(scraper)
+    time.sleep(0.06)
+
+    # The trial fails on every attempt; its retry must not be rejected by the breaker
+    scraper.session.outcomes = [requests.Timeout('slow'), FakeResponse(503)]
+    calls = scraper.session.calls
+    assert scraper.fetch(URL).status_code == 503
+    assert scraper.session.calls == calls + 2
+    assert state(scraper) == CircuitBreaker.OPEN
+
+    time.sleep(0.06)
+    scraper.session.outcomes = [FakeResponse(200)]
+    assert scraper.fetch(URL).status_code == 200
+    assert state(scraper) == CircuitBreaker.CLOSED
+
+
+def test_trial_retry_succeeds_and_closes(scraper):
+    open_circuit(scraper)
+    time.sleep(0.06)
+
+    scraper.session.outcomes = [FakeResponse(502), FakeResponse(200)]
+    assert scraper.fetch(URL).status_code == 200
+    assert state(scraper) == CircuitBreaker.CLOSED
+
+
+def test_unretried_error_is_recorded(scraper):
+    open_circuit(scraper)
+    time.sleep(0.06)
+
+    scraper.session.outcomes = [requests.exceptions.ChunkedEncodingError('cut off')]
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        scraper.fetch(URL)
+    assert state(scraper) == CircuitBreaker.OPEN
+
+    time.sleep(0.06)
+    scraper.session.outcomes = [FakeResponse(200)]
+    assert scraper.fetch(URL).status_code == 200
+    assert state(scraper) == CircuitBreaker.CLOSED
@@ -0,0 +1,131 @@
+import os
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import requests
+
+from hud_scraper import HUDPropertyScraper, IncompleteScrapeError, PARSERS, etree
+
+PAGE_SIZE = 20
+
+
+def card(state, number):
+    return (f'<div class="property-card" data-case-number="{number:03d}-{state}0000">'
+            f'<span class="address">{number} Main St</span></div>')
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, content):
+        self.content = content.encode()
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSite:
+    """Numbered result pages of PAGE_SIZE cards; `fail_page` raises a connection error"""
+
+    def __init__(self, totals, fail_page=None):
+        self.totals = totals
+        self.fail_page = fail_page
+        self.requests = []
+
+    def get(self, url, timeout=None):
+        self.requests.append(url)
+        query = parse_qs(urlsplit(url).query)
+        state = query['citystate'][0]
+        page = int(query.get('page', ['1'])[0])
+        if page == self.fail_page:
+            raise requests.ConnectionError('connection reset')
+        numbers = range((page - 1) * PAGE_SIZE, min(page * PAGE_SIZE, self.totals[state]))
+        return FakeResponse('<html><body>' + ''.join(card(state, n) for n in numbers) + '</body></html>')
+
+
+PARSER_NAMES = [name for name in PARSERS if name != 'lxml' or etree is not None]
+
+
+def make_scraper(site, parser):
+    scraper = HUDPropertyScraper(requests_per_second=0, cache_dir='', max_retries=0,
+                                 failure_threshold=0, parser=parser)
+    scraper.session = site
+    return scraper
+
+
+@pytest.mark.parametrize('parser', PARSER_NAMES)
+def test_follows_numbered_pages(parser):
+    site = FakeSite({'FL': 55})
+    properties = make_scraper(site, parser).get_state_properties('FL')
+    assert len(properties) == 55
+    assert len({p['property_id'] for p in properties}) == 55
+    assert len(site.requests) == 3  # 20 + 20 + a short page of 15
+
+
+@pytest.mark.parametrize('parser', PARSER_NAMES)
+def test_short_first_page_is_the_only_page(parser):
+    site = FakeSite({'NC': 7})
+    assert len(make_scraper(site, parser).get_state_properties('NC')) == 7
+    assert len(site.requests) == 1
+
+
+def test_later_page_failure_raises():
+    site = FakeSite({'FL': 55}, fail_page=2)
+    with pytest.raises(IncompleteScrapeError) as excinfo:
+        make_scraper(site, None).get_state_properties('FL')
+    assert excinfo.value.page == 2
+
+
+def test_first_page_failure_raises():
+    site = FakeSite({'FL': 55}, fail_page=1)
+    with pytest.raises(IncompleteScrapeError) as excinfo:
+        make_scraper(site, None).get_state_properties('FL')
+    assert excinfo.value.page == 1
+
+
+def test_first_page_failure_is_not_an_empty_state():
+    site = FakeSite({'FL': 55, 'NC': 7}, fail_page=1)
+    scraper = make_scraper(site, None)
+    results = scraper.scrape_all_states(['NC', 'FL'], max_workers=1)
+    assert results == {}
+    assert sorted(scraper.incomplete_states) == ['FL', 'NC']
+
+
+def test_open_circuit_leaves_state_out():
+    site = FakeSite({'FL': 55, 'NC': 7})
+    scraper = make_scraper(site, None)
+    scraper.circuit_breaker.failure_threshold = 1
+    scraper.circuit_breaker.record_failure(scraper.base_url)
+    results = scraper.scrape_all_states(['NC', 'FL'], max_workers=1)
+    assert results == {}
+    assert sorted(scraper.incomplete_states) == ['FL', 'NC']
+    assert 'Circuit open' in scraper.incomplete_states['NC']
+    assert site.requests == []
+
+
+def test_unparseable_first_page_leaves_state_out():
+    site = FakeSite({'FL': 55})
+    scraper = make_scraper(site, None)
+
+    def broken_parser(content):
+        raise ValueError('unexpected markup')
+    scraper.parse_search_page = broken_parser
+    assert scraper.scrape_all_states(['FL'], max_workers=1) == {}
+    assert 'unexpected markup' in scraper.incomplete_states['FL']
+
+
+def test_scrape_all_states_leaves_out_incomplete_states():
+    site = FakeSite({'FL': 55, 'NC': 7}, fail_page=2)
+    scraper = make_scraper(site, None)
+    results = scraper.scrape_all_states(['NC', 'FL'], max_workers=2)
+    assert list(results) == ['NC']
+    assert len(results['NC']) == 7
+    assert list(scraper.incomplete_states) == ['FL']
+
+
+def test_stream_discards_file_for_incomplete_state(tmp_path):
+    site = FakeSite({'FL': 55, 'NC': 7}, fail_page=2)
+    filename = str(tmp_path / 'out.json')
+    assert make_scraper(site, None).save_to_json_stream(['NC', 'FL'], filename) is None
+    assert not os.path.exists(filename)
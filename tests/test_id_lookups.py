@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from data_service import DataService
+
+PROPERTIES = [
+    {'property_id': '387-000001', 'city': 'Raleigh', 'state': 'NC', 'status': 'Available', 'price': 100000},
+    {'property_id': '387-000002', 'city': 'Durham', 'state': 'NC', 'status': 'Available', 'price': 120000},
+    {'property_id': '387-000001', 'city': 'Duplicate', 'state': 'NC', 'status': 'Available', 'price': 1},
+]
+LEADS = [
+    {'lead_id': 'lead-001', 'name': 'Ann', 'status': 'New', 'created_at': '2026-01-01T10:00:00'},
+    {'lead_id': 'lead-002', 'name': 'Bob', 'status': 'New', 'created_at': '2026-01-02T10:00:00'},
+]
+
+
+@pytest.fixture
+def service(tmp_path):
+    (tmp_path / 'mock_properties_20260101_000000.json').write_text(json.dumps(PROPERTIES))
+    (tmp_path / 'mock_leads_20260101_000000.json').write_text(json.dumps(LEADS))
+    (tmp_path / 'mock_brokers_20260101_000000.json').write_text('[]')
+    service = DataService(data_dir=str(tmp_path), journal_path='')
+    yield service
+    service.close()
+
+
+def test_property_lookup_keeps_first_occurrence(service):
+    assert service.get_property_by_id('387-000001')['city'] == 'Raleigh'
+    assert service.get_property_by_id('387-000002')['city'] == 'Durham'
+    assert service.get_property_by_id('387-999999') is None
+
+
+def test_batch_lookup_keeps_request_order(service):
+    found, not_found = service.get_properties_by_ids(['387-000002', 'nope', '387-000001', '387-000002'])
+    assert [prop['city'] for prop in found] == ['Durham', 'Raleigh', 'Durham']
+    assert not_found == ['nope']
+
+
+def test_status_update_goes_through_the_lead_index(service):
+    lead = service.update_lead_status('lead-002', 'Contacted')
+    assert lead['status'] == 'Contacted'
+    assert [lead['status'] for lead in service.leads] == ['New', 'Contacted']
+    assert service.update_lead_status('lead-999', 'Contacted') is None
+
+
+def test_added_leads_are_indexed(service):
+    lead = service.add_lead({'name': 'Cy', 'email': 'cy@example.com', 'phone': '555-0100'})
+    assert service.update_lead_status(lead['lead_id'], 'Closed') is lead
+    assert lead['status'] == 'Closed'
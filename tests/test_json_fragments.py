@@ -0,0 +1,82 @@
+import json
+import os
+
+import pytest
+from flask import Flask
+
+import json_fragments
+from data_service import DataService
+from geo_index import GeoQuery
+from json_fragments import JSONFragments, dumps, encode_object
+from property_record import PropertyRecord, RecordJSONProvider
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ROWS = [
+    {'property_id': '387-000001', 'address': '12 "Quoted" Ln', 'city': 'Raleigh', 'price': 125000,
+     'bathrooms': 2.5, 'status': None, 'notes': 'café ✓'},
+    PropertyRecord({'property_id': '387-000002', 'city': 'Durham', 'price': 99000, 'status': 'Available'}),
+]
+
+
+def jsonify_body(value):
+    app = Flask(__name__)
+    app.json = RecordJSONProvider(app)
+    with app.app_context():
+        return app.json.response(value).get_data()
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def encoder(request, monkeypatch):
+    if request.param == 'json':
+        monkeypatch.setattr(json_fragments, 'orjson', None)
+    elif json_fragments.orjson is None:
+        pytest.skip('orjson missing')
+    return request.param
+
+
+def test_fragments_decode_to_the_rows(encoder):
+    fragments = JSONFragments(ROWS)
+    for row in ROWS:
+        assert json.loads(fragments.get(row)) == dict(row)
+    assert json.loads(fragments.array(ROWS)) == [dict(row) for row in ROWS]
+    assert fragments.bytes == sum(len(fragments.get(row)) for row in ROWS)
+
+
+def test_rows_from_another_load_are_encoded_on_the_fly(encoder):
+    other = {'property_id': '387-000003', 'price': 1}
+    assert JSONFragments(ROWS).get(other) == dumps(other)
+
+
+def test_encoded_object_equals_jsonify(encoder):
+    geo = GeoQuery(lat=35.7, lng=-78.6, radius_miles=10.0)
+    payload = {'total': 2, 'next_cursor': None, 'filters_applied': {'state': 'NC', 'geo': geo, 'sort': 'newest'}}
+    body = encode_object(payload, raw={'properties': JSONFragments(ROWS).array(ROWS)})
+    expected = jsonify_body({**payload, 'properties': ROWS})
+    assert json.loads(body) == json.loads(expected)
+    assert list(json.loads(body)) == sorted(json.loads(body))  # keys sorted like jsonify
+
+
+def test_both_encoders_emit_the_same_json(monkeypatch):
+    if json_fragments.orjson is None:
+        pytest.skip('orjson missing')
+    fast = [dumps(row) for row in ROWS]
+    monkeypatch.setattr(json_fragments, 'orjson', None)
+    # Bytes may differ (orjson writes UTF-8, json escapes it); the values may not
+    assert [json.loads(body) for body in fast] == [json.loads(dumps(row)) for row in ROWS]
+
+
+def test_preserialized_service_answers_like_plain_encoding():
+    fragments = DataService(data_dir=ROOT, journal_path='', preserialize=True)
+    plain = DataService(data_dir=ROOT, journal_path='', preserialize=False)
+    try:
+        assert isinstance(fragments.snapshot.property_json, JSONFragments)
+        page = fragments.search_properties_page(state='NC', limit=100)['properties']
+        assert json.loads(fragments.properties_json(page)) == json.loads(jsonify_body(page))
+        assert fragments.properties_json(page) == plain.properties_json(
+            plain.search_properties_page(state='NC', limit=100)['properties'])
+        prop = fragments.get_property_by_id(page[0]['property_id'])
+        assert json.loads(fragments.property_json(prop)) == json.loads(jsonify_body(prop))
+    finally:
+        fragments.close()
+        plain.close()
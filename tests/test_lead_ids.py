@@ -0,0 +1,55 @@
+import json
+import threading
+
+from data_service import DataService
+
+
+def make_service(tmp_path):
+    return DataService(data_dir=str(tmp_path), journal_path=str(tmp_path / 'leads_journal.jsonl'))
+
+
+def test_workers_sharing_a_journal_get_distinct_ids(tmp_path):
+    # Two services stand in for two worker processes appending to one journal
+    workers = [make_service(tmp_path), make_service(tmp_path)]
+    ids = []
+
+    def add_leads(service):
+        for i in range(25):
+            ids.append(service.add_lead({'name': f'Lead {i}', 'email': f'{i}@example.com'})['lead_id'])
+
+    threads = [threading.Thread(target=add_leads, args=(service,)) for service in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for service in workers:
+        service.close()
+
+    assert len(ids) == 50
+    assert len(set(ids)) == 50
+
+    restarted = make_service(tmp_path)
+    try:
+        assert sorted(lead['lead_id'] for lead in restarted.leads) == sorted(ids)
+        assert restarted.add_lead({'name': 'After restart'})['lead_id'] not in ids
+    finally:
+        restarted.close()
+
+
+def test_replay_drops_duplicate_ids(tmp_path):
+    journal = tmp_path / 'leads_journal.jsonl'
+    records = [
+        {'op': 'add', 'lead': {'lead_id': 'lead-001', 'name': 'First', 'status': 'New',
+                               'created_at': '2026-01-01T00:00:00'}},
+        {'op': 'add', 'lead': {'lead_id': 'lead-001', 'name': 'Second', 'status': 'New',
+                               'created_at': '2026-01-01T00:00:01'}},
+    ]
+    journal.write_text(''.join(json.dumps(record) + '\n' for record in records))
+
+    service = make_service(tmp_path)
+    try:
+        leads = [lead for lead in service.leads if lead['lead_id'] == 'lead-001']
+        assert [lead['name'] for lead in leads] == ['First']
+        assert service.add_lead({'name': 'New'})['lead_id'] == 'lead-002'
+    finally:
+        service.close()
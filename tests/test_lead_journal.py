@@ -0,0 +1,86 @@
+import json
+import multiprocessing
+
+from data_service import DataService
+from lead_journal import LeadJournal
+
+
+def make_service(tmp_path):
+    return DataService(data_dir=str(tmp_path), journal_path=str(tmp_path / 'leads_journal.jsonl'))
+
+
+def test_replay_restores_added_leads_and_status_changes(tmp_path):
+    service = make_service(tmp_path)
+    first = service.add_lead({'name': 'Ada', 'email': 'ada@example.com', 'propertyId': '387-111111', 'state': 'NC'})
+    second = service.add_lead({'name': 'Grace', 'email': 'grace@example.com'})
+    service.update_lead_status(first['lead_id'], 'Contacted')
+    service.update_lead_status(first['lead_id'], 'Closed')
+    service.close()
+
+    restarted = make_service(tmp_path)
+    try:
+        leads = {lead['lead_id']: lead for lead in restarted.leads}
+        assert set(leads) == {first['lead_id'], second['lead_id']}
+        assert leads[first['lead_id']]['status'] == 'Closed'
+        assert leads[first['lead_id']]['property_id'] == '387-111111'
+        assert leads[second['lead_id']]['status'] == 'New'
+        assert restarted.get_stats()['leads']['total'] == 2
+    finally:
+        restarted.close()
+
+
+def test_torn_last_record_is_skipped(tmp_path):
+    service = make_service(tmp_path)
+    lead = service.add_lead({'name': 'Ada'})
+    service.close()
+    with open(tmp_path / 'leads_journal.jsonl', 'ab') as f:
+        f.write(b'{"op": "add", "lead": {"lead_id": "lead-0')
+
+    restarted = make_service(tmp_path)
+    try:
+        assert [l['lead_id'] for l in restarted.leads] == [lead['lead_id']]
+        # New records start on their own line after the torn one
+        restarted.add_lead({'name': 'Grace'})
+    finally:
+        restarted.close()
+
+    again = make_service(tmp_path)
+    try:
+        assert len(again.leads) == 2
+    finally:
+        again.close()
+
+
+def test_journal_is_off_unless_configured(tmp_path, monkeypatch):
+    monkeypatch.delenv('LEAD_JOURNAL_FILE', raising=False)
+    service = DataService(data_dir=str(tmp_path))
+    try:
+        assert service.lead_journal is None
+        service.add_lead({'name': 'Ada'})
+    finally:
+        service.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+def append_records(path, writer, count):
+    journal = LeadJournal(path)
+    # Records larger than a buffered file's 8 KiB buffer, which it would split
+    for i in range(count):
+        journal.append({'op': 'add', 'writer': writer, 'i': i, 'pad': 'x' * 20000})
+    journal.close()
+
+
+def test_batches_from_several_processes_do_not_interleave(tmp_path):
+    path = str(tmp_path / 'leads_journal.jsonl')
+    context = multiprocessing.get_context('fork')
+    writers = [context.Process(target=append_records, args=(path, writer, 50)) for writer in range(4)]
+    for process in writers:
+        process.start()
+    for process in writers:
+        process.join()
+        assert process.exitcode == 0
+
+    with open(path, 'rb') as f:
+        records = [json.loads(line) for line in f]  # a torn or interleaved line would not parse
+    for writer in range(4):
+        assert [r['i'] for r in records if r['writer'] == writer] == list(range(50))
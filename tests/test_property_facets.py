@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+from data_service import DataService
+from property_store import PropertyStore, columnar_available, facet_counts
+
+pytestmark = pytest.mark.skipif(not columnar_available(), reason='numpy missing')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ROWS = [
+    {'property_id': '387-000001', 'state': 'NC', 'status': 'Available', 'bedrooms': 0, 'price': 45000},
+    {'property_id': '387-000002', 'state': 'NC', 'status': 'Pending', 'bedrooms': 3, 'price': 50000},
+    {'property_id': '387-000003', 'state': 'GA', 'status': 'Available', 'bedrooms': 7, 'price': 650000},
+    {'property_id': '387-000004', 'state': 'GA', 'status': None, 'bedrooms': '2', 'price': None},
+    {'property_id': '387-000005', 'state': None, 'status': 'Available', 'price': 199999},
+    {'property_id': '387-000006', 'state': 'TX', 'status': 'Available', 'bedrooms': 4.5, 'price': -1},
+]
+
+
+def test_counts_per_bucket():
+    facets = facet_counts(ROWS)
+    assert facets['state'] == {'NC': 2, 'GA': 2, 'TX': 1}
+    assert facets['status'] == {'Available': 4, 'Pending': 1}
+    assert facets['bedrooms'] == {'1': 1, '2': 1, '3': 1, '4': 1, '5+': 1}
+    assert [band['count'] for band in facets['price']] == [1, 1, 0, 1, 0, 0, 1]
+    assert facets['price'][-1] == {'min': 500000, 'max': None, 'count': 1}
+
+
+@pytest.mark.parametrize('filters', [{}, {'state': 'GA'}, {'status': 'Available'}, {'state': 'FL'}])
+def test_store_counts_match_list_counts(filters):
+    store = PropertyStore(ROWS)
+    mask = store.filter_mask(**filters)
+    selected = [row for row, keep in zip(ROWS, mask) if keep]
+    assert store.facet_counts(mask) == facet_counts(selected)
+
+
+@pytest.mark.parametrize('filters', [{}, {'state': 'NC'}, {'min_price': 100000, 'bedrooms': 3}, {'query': 'dr'}])
+def test_data_service_facets_match_list_path(filters):
+    columnar = DataService(use_columnar=True, data_dir=ROOT, journal_path='')
+    listed = DataService(use_columnar=False, data_dir=ROOT, journal_path='')
+    try:
+        facets = columnar.property_facets(**filters)
+        assert facets == listed.property_facets(**filters)
+        assert facets['total'] == len(list(listed.iter_properties(**filters)))
+    finally:
+        columnar.close()
+        listed.close()
@@ -0,0 +1,64 @@
+import json
+import os
+import pickle
+
+import pytest
+from flask import Flask
+
+from data_service import DataService
+from property_record import PropertyRecord, RecordJSONProvider, compact_properties
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def repo_properties():
+    with open(os.path.join(ROOT, 'mock_properties_20250926_230821.json')) as f:
+        return json.load(f)
+
+
+def test_records_equal_the_loaded_dicts():
+    properties = repo_properties()
+    for prop, record in zip(properties, compact_properties(properties)):
+        assert dict(record) == prop
+        assert list(record) == list(prop)  # file key order is kept
+        assert record.to_dict() == prop
+
+
+def test_missing_extra_and_null_fields():
+    record = PropertyRecord({'property_id': '387-000001', 'status': None, 'latitude': 35.7, 'price': None})
+    assert dict(record) == {'property_id': '387-000001', 'price': None, 'status': None, 'latitude': 35.7}
+    assert 'city' not in record and record.get('city', 'n/a') == 'n/a'
+    with pytest.raises(KeyError):
+        record['city']
+    assert 'status' not in PropertyRecord({'property_id': '387-000002'})
+
+
+def test_records_are_read_only_and_pickle():
+    record = PropertyRecord({'property_id': '387-000001', 'city': 'Raleigh', 'status': 'Available'})
+    with pytest.raises(AttributeError):
+        record.city = 'Durham'
+    assert pickle.loads(pickle.dumps(record)) == record
+
+
+def test_jsonify_serializes_records():
+    prop = repo_properties()[0]
+    app = Flask(__name__)
+    app.json = RecordJSONProvider(app)
+    with app.app_context():
+        assert json.loads(app.json.dumps({'property': PropertyRecord(prop)})) == {'property': prop}
+
+
+def test_compact_and_dict_services_answer_the_same():
+    compact = DataService(data_dir=ROOT, journal_path='', compact_records=True)
+    plain = DataService(data_dir=ROOT, journal_path='', compact_records=False)
+    try:
+        assert isinstance(compact.properties[0], PropertyRecord) and type(plain.properties[0]) is dict
+        for filters in ({}, {'state': 'NC', 'sort': 'price_desc'}, {'query': 'oak', 'bedrooms': 3}):
+            compact_page = compact.search_properties_page(**filters, limit=100)
+            plain_page = plain.search_properties_page(**filters, limit=100)
+            assert compact.properties_json(compact_page['properties']) == \
+                plain.properties_json(plain_page['properties'])
+        assert compact.get_stats() == plain.get_stats()
+    finally:
+        compact.close()
+        plain.close()
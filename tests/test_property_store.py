@@ -0,0 +1,90 @@
+import json
+import random
+
+import pytest
+
+from data_service import DataService
+from property_store import SORT_OPTIONS, columnar_available
+
+pytestmark = pytest.mark.skipif(not columnar_available(), reason='numpy missing')
+
+FILTERS = [
+    {},
+    {'state': 'TX'},
+    {'state': 'ZZ'},
+    {'min_price': 150000},
+    {'max_price': 120000, 'bedrooms': 3},
+    {'bathrooms': 2},
+    {'status': 'Pending'},
+    {'query': 'maple', 'min_price': 100000, 'max_price': 300000},
+]
+
+
+def make_properties(count=400, seed=11):
+    rng = random.Random(seed)
+    properties = []
+    for i in range(count):
+        prop = {
+            'property_id': f'387-{i:06d}',
+            'address': f'{rng.randint(100, 9999)} {rng.choice(["Oak Ave", "Maple St", "Pine Rd"])}',
+            'city': rng.choice(['Raleigh', 'Atlanta', 'Austin']),
+            'state': rng.choice(['NC', 'GA', 'TX']),
+            'status': rng.choice(['Available', 'New Listing', 'Pending']),
+            'bedrooms': rng.randint(1, 5),
+            'bathrooms': rng.choice([1, 1.5, 2, 3]),
+            # Few distinct values, so every sort has ties to break on property_id
+            'price': rng.randrange(50000, 350000, 25000),
+            'created_at': f'2026-0{rng.randint(1, 3)}-01T10:00:00',
+        }
+        if rng.random() < 0.7:
+            prop['bid_deadline'] = f'2026-1{rng.randint(0, 2)}-15'
+        properties.append(prop)
+    rng.shuffle(properties)
+    return properties
+
+
+@pytest.fixture(scope='module')
+def services(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp('store')
+    (data_dir / 'mock_properties_20260101_000000.json').write_text(json.dumps(make_properties()))
+    (data_dir / 'mock_leads_20260101_000000.json').write_text('[]')
+    (data_dir / 'mock_brokers_20260101_000000.json').write_text('[]')
+    columnar = DataService(use_columnar=True, data_dir=str(data_dir), journal_path='')
+    listed = DataService(use_columnar=False, data_dir=str(data_dir), journal_path='')
+    assert columnar.snapshot.property_store is not None and listed.snapshot.property_store is None
+    yield columnar, listed
+    columnar.close()
+    listed.close()
+
+
+def ids(properties):
+    return [prop['property_id'] for prop in properties]
+
+
+@pytest.mark.parametrize('sort', list(SORT_OPTIONS))
+@pytest.mark.parametrize('filters', FILTERS, ids=lambda filters: ','.join(filters) or 'none')
+def test_store_search_matches_list_path(services, filters, sort):
+    columnar, listed = services
+    for limit in (1, 20, 1000):
+        store_page = columnar.search_properties_page(**filters, sort=sort, limit=limit)
+        list_page = listed.search_properties_page(**filters, sort=sort, limit=limit)
+        assert ids(store_page['properties']) == ids(list_page['properties'])
+        assert store_page['total'] == list_page['total']
+        assert store_page['next_cursor'] == list_page['next_cursor']
+
+
+@pytest.mark.parametrize('sort', list(SORT_OPTIONS))
+@pytest.mark.parametrize('filters', FILTERS, ids=lambda filters: ','.join(filters) or 'none')
+def test_store_iteration_matches_list_path(services, filters, sort):
+    columnar, listed = services
+    assert ids(columnar.iter_properties(**filters, sort=sort)) == ids(listed.iter_properties(**filters, sort=sort))
+
+
+def test_filters_select_the_expected_rows(services):
+    columnar, _ = services
+    everything = list(columnar.iter_properties())
+    selected = columnar.search_properties_page(state='TX', max_price=120000, bedrooms=3, limit=1000)
+    expected = [prop for prop in everything
+                if prop['state'] == 'TX' and prop['price'] <= 120000 and prop['bedrooms'] >= 3]
+    assert sorted(ids(selected['properties'])) == sorted(ids(expected))
+    assert selected['total'] == len(expected) > 0
@@ -0,0 +1,112 @@
+import threading
+import time
+
+import pytest
+
+import rate_limiter
+from hud_scraper import HUDPropertyScraper, IncompleteScrapeError
+from rate_limiter import HostRateLimiter, TokenBucket
+
+
+class FakeClock:
+    """monotonic/sleep pair where sleeping only records the wait"""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 6))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(rate_limiter.time, 'sleep', clock.sleep)
+    return clock
+
+
+def test_burst_then_one_token_per_interval(clock):
+    bucket = TokenBucket(rate=4, capacity=2)
+    waits = [bucket.acquire() for _ in range(5)]
+    # Callers reserve in arrival order, so each waits one interval longer than the last
+    assert waits == [0, 0, 0.25, 0.5, 0.75]
+    assert clock.sleeps == [0.25, 0.5, 0.75]
+    assert bucket.waited == pytest.approx(1.5)
+
+
+def test_idle_time_refills_up_to_capacity(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    for _ in range(3):
+        bucket.acquire()
+    clock.now += 60  # far more than needed to refill
+    assert [bucket.acquire() for _ in range(4)] == [0, 0, 0, 0.5]
+
+
+def test_hosts_are_limited_separately(clock):
+    limiter = HostRateLimiter(rate=1)
+    assert limiter.acquire('https://www.hudhomestore.gov/a') == 0
+    assert limiter.acquire('https://example.com/a') == 0
+    assert limiter.acquire('https://WWW.hudhomestore.gov/b') == 1.0
+    assert limiter.stats() == {'www.hudhomestore.gov': {'rate': 1, 'waited_seconds': 1.0},
+                               'example.com': {'rate': 1, 'waited_seconds': 0.0}}
+    assert HostRateLimiter(rate=0).acquire('https://example.com/') == 0.0
+
+
+def test_invalid_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_concurrent_fetches_share_the_host_rate():
+    class Session:
+        def __init__(self):
+            self.times = []
+            self.lock = threading.Lock()
+
+        def get(self, url, timeout=None):
+            with self.lock:
+                self.times.append(time.monotonic())
+            return type('Response', (), {'status_code': 200, 'headers': {}, 'close': lambda self: None})()
+
+    scraper = HUDPropertyScraper(requests_per_second=50, burst=1, cache_dir='')
+    scraper.session = Session()
+    threads = [threading.Thread(target=lambda: [scraper.fetch('https://www.hudhomestore.gov/x') for _ in range(4)])
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    times = sorted(scraper.session.times)
+    assert len(times) == 16
+    # 16 requests at 50/s with a burst of one span at least 15 intervals
+    assert times[-1] - times[0] >= 15 / 50 - 0.01
+
+
+def test_states_are_scraped_concurrently_in_order():
+    scraper = HUDPropertyScraper(requests_per_second=0, cache_dir='', max_workers=3)
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def get_state_properties(state):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        if state == 'GA':
+            raise IncompleteScrapeError(state, 2, 'timed out')
+        return [{'property_id': f'{state}-1', 'state': state}]
+
+    scraper.get_state_properties = get_state_properties
+    results = scraper.scrape_all_states(['NC', 'GA', 'SC', 'FL', 'TX', 'OH'])
+
+    assert list(results) == ['NC', 'SC', 'FL', 'TX', 'OH']
+    assert results['FL'] == [{'property_id': 'FL-1', 'state': 'FL'}]
+    assert list(scraper.incomplete_states) == ['GA']
+    assert peak[0] == 3
@@ -0,0 +1,120 @@
+import threading
+
+import pytest
+from flask import Flask, Response
+
+from request_metrics import PROMETHEUS_CONTENT_TYPE, RequestMetrics
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    metrics = RequestMetrics('test')
+    metrics.init_app(app)
+
+    @app.route('/api/items/<item_id>')
+    def item(item_id):
+        return {'id': item_id}
+
+    @app.route('/api/boom')
+    def boom():
+        raise RuntimeError('boom')
+
+    @app.route('/api/stream')
+    def stream():
+        return Response((b'x' * 1000 for _ in range(5)), mimetype='text/plain')
+
+    @app.route('/api/metrics')
+    def scrape():
+        return metrics.response()
+
+    app.metrics = metrics
+    return app
+
+
+def samples(app):
+    """Metric lines as {'name{labels}': value}"""
+    return {line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1])
+            for line in app.metrics.render().splitlines() if not line.startswith('#')}
+
+
+def call(client, url, method='GET'):
+    """Request and close the response, as a WSGI server does once the body is sent"""
+    response = client.open(url, method=method)
+    response.get_data()
+    response.close()
+    return response
+
+
+def labels(route, method='GET'):
+    return f'app="test",method="{method}",route="{route}"'
+
+
+def test_counts_per_route_template_and_status(app):
+    client = app.test_client()
+    for item_id in ('1', '2', '3'):
+        call(client, f'/api/items/{item_id}')
+    call(client, '/api/nowhere')
+    call(client, '/api/items/1', 'POST')
+
+    metrics = samples(app)
+    assert metrics[f'http_requests_total{{{labels("/api/items/<item_id>")},status="200"}}'] == 3
+    assert metrics[f'http_requests_total{{{labels("unmatched")},status="404"}}'] == 1
+    assert metrics[f'http_requests_total{{{labels("unmatched", "POST")},status="405"}}'] == 1
+    assert metrics[f'http_request_duration_seconds_count{{{labels("/api/items/<item_id>")}}}'] == 3
+    assert metrics[f'http_request_errors_total{{{labels("/api/items/<item_id>")}}}'] == 0
+
+
+def test_errors_and_response_sizes(app):
+    app.config['PROPAGATE_EXCEPTIONS'] = False
+    client = app.test_client()
+    call(client, '/api/boom')
+    call(client, '/api/stream')
+
+    metrics = samples(app)
+    assert metrics[f'http_requests_total{{{labels("/api/boom")},status="500"}}'] == 1
+    assert metrics[f'http_request_errors_total{{{labels("/api/boom")}}}'] == 1
+    stream = labels('/api/stream')
+    assert metrics[f'http_response_size_bytes_sum{{{stream}}}'] == 5000
+    assert metrics[f'http_response_size_bytes_bucket{{{stream},le="4096"}}'] == 0
+    assert metrics[f'http_response_size_bytes_bucket{{{stream},le="16384"}}'] == 1
+    assert metrics[f'http_response_size_bytes_bucket{{{stream},le="+Inf"}}'] == 1
+
+
+def test_in_flight_gauge_drops_after_close(app):
+    client = app.test_client()
+    response = client.get('/api/stream', buffered=False)
+    assert samples(app)['http_requests_in_flight{app="test"}'] == 1
+    # The request is only recorded once its body has been sent and closed
+    assert f'http_request_duration_seconds_count{{{labels("/api/stream")}}}' not in samples(app)
+
+    assert len(response.get_data()) == 5000
+    response.close()
+    metrics = samples(app)
+    assert metrics['http_requests_in_flight{app="test"}'] == 0
+    assert metrics[f'http_request_duration_seconds_count{{{labels("/api/stream")}}}'] == 1
+
+
+def test_counts_from_finished_threads_are_kept(app):
+    def hit():
+        client = app.test_client()
+        for _ in range(25):
+            call(client, '/api/items/7')
+
+    threads = [threading.Thread(target=hit) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for _ in range(2):  # the second scrape reads the totals folded from dead threads
+        metrics = samples(app)
+        assert metrics[f'http_requests_total{{{labels("/api/items/<item_id>")},status="200"}}'] == 100
+        assert metrics['http_requests_in_flight{app="test"}'] == 0
+
+
+def test_scrape_endpoint(app):
+    response = app.test_client().get('/api/metrics')
+    assert response.status_code == 200
+    assert response.content_type == PROMETHEUS_CONTENT_TYPE
+    assert '# TYPE http_request_duration_seconds histogram' in response.get_data(as_text=True)
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+from flask import Flask
+
+from response_cache import ResponseCache, cached_json_response
+
+
+class Data:
+    """Stands in for DataService: a version bumped on every reload"""
+
+    def __init__(self):
+        self.data_version = 1
+        self.rows = ['387-000001']
+        self.builds = 0
+
+    def reload(self, rows):
+        self.rows = rows
+        self.data_version += 1
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    cache = ResponseCache(maxsize=8)
+    data = Data()
+
+    @app.route('/items')
+    def items():
+        def build_payload():
+            data.builds += 1
+            return {'items': data.rows}
+        return cached_json_response(cache, (data.data_version, 'items'), build_payload)
+
+    client = app.test_client()
+    client.data = data
+    client.cache = cache
+    return client
+
+
+def test_if_none_match_returns_304(client):
+    first = client.get('/items')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert json.loads(first.data) == {'items': ['387-000001']}
+
+    revalidated = client.get('/items', headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b''
+    assert revalidated.headers['ETag'] == etag
+    assert client.data.builds == 1
+    assert client.cache.stats()['not_modified'] == 1
+
+    other = client.get('/items', headers={'If-None-Match': '"something-else"'})
+    assert other.status_code == 200
+
+
+def test_etag_changes_with_data_version(client):
+    etag = client.get('/items').headers['ETag']
+
+    client.data.reload(['387-000001', '387-000002'])
+    response = client.get('/items', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert json.loads(response.data) == {'items': ['387-000001', '387-000002']}
+    assert client.data.builds == 2
+
+
+def test_same_version_is_served_from_cache(client):
+    bodies = {client.get('/items').data for _ in range(3)}
+    assert len(bodies) == 1
+    assert client.data.builds == 1
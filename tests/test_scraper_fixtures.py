@@ -0,0 +1,58 @@
+import pytest
+
+from benchmark_scraper import check, load_fixtures, normalise_expected, normalise_scraper, scale_page, synthetic_pages
+from hud_fixtures import DEFAULT_FIXTURE_DIR
+from hud_scraper import PARSERS, HUDPropertyScraper, etree
+
+PARSER_PARAMS = [
+    pytest.param(parser, marks=pytest.mark.skipif(parser == 'lxml' and etree is None, reason='lxml missing'))
+    for parser in PARSERS
+]
+
+# One card of each layout in fixtures/hud_search/property_cards_sample.html, read by hand
+SAMPLE_CARDS = {
+    '380-439563': ('380-439563', '6091 Oak Ave', 'Raleigh', 'NC', '27601', 'Wake', 137000, 5, 1.0),
+    '381-139317': ('381-139317', '1586 Lake St', 'Charlotte', 'NC', '28202', 'Mecklenburg County', 104000, 5, 2.5),
+    '382-967017': ('382-967017', '912 Cedar St', 'Durham', 'NC', '27701', '', 349000, 2, 1.5),
+    '383-683705': ('383-683705', '9453 Elm Ave (Unit A)', None, None, None, '', None, None, None),
+}
+
+
+def parse(parser, content):
+    scraper = HUDPropertyScraper(parser=parser, cache_dir='')
+    return [normalise_scraper(prop) for prop in scraper.parse_properties(content)]
+
+
+@pytest.fixture(scope='module')
+def recorded():
+    pages = load_fixtures(DEFAULT_FIXTURE_DIR, 1)
+    assert pages, f'no recorded pages under {DEFAULT_FIXTURE_DIR}'
+    return pages
+
+
+@pytest.mark.parametrize('parser', PARSER_PARAMS)
+def test_sample_page_matches_hand_read_cards(parser, recorded):
+    page = next(page for page in recorded if page.name == 'property_cards_sample.html')
+    records = parse(parser, page.content)
+    assert len(records) == 24
+    assert {record[0]: record for record in records if record[0] in SAMPLE_CARDS} == SAMPLE_CARDS
+
+
+def test_parsers_agree_on_recorded_pages(recorded):
+    if etree is None:
+        pytest.skip('lxml missing')
+    for page in recorded:
+        assert check(page.name, parse('lxml', page.content), parse('html.parser', page.content)) is None
+
+
+@pytest.mark.parametrize('parser', PARSER_PARAMS)
+def test_synthetic_pages_match_ground_truth(parser):
+    for page in synthetic_pages([1, 25, 400], ['property-card'], seed=7):
+        expected = [normalise_expected(prop) for prop in page.expected]
+        assert check(page.name, parse(parser, page.content), expected) is None
+
+
+@pytest.mark.parametrize('parser', PARSER_PARAMS)
+def test_scaled_page_repeats_every_card(parser, recorded):
+    content = recorded[0].content
+    assert parse(parser, scale_page(content, 3)) == parse(parser, content) * 3
@@ -0,0 +1,74 @@
+import pytest
+
+from hud_scraper import HUDPropertyScraper, etree
+
+pytestmark = pytest.mark.skipif(etree is None, reason='lxml missing')
+
+
+def parse_both(html):
+    """(lxml, html.parser) results of one page, minus the scrape timestamps"""
+    results = []
+    for parser in ('lxml', 'html.parser'):
+        properties, next_href = HUDPropertyScraper(parser=parser, cache_dir='').parse_search_page(html.encode())
+        for prop in properties:
+            del prop['scraped_at']
+        results.append((properties, next_href))
+    assert results[0] == results[1]
+    return results[0]
+
+
+def test_fields_from_attributes_and_first_matching_descendant():
+    properties, _ = parse_both('''
+        <div class="property-card featured" data-case-number="387-000001" status="Pending">
+          <h3 class="property-address">12 Elm St</h3>
+          <div class="details">
+            <span class="address"> 34 Oak Ave </span>
+            <p class="city-state">Raleigh, NC 27601</p>
+            <span class="price">$125,500</span><span class="price">$1</span>
+            <span class="bedrooms">3 bd</span>
+            <span class="baths"><b>2.5</b> ba</span>
+            <span class="county">Wake</span>
+          </div>
+        </div>''')
+    assert properties == [{
+        # 'address' is tried before 'property-address' even though it comes later in the card
+        'property_id': '387-000001', 'address': '34 Oak Ave', 'city': 'Raleigh', 'state': 'NC',
+        'zip_code': '27601', 'price': 125500, 'bedrooms': 3, 'bathrooms': 2.5, 'status': 'Pending',
+        'county': 'Wake', 'listing_period': '', 'listing_source': 'HUD',
+    }]
+
+
+def test_case_number_from_card_text_and_cards_without_one():
+    properties, _ = parse_both('''
+        <div class="property-card"><p>HUD Case #: 412-123456</p><p class="location">Provo</p></div>
+        <div class="property-card"><p class="address">No case here</p></div>''')
+    assert [prop['property_id'] for prop in properties] == ['412-123456']
+    assert properties[0]['address'] == 'Address not available'
+    assert 'city' not in properties[0]  # a location without a comma is skipped
+
+
+@pytest.mark.parametrize('html,expected', [
+    # Class tokens match whole words only
+    ('<div class="property-card-wide" data-case-number="387-000001"></div>'
+     '<article data-case-number="387-000002"></article>', ['387-000002']),
+    ('<section><div data-case-number="387-000003"></div></section>', ['387-000003']),
+    ('<div class="property-card" data-case-number="387-000004"></div>'
+     '<article data-case-number="387-000005"></article>', ['387-000004']),
+    ('', []),
+])
+def test_card_selection(html, expected):
+    properties, _ = parse_both(html)
+    assert [prop['property_id'] for prop in properties] == expected
+
+
+@pytest.mark.parametrize('html,expected', [
+    ('<head><link rel="next" href="/search?page=2"></head>', '/search?page=2'),
+    ('<a rel="nofollow next" href="?page=3">More</a>', '?page=3'),
+    ('<a aria-label="Next page" href=" /p/4 ">&gt;</a>', '/p/4'),
+    ('<ul><li class="page next"><a href="/p/5">5</a></li></ul>', '/p/5'),
+    ('<a rel="next" href="#">Next</a>', None),
+    ('<a rel="next" href="javascript:void(0)">Next</a>', None),
+    ('<a href="/p/6">Next</a>', None),
+])
+def test_next_link(html, expected):
+    assert parse_both(html)[1] == expected
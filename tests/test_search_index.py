@@ -0,0 +1,84 @@
+import json
+import os
+import random
+
+import pytest
+
+from search_index import SEARCH_FIELDS, NgramIndex
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DOCUMENTS = [
+    {'property_id': '387-000001', 'address': '123 Maple St', 'city': 'Raleigh', 'county': 'Wake'},
+    {'property_id': '387-000002', 'address': '45 Oak Ave', 'city': 'Durham', 'county': 'Durham'},
+    {'property_id': '387-000003', 'address': '9 Maplewood Dr', 'city': 'Cary', 'county': None},
+    {'property_id': '412-000004', 'address': '77 Pine Rd', 'city': 'Mapleton', 'county': 'Utah'},
+]
+
+
+def scan(documents, query):
+    """The substring scan the index replaces"""
+    query = query.lower()
+    return [i for i, doc in enumerate(documents)
+            if any(query in str(doc.get(field) or '').lower() for field in SEARCH_FIELDS)]
+
+
+@pytest.fixture
+def index():
+    index = NgramIndex()
+    index.build(DOCUMENTS)
+    return index
+
+
+@pytest.mark.parametrize('query,expected', [
+    ('maple', [0, 2, 3]),
+    ('MAPLE ST', [0]),
+    ('durham', [1]),
+    ('387-', [0, 1, 2]),
+    ('ak', [0, 1]),        # shorter than a trigram: scanned
+    ('pine rd', [3]),
+    ('ple st', [0]),       # all grams present, and in order
+    ('st ra', []),         # would only match across the address/city boundary
+    ('zebra', []),
+])
+def test_hits(index, query, expected):
+    assert index.search(query) == expected
+
+
+def test_empty_query_is_no_filter(index):
+    assert index.search('') is None
+    assert index.search(None) is None
+
+
+def test_shared_grams_are_verified(index):
+    # 'map' and 'ple' and 'lew' all occur in doc 2, but so must the whole query
+    assert index.search('maplewood') == [2]
+    assert index.search('maplewoods') == []
+
+
+def test_add_and_remove_keep_postings_exact(index):
+    index.add(4, {'property_id': '387-000005', 'address': '5 Maple Ct', 'city': 'Apex', 'county': 'Wake'})
+    assert index.search('maple') == [0, 2, 3, 4]
+    index.add(0, {'property_id': '387-000001', 'address': '123 Birch St', 'city': 'Raleigh', 'county': 'Wake'})
+    assert index.search('maple') == [2, 3, 4]
+    assert index.search('birch') == [0]
+    index.remove(4)
+    assert index.search('maple') == [2, 3]
+    assert 'ape' not in index.postings  # only doc 4 had it
+
+
+def test_matches_scan_on_repo_data():
+    with open(os.path.join(ROOT, 'mock_properties_20250926_230821.json')) as f:
+        documents = json.load(f)
+    index = NgramIndex()
+    index.build(documents)
+
+    rng = random.Random(5)
+    queries = ['dr', 'oak', 'raleigh', '387', 'county', 'x']
+    for _ in range(50):
+        doc = rng.choice(documents)
+        text = str(doc[rng.choice(SEARCH_FIELDS)])
+        start = rng.randrange(len(text))
+        queries.append(text[start:start + rng.randint(1, 8)])
+    for query in queries:
+        assert index.search(query) == scan(documents, query), query
@@ -0,0 +1,70 @@
+import builtins
+import gzip
+
+import pytest
+from flask import Flask
+
+import static_assets
+from static_assets import CACHE_IMMUTABLE, CACHE_REVALIDATE, StaticAssets
+
+SCRIPT = b'export const homes = "' + b'HUD home ' * 400 + b'";\n'
+
+
+@pytest.fixture
+def assets(tmp_path, monkeypatch):
+    (tmp_path / 'assets').mkdir()
+    (tmp_path / 'index.html').write_bytes(b'<!doctype html><div id="root"></div>')
+    (tmp_path / 'assets' / 'index-CrmKjufW.js').write_bytes(SCRIPT)
+    (tmp_path / 'logo.png').write_bytes(bytes(range(256)) * 8)
+    (tmp_path / 'us-map.png').write_bytes(b'\x89PNG' + bytes(5000))
+    monkeypatch.setattr(static_assets, 'MAX_CACHED_SIZE', 4096)
+    return StaticAssets(str(tmp_path))
+
+
+def get(assets, path, **headers):
+    app = Flask(__name__)
+    with app.test_request_context(headers=headers):
+        response = assets.response(path)
+        response.direct_passthrough = False
+        return response.status_code, response.get_data(), response.headers
+
+
+def no_open(*args, **kwargs):
+    raise AssertionError('static file opened per request')
+
+
+def test_compressed_and_plain_bodies_come_from_memory(assets, monkeypatch):
+    monkeypatch.setattr(builtins, 'open', no_open)
+
+    status, body, headers = get(assets, 'assets/index-CrmKjufW.js', **{'Accept-Encoding': 'gzip'})
+    assert status == 200 and headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(body) == SCRIPT
+    assert headers['Cache-Control'] == CACHE_IMMUTABLE
+
+    status, body, headers = get(assets, 'assets/index-CrmKjufW.js')
+    assert status == 200 and body == SCRIPT and 'Content-Encoding' not in headers
+    assert get(assets, 'logo.png')[1] == bytes(range(256)) * 8
+
+
+def test_large_files_stream_from_disk(assets):
+    status, body, headers = get(assets, 'us-map.png')
+    assert status == 200 and len(body) == 5004
+    assert headers['Content-Length'] == '5004'
+
+
+def test_client_routes_get_the_index_page(assets):
+    status, body, headers = get(assets, 'properties/NC')
+    assert status == 200 and body.startswith(b'<!doctype html>')
+    assert headers['Cache-Control'] == CACHE_REVALIDATE
+    assert get(assets, '')[1] == body
+    # A missing bundle chunk is not answered with HTML
+    assert get(assets, 'assets/missing-AbCdEfGh.js')[0] == 404
+
+
+def test_matching_etag_is_not_modified(assets):
+    _, _, headers = get(assets, 'assets/index-CrmKjufW.js', **{'Accept-Encoding': 'gzip'})
+    status, body, _ = get(assets, 'assets/index-CrmKjufW.js',
+                          **{'Accept-Encoding': 'gzip', 'If-None-Match': headers['ETag']})
+    assert status == 304 and body == b''
+    # The gzip ETag does not validate the uncompressed body
+    assert get(assets, 'assets/index-CrmKjufW.js', **{'If-None-Match': headers['ETag']})[0] == 200
@@ -0,0 +1,79 @@
+import os
+import random
+import threading
+
+import pytest
+
+from data_service import DataService
+from stats_aggregator import StatsAggregator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATUSES = ['New', 'Contacted', 'Active', 'Qualified', 'Closed', 'Lost']
+
+
+def full_scan(properties, leads, brokers):
+    """The /api/stats computation before the counters, one pass per figure"""
+    total_leads = len(leads)
+    closed_leads = len([l for l in leads if l['status'] == 'Closed'])
+    return {
+        'properties': {
+            'total': len(properties),
+            'available': len([p for p in properties if p['status'] == 'Available']),
+            'new_listings': len([p for p in properties if p['status'] == 'New Listing']),
+            'average_price': round(sum(p['price'] for p in properties) / len(properties)) if properties else 0
+        },
+        'leads': {
+            'total': total_leads,
+            'active': len([l for l in leads if l['status'] in ['New', 'Contacted', 'Active']]),
+            'closed': closed_leads,
+            'conversion_rate': round((closed_leads / total_leads * 100) if total_leads > 0 else 0, 1)
+        },
+        'brokers': {
+            'total': len(brokers),
+            'hud_registered': len([b for b in brokers if b.get('hud_registered', False)])
+        }
+    }
+
+
+@pytest.fixture
+def service():
+    service = DataService(data_dir=ROOT, journal_path='')
+    yield service
+    service.close()
+
+
+def test_loaded_counters_match_full_scan(service):
+    assert service.get_stats() == full_scan(service.properties, service.leads, service.brokers)
+
+
+def test_counters_follow_lead_writes(service):
+    rng = random.Random(4)
+    for step in range(200):
+        if step % 3 == 0:
+            service.add_lead({'name': f'Lead {step}', 'email': 'x@example.com', 'phone': '555-0100'})
+        else:
+            lead = rng.choice(service.leads)
+            service.update_lead_status(lead['lead_id'], rng.choice(STATUSES))
+        assert service.get_stats() == full_scan(service.properties, service.leads, service.brokers)
+
+
+def test_counters_survive_concurrent_writes(service):
+    def write(seed):
+        rng = random.Random(seed)
+        for step in range(100):
+            if step % 2:
+                service.add_lead({'name': 'Concurrent', 'email': 'x@example.com', 'phone': '555-0100'})
+            else:
+                service.update_lead_status(rng.choice(service.leads)['lead_id'], rng.choice(STATUSES))
+
+    threads = [threading.Thread(target=write, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert service.get_stats() == full_scan(service.properties, service.leads, service.brokers)
+
+
+def test_compute_matches_full_scan_on_empty_data():
+    assert StatsAggregator.compute([], [], []) == full_scan([], [], [])
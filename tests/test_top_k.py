@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+from property_store import SORT_OPTIONS, PropertyStore, columnar_available, page_key, sort_key, top_k
+
+
+def make_rows(count, seed):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        row = {'property_id': f'387-{rng.randrange(10 ** 6):06d}-{i}',
+               'price': rng.choice([None, '', 50000, 75000, 100000, 125000]),
+               'created_at': rng.choice([None, '2026-01-01', '2026-02-01', '2026-03-01']),
+               'bid_deadline': rng.choice([None, '2026-10-01', '2026-11-01'])}
+        rows.append(row)
+    return rows
+
+
+@pytest.mark.parametrize('count', [0, 5, 400])
+@pytest.mark.parametrize('limit', [0, 1, 10, 49, 1000])
+@pytest.mark.parametrize('reverse', [False, True])
+def test_top_k_equals_sorted_slice(count, limit, reverse):
+    rows = make_rows(count, seed=count + limit)
+    key = page_key('price', reverse)
+    assert top_k(rows, key, reverse=reverse, limit=limit) == sorted(rows, key=key, reverse=reverse)[:limit]
+
+
+def test_top_k_is_stable_on_ties():
+    rows = [{'property_id': f'387-{i:06d}', 'price': 100000} for i in range(200)]
+    key = sort_key('price')
+    assert top_k(rows, key, limit=5) == rows[:5]  # heap path keeps input order like sorted()
+    assert top_k(rows, key, reverse=True, limit=5) == rows[:5]
+
+
+def test_missing_values_sort_last_both_ways():
+    rows = [{'property_id': 'a', 'price': None}, {'property_id': 'b', 'price': 2},
+            {'property_id': 'c', 'price': ''}, {'property_id': 'd', 'price': 1}]
+    ascending = top_k(rows, page_key('price'), limit=4)
+    descending = top_k(rows, page_key('price', True), reverse=True, limit=4)
+    assert [row['property_id'] for row in ascending][:2] == ['d', 'b']
+    assert [row['property_id'] for row in descending][:2] == ['b', 'd']
+
+
+@pytest.mark.skipif(not columnar_available(), reason='numpy missing')
+@pytest.mark.parametrize('sort', list(SORT_OPTIONS))
+@pytest.mark.parametrize('limit', [1, 7, 400, 10000])
+def test_presorted_order_equals_full_sort(sort, limit):
+    import numpy as np
+
+    rows = make_rows(400, seed=9)
+    for row in rows:
+        row.update(state='NC', status='Available', bedrooms=3, bathrooms=2)
+    store = PropertyStore(rows)
+    field, reverse = SORT_OPTIONS[sort]
+    expected = sorted(rows, key=page_key(field, reverse), reverse=reverse)
+
+    everything = np.arange(len(rows))
+    assert [rows[i] for i in store.ordered(everything, sort, limit).tolist()] == expected[:limit]
+
+    # A subset keeps the same relative order
+    subset = everything[::3]
+    chosen = {id(rows[i]) for i in subset}
+    assert [rows[i] for i in store.ordered(subset, sort, limit).tolist()] == \
+        [row for row in expected if id(row) in chosen][:limit]